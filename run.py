@@ -1,4 +1,11 @@
+import os
+
+# DASHBOARD_PROFILE_STARTUP=1 prints a cold-start profile before serving
+if os.environ.get("DASHBOARD_PROFILE_STARTUP", "") not in ("", "0"):
+    from sports_analytics_dashboard.profiling import profile_startup, print_report
+    print_report(profile_startup(warm=True))
+
 from sports_analytics_dashboard import app
 
 if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)
@@ -5,8 +5,11 @@ Evaluates model accuracy by comparing predictions against actual outcomes.
 from .predictor import predict_win_probability
 from .ml_model import train_model
 from nba_api.stats.endpoints import LeagueGameLog
-from .utils import normalize_team_name
+from .utils import normalize_team_name, league_path, DEFAULT_LEAGUE
 from .nba import fetch_team_stats
+from .store import ingest_game_logs, db_file
+from . import ledger
+from . import elo
 import pandas as pd
 import os
 import time
@@ -14,30 +17,39 @@ from datetime import datetime
 
 CACHE_PATH = "game_logs.csv"
 
-def fetch_game_logs_with_cache(season, retries=3, delay=2):
+def fetch_game_logs_with_cache(season, retries=3, delay=2, league_id=DEFAULT_LEAGUE):
     """
     Returns cached logs if available, else fetches from API and caches result.
 
     Args:
-        season (string): the NBA season to cache games for
+        season (string): the season to cache games for
         retries (int): the number of times the function should retry after a fail until terminating
         delay (int): the number of seconds the function should wait in between API requests
+        league_id (string): league ID (see utils.LEAGUES)
     Returns:
         None
     """
+    cache_path = league_path(CACHE_PATH, league_id)
+
     # Check if cache exists and is fresh
-    if os.path.exists(CACHE_PATH):
-        modified = datetime.fromtimestamp(os.path.getmtime(CACHE_PATH))
+    if os.path.exists(cache_path):
+        modified = datetime.fromtimestamp(os.path.getmtime(cache_path))
         if modified.date() == datetime.today().date():
             print("📦 Using cached game logs.")
-            return pd.read_csv(CACHE_PATH)
+            return pd.read_csv(cache_path)
 
     # Else fetch from API
     for attempt in range(retries):
         try:
             print(f"📥 Fetching game logs for {season} (attempt {attempt + 1})")
-            df = LeagueGameLog(season=season, season_type_all_star="Regular Season").get_data_frames()[0]
-            df.to_csv(CACHE_PATH, index=False)
+            df = LeagueGameLog(league_id=league_id, season=season,
+                               season_type_all_star="Regular Season").get_data_frames()[0]
+            df.to_csv(league_path(CACHE_PATH, league_id, create=True), index=False)
+            ingest_game_logs(df, db_file(league_id))
+            # New finals may settle served predictions and move Elo ratings (NBA only)
+            ledger.grade(league_id=league_id)
+            if league_id == DEFAULT_LEAGUE:
+                elo.get_elo_engine(refresh=True)
             return df
         except Exception as e:
             print(f"❌ Failed to fetch game logs (attempt {attempt + 1}): {e}")
@@ -93,12 +105,12 @@ if __name__ == "__main__":
             print(f"🚫 Missing stats for away team: {away}")
 
         predicted_probs = predict_win_probability(home, away)
-        if not predicted_probs or "winner" not in predicted_probs:
+        if not predicted_probs:
             print(f"⚠️ Skipping game {home} vs. {away} — missing prediction output.")
             continue
         
-        print(f"✅ Predicted winner: {predicted_probs['winner']}")
-        predicted_winner = predicted_probs["winner"]
+        print(f"✅ Predicted winner: {predicted_probs.winner}")
+        predicted_winner = predicted_probs.winner
         actual = home if row["WL"] == "W" else away
 
         if predicted_winner == actual:
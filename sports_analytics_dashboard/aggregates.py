@@ -0,0 +1,193 @@
+"""
+This module builds the team stats table shown on the /stats page.
+
+Season stats come from the team stats cache and last-N stats from the game log store.
+The table and a pre-sorted ranking for every column are computed once per stats
+refresh, so a request only filters a ranking and slices out one page; pages are
+additionally memoised on the table they were cut from. Each league has its own table, built from its
+own stats cache and game log store.
+"""
+
+from .utils import get_team_id, team_conference, stats_fingerprint, DEFAULT_LEAGUE
+from .predictor import get_team_stats
+from . import store
+
+SEASON_COLUMNS = ["W_PCT", "NET_RATING", "TURNOVER_PCT", "PLUS_MINUS", "REB", "AST"]
+LAST_N = (5, 10)
+LAST_N_STATS = ["W_PCT", "PLUS_MINUS", "PTS", "REB", "AST"]
+COLUMNS = SEASON_COLUMNS + [f"{stat}_LAST{n}" for n in LAST_N for stat in LAST_N_STATS]
+MAX_CACHED_PAGES = 256  # Pages memoised per table
+
+# Built table per league: {"version", "rows", "rankings", "present", "pages"}
+_aggregates = {}
+
+
+def _last_n_stats(team_id, games):
+    """Averages a team's most recent games for every N in LAST_N."""
+    result = {}
+    for n in LAST_N:
+        recent = games[:n]
+        if not recent:
+            continue
+        result[f"W_PCT_LAST{n}"] = sum(g["WL"] == "W" for g in recent) / len(recent)
+        for stat in LAST_N_STATS[1:]:
+            values = [g[stat] for g in recent if g[stat] is not None]
+            if values:
+                result[f"{stat}_LAST{n}"] = sum(values) / len(values)
+    return result
+
+
+# Stats fingerprint per league, hashed once per loaded stats object
+_stats_fingerprints = {}
+
+def _version(stats, league_id=DEFAULT_LEAGUE):
+    """
+    Identifies the inputs: a fingerprint of the team stats (hashed once per loaded
+    stats object, so it agrees across workers) and the newest game in the store.
+    """
+    cached = _stats_fingerprints.get(league_id)
+    if cached is None or cached["id"] != id(stats):
+        cached = _stats_fingerprints[league_id] = {"id": id(stats), "value": stats_fingerprint(stats)[:16]}
+    latest = store.get_connection(store.db_file(league_id)).execute(
+        "SELECT MAX(GAME_DATE) FROM game_logs"
+    ).fetchone()[0]
+    return f"{league_id}:{cached['value']}:{latest}"
+
+
+def build_aggregates(stats, league_id=DEFAULT_LEAGUE):
+    """
+    Builds one row per team and a ranking (row order, best first) for every column.
+    Teams missing a value (None or NaN) rank last.
+
+    Args:
+        stats (dictionary): teams attached to their stats
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        dictionary: rows, rankings keyed by column name, and how many teams have a
+        value for each column
+    """
+    path = store.db_file(league_id)
+    rows = []
+    for team, team_stats in sorted(stats.items()):
+        team_id = get_team_id(team, league_id)
+        conference = team_conference.get(team_id) if league_id == DEFAULT_LEAGUE else None
+        row = {"TEAM": team, "TEAM_ID": team_id, "CONFERENCE": conference}
+        row.update({col: team_stats.get(col) for col in SEASON_COLUMNS})
+        if team_id:
+            games = store.last_n_games(team_id, max(LAST_N), path=path)
+            row.update(_last_n_stats(team_id, games))
+        # Fall back to the API-derived last-5 numbers when the store has no games yet
+        row.setdefault("W_PCT_LAST5", team_stats.get("W_PCT_LAST5"))
+        row.setdefault("PLUS_MINUS_LAST5", team_stats.get("NET_RATING_LAST5"))
+        row.setdefault("REB_LAST5", team_stats.get("REB_LAST5"))
+        row.setdefault("AST_LAST5", team_stats.get("AST_LAST5"))
+        for col in COLUMNS:
+            row.setdefault(col, None)
+        rows.append(row)
+
+    rankings = {"TEAM": list(range(len(rows)))}
+    counts = {"TEAM": len(rows)}
+    for col in COLUMNS:
+        present = [i for i, row in enumerate(rows) if _has_value(row[col])]
+        missing = [i for i, row in enumerate(rows) if not _has_value(row[col])]
+        # Lower is better for turnovers; everything else ranks highest first
+        reverse = col != "TURNOVER_PCT"
+        rankings[col] = sorted(present, key=lambda i: rows[i][col], reverse=reverse) + missing
+        counts[col] = len(present)
+    return {"rows": rows, "rankings": rankings, "present": counts}
+
+
+def _has_value(value):
+    return value is not None and value == value  # NaN != NaN
+
+
+def get_aggregates(league_id=DEFAULT_LEAGUE):
+    """
+    Returns a league's team stats table, rebuilding it only when the stats or game log changed.
+
+    Args:
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        dictionary: version, rows and rankings, or None if no stats are available
+    """
+    stats = get_team_stats(league_id)
+    if stats is None:
+        return None
+    version = _version(stats, league_id)
+    table = _aggregates.get(league_id)
+    if table is None or table["version"] != version:
+        print("🧮 Building team stats aggregates...")
+        table = _aggregates[league_id] = dict(build_aggregates(stats, league_id), version=version, pages={})
+    return table
+
+
+def _page(table, league_id, sort, descending, query, conference, page, per_page):
+    """
+    Filters a pre-sorted ranking and slices out one page. Pages are memoised on the
+    table itself, so a page is never served from a different table than it was cut from.
+    """
+    key = (sort, descending, query, conference, page, per_page)
+    cached = table["pages"].get(key)
+    if cached is not None:
+        return cached
+
+    order = table["rankings"][sort]
+    if not descending:
+        # Reverse only the teams with a value; missing values stay last
+        present = table["present"][sort]
+        order = order[:present][::-1] + order[present:]
+    rows = [table["rows"][i] for i in order]
+    if query:
+        rows = [r for r in rows if query in r["TEAM"].lower()]
+    if conference:
+        rows = [r for r in rows if r["CONFERENCE"] == conference]
+
+    total = len(rows)
+    pages = max(1, -(-total // per_page))
+    page = min(max(1, page), pages)
+    start = (page - 1) * per_page
+    result = {
+        "league": league_id,
+        "version": table["version"],
+        "columns": COLUMNS,
+        "sort": sort,
+        "order": "desc" if descending else "asc",
+        "page": page,
+        "pages": pages,
+        "per_page": per_page,
+        "total": total,
+        "teams": rows[start:start + per_page],
+    }
+    if len(table["pages"]) >= MAX_CACHED_PAGES:
+        table["pages"].clear()
+    table["pages"][key] = result
+    return result
+
+
+def stats_page(sort="W_PCT", order="desc", query="", conference="", page=1, per_page=30,
+               league_id=DEFAULT_LEAGUE):
+    """
+    Returns one page of the team stats table.
+
+    Args:
+        sort (string): column to sort by (any of COLUMNS or "TEAM")
+        order (string): "desc" for best first, "asc" for worst first
+        query (string): case-insensitive team name filter
+        conference (string): "East" or "West" to restrict to one conference
+        page (int): 1-based page number
+        per_page (int): teams per page (capped at 30)
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        dictionary: the page of teams and paging details, or None if no stats are available
+    """
+    table = get_aggregates(league_id)
+    if table is None:
+        return None
+    if sort not in table["rankings"]:
+        sort = "W_PCT"
+    per_page = min(max(1, int(per_page)), 30)
+    return _page(table, league_id, sort, order != "asc", query.strip().lower(),
+                 conference if conference in ("East", "West") else "", int(page), per_page)
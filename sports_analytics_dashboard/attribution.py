@@ -0,0 +1,157 @@
+"""
+Per-feature explanations of why the model favors one team over another.
+
+Every team gets a row of per-feature contributions to its model score (log-odds)
+in the same batched pass that scores it, and the rows are cached with the matchup
+matrix. Explaining a game is then one subtraction of two cached rows: for a linear
+model the difference is coefficient × standardized feature difference × feature
+scale, and it adds up exactly to the gap between the two teams' log-odds.
+
+How contributions are computed depends on the model family. Linear models use
+their coefficients; tree ensembles use the booster's own per-feature contributions
+(XGBoost, LightGBM) or SHAP when it is installed. Other families can be added with
+register_attributor.
+"""
+
+import numpy as np
+
+# (applies(model) -> bool, contributions(model, X) -> (rows × features)), newest first
+_attributors = []
+
+
+def register_attributor(applies, contributions):
+    """
+    Adds a way to attribute a model family's scores to features. Later registrations
+    take precedence.
+
+    Args:
+        applies (callable): applies(model) -> True if `contributions` handles the model
+        contributions (callable): contributions(model, X) -> (rows × features) log-odds
+            contributions for a DataFrame X, or None if unavailable
+    """
+    _attributors.insert(0, (applies, contributions))
+
+
+def _linear_contributions(model, X):
+    return np.asarray(X, dtype=np.float64) * np.ravel(model.coef_)[None, :]
+
+
+def _booster_contributions(model, X):
+    """Per-feature contributions computed by XGBoost or LightGBM (last column is the bias)."""
+    if hasattr(model, "get_booster"):
+        import xgboost
+        return model.get_booster().predict(xgboost.DMatrix(X), pred_contribs=True)[:, :-1]
+    return model.booster_.predict(X, pred_contrib=True)[:, :-1]
+
+
+def _to_log_odds(values, base):
+    """
+    Rescales probability-space contributions row by row so that each row adds up to the
+    log-odds gap between the row's probability and the base probability.
+
+    Args:
+        values (ndarray): (rows × features) contributions in probability
+        base (float): the model's expected probability over the background data
+
+    Returns:
+        ndarray: (rows × features) contributions in log-odds
+    """
+    eps = 1e-6
+    total = values.sum(axis=1)
+    b = np.clip(base, eps, 1 - eps)
+    p = np.clip(base + total, eps, 1 - eps)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        factor = np.where(np.abs(total) > 1e-12,
+                          (np.log(p / (1 - p)) - np.log(b / (1 - b))) / total,
+                          1 / (b * (1 - b)))  # slope of the logit at the base
+    return values * factor[:, None]
+
+
+def _shap_contributions(model, X):
+    """
+    TreeSHAP for other tree ensembles, when the shap package is installed. Gradient
+    boosting explains log-odds directly; forests and single trees average
+    probabilities, so their values are converted to log-odds.
+    """
+    try:
+        import shap
+    except ImportError:
+        return None
+    explainer = shap.TreeExplainer(model, model_output="raw")
+    values = explainer.shap_values(X)
+    if isinstance(values, list):  # one array per class
+        values = values[-1]
+    values = np.asarray(values)
+    values = values[..., -1] if values.ndim == 3 else values
+    if not hasattr(model, "loss"):
+        base = np.ravel(explainer.expected_value)[-1]
+        values = _to_log_odds(values, base)
+    return values
+
+
+register_attributor(lambda model: hasattr(model, "estimators_") or hasattr(model, "tree_"), _shap_contributions)
+register_attributor(lambda model: hasattr(model, "get_booster") or hasattr(model, "booster_"), _booster_contributions)
+register_attributor(lambda model: hasattr(model, "coef_"), _linear_contributions)
+
+
+def contributions(model, X):
+    """
+    Attributes each row's model score to its features.
+
+    Args:
+        model: the fitted classifier
+        X (DataFrame): rows to score, one column per feature
+
+    Returns:
+        ndarray: (rows × features) log-odds contributions, NaN if the model family has
+        no attributor
+    """
+    for applies, fn in _attributors:
+        if applies(model):
+            try:
+                result = fn(model, X)
+            except Exception as e:
+                print(f"⚠️ Feature attribution failed: {e}")
+                result = None
+            if result is not None:
+                return np.asarray(result, dtype=np.float64).reshape(len(X), -1)
+    return np.full((len(X), X.shape[1]), np.nan)
+
+
+def explain(names, home_contrib, away_contrib, home_features, away_features, scale):
+    """
+    Breaks the gap between two teams' scores down by feature.
+
+    Args:
+        names (list): feature names
+        home_contrib (sequence): the home team's per-feature contributions
+        away_contrib (sequence): the away team's per-feature contributions
+        home_features (sequence): the home team's feature values
+        away_features (sequence): the away team's feature values
+        scale (sequence): each feature's spread across the league (standard deviation)
+
+    Returns:
+        list: one dictionary per feature, largest contribution first; contribution is in
+        log-odds (positive favors the home team), or None if attribution is unavailable
+    """
+    gap = np.asarray(home_contrib, dtype=np.float64) - np.asarray(away_contrib, dtype=np.float64)
+    if np.isnan(gap).all():
+        return None
+    home = np.array([np.nan if v is None else v for v in home_features], dtype=np.float64)
+    away = np.array([np.nan if v is None else v for v in away_features], dtype=np.float64)
+    scale = np.asarray(scale, dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        std_diff = np.where(scale > 0, (home - away) / scale, 0.0)
+
+    def clean(v):
+        return None if np.isnan(v) else round(float(v), 4)
+
+    rows = [{
+        "feature": name,
+        "home_value": clean(home[k]),
+        "away_value": clean(away[k]),
+        "std_diff": clean(std_diff[k]),
+        "contribution": clean(gap[k]),
+    } for k, name in enumerate(names)]
+    rows.sort(key=lambda r: -abs(r["contribution"] or 0))
+    return rows
@@ -0,0 +1,400 @@
+"""
+This module maintains Elo ratings for every NBA team.
+
+Ratings are built in a single streaming pass over the game log and then updated
+incrementally, one final at a time. Alongside the live ratings, the engine keeps a
+compact history with one row of team ratings per game date, so the ratings as of
+any date are a binary search and an array lookup rather than a season replay.
+Refreshing from the cached game log (which is in date order) seeks straight to the
+last date already applied, so only new finals are read and parsed.
+"""
+
+from .utils import team_ids, team_index, get_team_id
+from pathlib import Path
+import numpy as np
+import csv
+import io
+
+ELO_STATE_FILE = Path("elo_state.npz")
+GAME_LOG_FILE = Path("game_logs.csv")
+
+BASE_RATING = 1500.0
+MEAN_RATING = 1505.0      # Ratings regress toward this between seasons
+K_FACTOR = 20.0
+HOME_ADVANTAGE = 100.0    # Elo points added to the home team's rating
+SEASON_CARRYOVER = 0.75   # Share of a team's rating kept into a new season
+
+
+def expected_score(rating_diff):
+    """
+    Returns the expected score (win probability) for a given Elo difference.
+
+    Args:
+        rating_diff (float or ndarray): rating of the team minus rating of its opponent
+
+    Returns:
+        float or ndarray: probability that the team wins
+    """
+    return 1.0 / (1.0 + 10 ** (-rating_diff / 400.0))
+
+
+def mov_multiplier(margin, winner_rating_diff):
+    """
+    Scales the K factor by margin of victory, damped for heavy favourites so that
+    blowouts by strong teams don't inflate their ratings.
+
+    Args:
+        margin (float): final point margin
+        winner_rating_diff (float): Elo difference from the winner's point of view
+
+    Returns:
+        float: multiplier applied to K_FACTOR
+    """
+    return ((abs(margin) + 3) ** 0.8) / (7.5 + 0.006 * winner_rating_diff)
+
+
+def _team_idx(team):
+    """Maps a team ID or team name to its row in the rating arrays."""
+    if isinstance(team, str):
+        team = get_team_id(team)
+    return team_index[int(team)]
+
+
+def _seek_date(f, date, column, start):
+    """
+    Finds the first line of a date-ordered CSV whose date is on or after `date`.
+
+    Args:
+        f (file): the CSV opened in binary mode
+        date (string): date to seek to (YYYY-MM-DD)
+        column (int): position of the date column
+        start (int): byte offset of the first data line
+
+    Returns:
+        int: byte offset of that line (the end of the file if there is none)
+    """
+    def line_at(offset):
+        # The first complete line starting at or after `offset`
+        f.seek(offset)
+        if offset > start:
+            f.seek(offset - 1)
+            if f.read(1) != b"\n":
+                f.readline()
+        return f.tell(), f.readline()
+
+    def on_or_after(offset):
+        line = line_at(offset)[1]
+        return not line.strip() or next(csv.reader([line.decode("utf-8")]))[column][:10] >= date
+
+    end = f.seek(0, io.SEEK_END)
+    lo, hi = start, end
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if on_or_after(mid):
+            hi = mid
+        else:
+            lo = mid + 1
+    return line_at(lo)[0]
+
+
+class EloEngine:
+    """
+    Streaming Elo rating engine with an array-backed history of ratings by date.
+    """
+
+    def __init__(self):
+        self.ratings = np.full(len(team_ids), BASE_RATING)
+        self.season_id = None
+        self.processed = set()
+        self._pending = {}
+        self._dates = np.empty(64, dtype="datetime64[D]")
+        self._history = np.empty((64, len(team_ids)), dtype=np.float32)
+        self._size = 0
+
+    # ---------- incremental updates ----------
+
+    def update_game(self, game_id, game_date, home_team_id, away_team_id, home_pts, away_pts, season_id=None):
+        """
+        Applies a single final to the ratings in O(1).
+
+        Args:
+            game_id (string or int): unique game ID, used to skip games already applied
+            game_date (string): date the game was played (YYYY-MM-DD)
+            home_team_id (int): ID of the home team
+            away_team_id (int): ID of the away team
+            home_pts (float): points scored by the home team
+            away_pts (float): points scored by the away team
+            season_id (string): season the game belongs to; ratings regress to the mean when it changes
+
+        Returns:
+            float: Elo points moved from the away team to the home team
+        """
+        game_id = int(game_id)
+        if game_id in self.processed:
+            return 0.0
+
+        if season_id is not None and str(season_id) != self.season_id:
+            if self.season_id is not None:
+                self.ratings = SEASON_CARRYOVER * self.ratings + (1 - SEASON_CARRYOVER) * MEAN_RATING
+            self.season_id = str(season_id)
+
+        home = team_index[int(home_team_id)]
+        away = team_index[int(away_team_id)]
+        margin = float(home_pts) - float(away_pts)
+
+        diff = self.ratings[home] + HOME_ADVANTAGE - self.ratings[away]
+        home_won = margin > 0
+        winner_diff = diff if home_won else -diff
+        k = K_FACTOR * mov_multiplier(margin, winner_diff)
+        shift = k * (float(home_won) - expected_score(diff))
+
+        self.ratings[home] += shift
+        self.ratings[away] -= shift
+        self.processed.add(game_id)
+        self._record(np.datetime64(str(game_date)[:10], "D"))
+        return shift
+
+    def update_from_log_row(self, row):
+        """
+        Consumes one team-level row of a LeagueGameLog (two rows per game). The first
+        row of a game is held until its partner arrives, then the game is applied.
+
+        Args:
+            row (dict): game log row with GAME_ID, GAME_DATE, TEAM_ID, MATCHUP, PTS and SEASON_ID
+        """
+        game_id = int(row["GAME_ID"])
+        if game_id in self.processed or row.get("PTS") in (None, ""):
+            return
+
+        other = self._pending.pop(game_id, None)
+        if other is None:
+            self._pending[game_id] = row
+            return
+
+        home, away = (row, other) if "vs." in row["MATCHUP"] else (other, row)
+        self.update_game(
+            game_id, row["GAME_DATE"],
+            home["TEAM_ID"], away["TEAM_ID"],
+            home["PTS"], away["PTS"],
+            season_id=row.get("SEASON_ID"),
+        )
+
+    def update_from_rows(self, rows):
+        """
+        Streams game log rows (in date order) through the engine.
+
+        Args:
+            rows (iterable of dict): game log rows, e.g. csv.DictReader or DataFrame.to_dict("records")
+
+        Returns:
+            int: number of new games applied
+        """
+        before = len(self.processed)
+        for row in rows:
+            self.update_from_log_row(row)
+        return len(self.processed) - before
+
+    def update_from_csv(self, path=GAME_LOG_FILE, full=False):
+        """
+        Streams a cached game log CSV through the engine without loading it into memory.
+        Rows dated before the last game already applied are skipped with a binary search
+        over the file, so a refresh costs O(log file size + new rows).
+
+        Args:
+            path (Path or string): the game log CSV written by accuracy.fetch_game_logs_with_cache
+            full (bool): read the whole file, e.g. to pick up finals added for earlier dates
+
+        Returns:
+            int: number of new games applied
+        """
+        path = Path(path)
+        if not path.exists():
+            print(f"⚠️ No game log found at {path}")
+            return 0
+        with path.open("rb") as f:
+            header = next(csv.reader([f.readline().decode("utf-8")]))
+            if self._size and not full and "GAME_DATE" in header:
+                f.seek(_seek_date(f, str(self.history_dates[-1]), header.index("GAME_DATE"), f.tell()))
+            text = io.TextIOWrapper(f, encoding="utf-8", newline="")
+            return self.update_from_rows(csv.DictReader(text, fieldnames=header))
+
+    # ---------- history ----------
+
+    def _record(self, date):
+        """Stores the current ratings as the row for `date` (amortised O(1))."""
+        if self._size and self._dates[self._size - 1] >= date:
+            # Same day (or a late-arriving final): fold into the latest row
+            self._history[self._size - 1] = self.ratings
+            return
+        if self._size == len(self._dates):
+            capacity = max(64, 2 * self._size)
+            self._dates = np.resize(self._dates, capacity)
+            self._history = np.resize(self._history, (capacity, len(team_ids)))
+        self._dates[self._size] = date
+        self._history[self._size] = self.ratings
+        self._size += 1
+
+    @property
+    def history_dates(self):
+        """ndarray: game dates with a ratings row, in ascending order."""
+        return self._dates[:self._size]
+
+    @property
+    def history(self):
+        """ndarray: (dates × teams) ratings after each game date, columns ordered like utils.team_ids."""
+        return self._history[:self._size]
+
+    def ratings_as_of(self, date=None, inclusive=True):
+        """
+        Returns every team's rating as of a given date.
+
+        Args:
+            date (string or datetime64): the date to look up; None means the latest ratings
+            inclusive (bool): include games played on `date` (False gives pre-game ratings)
+
+        Returns:
+            ndarray: ratings ordered like utils.team_ids
+        """
+        if date is None:
+            return self.ratings.copy()
+        side = "right" if inclusive else "left"
+        i = np.searchsorted(self.history_dates, np.datetime64(str(date)[:10], "D"), side=side) - 1
+        if i < 0:
+            return np.full(len(team_ids), BASE_RATING)
+        return self.history[i].astype(float)
+
+    def rating(self, team, date=None, inclusive=True):
+        """
+        Returns a single team's rating.
+
+        Args:
+            team (int or string): team ID or team name
+            date (string): the date to look up; None means the latest rating
+            inclusive (bool): include games played on `date`
+
+        Returns:
+            float: the team's Elo rating
+        """
+        return float(self.ratings_as_of(date, inclusive)[_team_idx(team)])
+
+    def win_probability(self, home_team, away_team, date=None):
+        """
+        Returns the home team's Elo win probability, using pre-game ratings for `date`.
+
+        Args:
+            home_team (int or string): team ID or name of the home team
+            away_team (int or string): team ID or name of the away team
+            date (string): game date; None means the latest ratings
+
+        Returns:
+            float: probability that the home team wins
+        """
+        ratings = self.ratings_as_of(date, inclusive=False)
+        diff = ratings[_team_idx(home_team)] + HOME_ADVANTAGE - ratings[_team_idx(away_team)]
+        return float(expected_score(diff))
+
+    def features(self, teams, date=None):
+        """
+        Returns pre-game Elo ratings for many teams at once, for use as model features.
+
+        Args:
+            teams (iterable): team IDs or names
+            date (string): game date; None means the latest ratings
+
+        Returns:
+            ndarray: one rating per team
+        """
+        ratings = self.ratings_as_of(date, inclusive=False)
+        return ratings[[_team_idx(t) for t in teams]]
+
+    # ---------- persistence ----------
+
+    def save(self, path=ELO_STATE_FILE):
+        """
+        Persists ratings, history and processed game IDs.
+
+        Args:
+            path (Path or string): destination .npz file
+        """
+        try:
+            np.savez(
+                path,
+                team_ids=np.array(team_ids, dtype=np.int64),
+                ratings=self.ratings,
+                season_id=np.array(self.season_id or ""),
+                processed=np.fromiter(self.processed, dtype=np.int64, count=len(self.processed)),
+                dates=self.history_dates,
+                history=self.history,
+            )
+            print("💾 Elo state saved.")
+        except Exception as e:
+            print(f"⚠️ Failed to write Elo state: {e}")
+
+    @classmethod
+    def load(cls, path=ELO_STATE_FILE):
+        """
+        Restores a saved engine, or returns a fresh one if no usable state exists.
+
+        Args:
+            path (Path or string): .npz file written by save()
+
+        Returns:
+            EloEngine: the restored engine
+        """
+        engine = cls()
+        path = Path(path)
+        if not path.exists():
+            return engine
+        try:
+            with np.load(path) as state:
+                if list(state["team_ids"]) != team_ids:
+                    print("⚠️ Elo state was built for a different team list, starting fresh.")
+                    return engine
+                engine.ratings = state["ratings"].astype(float)
+                engine.season_id = str(state["season_id"]) or None
+                engine.processed = set(state["processed"].tolist())
+                engine._dates = state["dates"].copy()
+                engine._history = state["history"].copy()
+                engine._size = len(engine._dates)
+            print("📦 Loaded Elo state from cache.")
+        except Exception as e:
+            print(f"⚠️ Failed to read Elo state: {e}")
+            engine = cls()
+        return engine
+
+
+elo_engine = None
+_log_mtime = None
+
+def get_elo_engine(refresh=False):
+    """
+    Returns the shared Elo engine. On first use saved state is loaded, and whenever the
+    cached game log has been rewritten (or `refresh` is set) any finals in it that the
+    engine hasn't seen are applied.
+
+    Args:
+        refresh (bool): re-scan the cached game log for new finals
+
+    Returns:
+        EloEngine: ratings that are current with the game log
+    """
+    global elo_engine, _log_mtime
+    if elo_engine is None:
+        elo_engine = EloEngine.load()
+        refresh = True
+    # Another process may have fetched new finals since this one last looked
+    mtime = GAME_LOG_FILE.stat().st_mtime_ns if GAME_LOG_FILE.exists() else None
+    if refresh or mtime != _log_mtime:
+        _log_mtime = mtime
+        if elo_engine.update_from_csv():
+            elo_engine.save()
+    return elo_engine
+
+
+if __name__ == "__main__":
+    from .utils import team_names
+
+    engine = get_elo_engine()
+    order = np.argsort(-engine.ratings)
+    for i in order:
+        print(f"{team_names[team_ids[i]]:<28} {engine.ratings[i]:.1f}")
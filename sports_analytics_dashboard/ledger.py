@@ -0,0 +1,313 @@
+"""
+Append-only ledger of served predictions, graded as games finish.
+
+Every prediction served by /games is appended to predictions.ledger as one fixed-size
+binary record (game ID, time, model version, team IDs, home win probability and the
+feature snapshot both teams were scored on). The grader reads only the records added
+since its last run, joins in finals from the game log store, and updates running
+accuracy, log-loss, Brier score and calibration counters, so monitoring cost grows
+with new games rather than with the season. The grader state stays bounded: it only
+remembers recently graded games and drops predictions for games that never finished.
+
+Grading runs in the refresh job (after new game logs are ingested, or
+`python -m sports_analytics_dashboard.ledger`); /accuracy.json only reads the last
+graded state and never writes. Each league keeps its own ledger and grader state next
+to its other files.
+"""
+
+from .utils import league_path, DEFAULT_LEAGUE
+from .predictor import FEATURES, model_version
+from . import store
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+import numpy as np
+import json
+import math
+import time
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows: grading runs unlocked
+    fcntl = None
+
+LEDGER_FILE = Path("predictions.ledger")
+GRADER_STATE_FILE = Path("ledger_grader.json")
+CALIBRATION_BINS = 10
+ROLLING_WINDOW = 100  # Games in the rolling accuracy window
+GRADED_MEMORY = 1000  # Recently graded game IDs kept to ignore late re-logs of the same game
+PENDING_MAX_AGE_S = 30 * 86400  # Predictions for games that never finished are dropped after this
+
+RECORD = np.dtype([
+    ("game_id", "<i8"),
+    ("logged_at", "<f8"),
+    ("model_version", "S16"),
+    ("home_id", "<i8"),
+    ("away_id", "<i8"),
+    ("home_prob", "<f4"),
+    ("home_features", "<f4", (len(FEATURES),)),
+    ("away_features", "<f4", (len(FEATURES),)),
+])
+
+# (league_id, game_id, model_version) triples this process has already logged
+_logged = set()
+
+
+def record_prediction(game_id, prediction, league_id=DEFAULT_LEAGUE):
+    """
+    Appends a served prediction to the league's ledger (once per game and model version
+    per process).
+
+    Args:
+        game_id (string): game ID
+        prediction (Prediction): output of predict_win_probability
+        league_id (string): league ID (see utils.LEAGUES)
+    """
+    if not prediction:
+        return
+    version = model_version(league_id)
+    key = (league_id, int(game_id), version)
+    if key in _logged:
+        return
+
+    record = np.zeros(1, dtype=RECORD)
+    record["game_id"] = int(game_id)
+    record["logged_at"] = time.time()
+    record["model_version"] = version.encode()
+    record["home_id"] = prediction.home_team_id
+    record["away_id"] = prediction.away_team_id
+    record["home_prob"] = prediction.home_prob / 100
+    record["home_features"] = [np.nan if v is None else v for v in prediction.home_features]
+    record["away_features"] = [np.nan if v is None else v for v in prediction.away_features]
+
+    try:
+        with league_path(LEDGER_FILE, league_id, create=True).open("ab") as f:
+            f.write(record.tobytes())
+        _logged.add(key)
+    except Exception as e:
+        print(f"⚠️ Failed to append to prediction ledger: {e}")
+
+
+def read_ledger(offset=0, path=LEDGER_FILE):
+    """
+    Reads ledger records starting at a byte offset.
+
+    Args:
+        offset (int): byte offset of the first record to read
+        path (Path or string): the ledger file
+
+    Returns:
+        tuple: (structured array of records, byte offset after the last complete record)
+    """
+    path = Path(path)
+    if not path.exists():
+        return np.zeros(0, dtype=RECORD), offset
+    count = (path.stat().st_size - offset) // RECORD.itemsize
+    if count <= 0:
+        return np.zeros(0, dtype=RECORD), offset
+    records = np.fromfile(path, dtype=RECORD, count=count, offset=offset)
+    return records, offset + count * RECORD.itemsize
+
+
+def _empty_counters():
+    return {
+        "graded": 0,
+        "correct": 0,
+        "log_loss_sum": 0.0,
+        "brier_sum": 0.0,
+        "bin_count": [0] * CALIBRATION_BINS,
+        "bin_prob_sum": [0.0] * CALIBRATION_BINS,
+        "bin_home_wins": [0] * CALIBRATION_BINS,
+    }
+
+
+def load_grader_state(path=GRADER_STATE_FILE):
+    """
+    Loads the grader's progress and counters.
+
+    Returns:
+        dictionary: ledger offset, pending predictions ({game ID: [probability, model
+        version, logged at]}), recently graded game IDs and counters
+    """
+    state = {"offset": 0, "pending": {}, "graded": [], "rolling": [], "overall": _empty_counters(), "by_model": {}}
+    path = Path(path)
+    if path.exists():
+        try:
+            with path.open("r") as f:
+                state.update(json.load(f))
+        except Exception as e:
+            print(f"⚠️ Failed to read grader state: {e}")
+    return state
+
+
+def _update(counters, prob, home_won):
+    """Adds one graded prediction to a set of counters."""
+    p = min(max(prob, 1e-15), 1 - 1e-15)
+    counters["graded"] += 1
+    counters["correct"] += int((prob > 0.5) == home_won)
+    counters["log_loss_sum"] -= math.log(p) if home_won else math.log(1 - p)
+    counters["brier_sum"] += (prob - home_won) ** 2
+    b = min(int(prob * CALIBRATION_BINS), CALIBRATION_BINS - 1)
+    counters["bin_count"][b] += 1
+    counters["bin_prob_sum"][b] += prob
+    counters["bin_home_wins"][b] += int(home_won)
+
+
+@contextmanager
+def _grader_lock(state_path):
+    """Serialises grading across worker processes so no final is counted twice."""
+    if fcntl is None:
+        yield
+        return
+    with open(f"{state_path}.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def grade(ledger_path=None, state_path=None, league_id=DEFAULT_LEAGUE):
+    """
+    Grades every prediction whose game has finished, reading only ledger records
+    added since the last run.
+
+    Args:
+        ledger_path (Path or string): the ledger file (defaults to the league's)
+        state_path (Path or string): the grader state file (defaults to the league's)
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        dictionary: the updated grader state
+    """
+    ledger_path = ledger_path or league_path(LEDGER_FILE, league_id)
+    state_path = state_path or league_path(GRADER_STATE_FILE, league_id, create=True)
+    with _grader_lock(state_path):
+        return _grade(ledger_path, state_path, league_id)
+
+
+def _grade(ledger_path, state_path, league_id):
+    state = load_grader_state(state_path)
+    graded = deque(state["graded"], maxlen=GRADED_MEMORY)
+    recently_graded = set(graded)
+    pending = state["pending"]
+    changed = False
+
+    records, offset = read_ledger(state["offset"], ledger_path)
+    if offset != state["offset"]:
+        state["offset"] = offset
+        changed = True
+    for rec in records:
+        game_id = str(int(rec["game_id"]))
+        if int(game_id) not in recently_graded:
+            # Later predictions for the same game replace earlier ones
+            pending[game_id] = [float(rec["home_prob"]), rec["model_version"].decode(), float(rec["logged_at"])]
+
+    if pending:
+        ids = [gid.zfill(10) for gid in pending]
+        placeholders = ", ".join("?" * len(ids))
+        finals = store.get_connection(store.db_file(league_id)).execute(
+            f"SELECT GAME_ID, WL FROM game_logs WHERE IS_HOME = 1 AND WL IS NOT NULL AND GAME_ID IN ({placeholders})",
+            ids,
+        ).fetchall()
+
+        rolling = deque(state["rolling"], maxlen=ROLLING_WINDOW)
+        for game_id, wl in finals:
+            key = str(int(game_id))
+            prob, version = pending.pop(key)[:2]
+            home_won = wl == "W"
+            _update(state["overall"], prob, home_won)
+            _update(state["by_model"].setdefault(version, _empty_counters()), prob, home_won)
+            rolling.append(int((prob > 0.5) == home_won))
+            graded.append(int(key))
+        state["rolling"] = list(rolling)
+        if finals:
+            changed = True
+            print(f"📝 Graded {len(finals)} predictions.")
+
+        # Postponed or cancelled games never get a final
+        cutoff = time.time() - PENDING_MAX_AGE_S
+        stale = [gid for gid, entry in pending.items() if len(entry) > 2 and entry[2] < cutoff]
+        for gid in stale:
+            del pending[gid]
+        changed = changed or bool(stale)
+
+    if changed:
+        state["graded"] = list(graded)
+        _write_state(state, state_path)
+    return state
+
+
+def _write_state(state, state_path):
+    """Replaces the grader state atomically, so readers never see a partial file."""
+    tmp = f"{state_path}.tmp"
+    try:
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, state_path)
+    except Exception as e:
+        print(f"⚠️ Failed to write grader state: {e}")
+
+
+def summarize(counters):
+    """
+    Turns raw counters into accuracy, log-loss, Brier score and a calibration table.
+
+    Args:
+        counters (dictionary): counters from the grader state
+
+    Returns:
+        dictionary: summary metrics (None where nothing has been graded)
+    """
+    n = counters["graded"]
+    calibration = [
+        {
+            "bin": f"{i / CALIBRATION_BINS:.1f}-{(i + 1) / CALIBRATION_BINS:.1f}",
+            "games": counters["bin_count"][i],
+            "mean_predicted": counters["bin_prob_sum"][i] / counters["bin_count"][i],
+            "home_win_rate": counters["bin_home_wins"][i] / counters["bin_count"][i],
+        }
+        for i in range(CALIBRATION_BINS) if counters["bin_count"][i]
+    ]
+    return {
+        "graded": n,
+        "accuracy": counters["correct"] / n if n else None,
+        "log_loss": counters["log_loss_sum"] / n if n else None,
+        "brier": counters["brier_sum"] / n if n else None,
+        "calibration": calibration,
+    }
+
+
+def monitoring_report(league_id=DEFAULT_LEAGUE):
+    """
+    Returns a league's production monitoring summary as of the last grading run. It
+    only reads the grader state; grading happens in the refresh job (see grade).
+
+    Args:
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        dictionary: overall, rolling and per-model-version metrics plus pending count
+    """
+    state = load_grader_state(league_path(GRADER_STATE_FILE, league_id))
+    rolling = state["rolling"]
+    return {
+        "league": league_id,
+        "overall": summarize(state["overall"]),
+        "rolling_accuracy": sum(rolling) / len(rolling) if rolling else None,
+        "rolling_window": len(rolling),
+        "by_model": {version: summarize(c) for version, c in state["by_model"].items()},
+        "pending": len(state["pending"]),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    from .utils import LEAGUES
+
+    parser = argparse.ArgumentParser(description="Grade served predictions against finals.")
+    parser.add_argument("--league", choices=sorted(LEAGUES), default=DEFAULT_LEAGUE, help="league ID")
+    args = parser.parse_args()
+    grade(league_id=args.league)
+    print(json.dumps(monitoring_report(args.league), indent=2))
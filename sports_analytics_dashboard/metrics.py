@@ -0,0 +1,251 @@
+"""
+Request-level timing and counters for the dashboard, exposed in Prometheus text format.
+
+Collection is switched on with the environment variable DASHBOARD_METRICS=1. When it
+is off every timer is a shared no-op context manager and every counter returns
+immediately, so instrumented hot paths pay only a function call.
+
+Metrics are collected per process. Under a multi-worker server, set
+DASHBOARD_METRICS_DIR to a directory shared by the workers: each worker then writes
+its totals there at most every FLUSH_INTERVAL_S, and /metrics sums every worker's
+file, so a scrape sees the whole server rather than whichever worker answered it.
+Files left by exited workers keep counting, as their requests happened; clear the
+directory when the server starts. Without it, /metrics reports only the worker that
+served the scrape.
+
+Metrics:
+- dashboard_stage_seconds{stage}: histogram of time spent per request stage
+- dashboard_upstream_seconds{endpoint}: histogram of NBA API call latency
+- dashboard_upstream_errors_total{endpoint}: failed NBA API calls
+- dashboard_cache_requests_total{cache, result}: cache hits and misses
+"""
+
+from contextlib import nullcontext
+from pathlib import Path
+import threading
+import json
+import time
+import os
+
+METRICS_ENV = "DASHBOARD_METRICS"
+METRICS_DIR_ENV = "DASHBOARD_METRICS_DIR"
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FLUSH_INTERVAL_S = 5                # How often a worker writes its totals to the shared directory
+
+enabled = os.environ.get(METRICS_ENV, "") not in ("", "0")
+metrics_dir = Path(os.environ[METRICS_DIR_ENV]) if os.environ.get(METRICS_DIR_ENV) else None
+_next_flush = 0.0
+
+_lock = threading.Lock()
+# {(metric name, labels tuple): [bucket counts..., +Inf count, sum]}
+_histograms = {}
+# {(metric name, labels tuple): value}
+_counters = {}
+
+_HELP = {
+    "dashboard_stage_seconds": ("histogram", "Time spent in each request stage."),
+    "dashboard_upstream_seconds": ("histogram", "Latency of NBA API calls."),
+    "dashboard_upstream_errors_total": ("counter", "NBA API calls that raised an error."),
+    "dashboard_cache_requests_total": ("counter", "Cache lookups by cache and result."),
+}
+
+_NULL_TIMER = nullcontext()
+
+
+def observe(name, labels, seconds):
+    """
+    Records one observation in a histogram.
+
+    Args:
+        name (string): metric name
+        labels (tuple): (label, value) pairs
+        seconds (float): observed duration
+    """
+    with _lock:
+        hist = _histograms.get((name, labels))
+        if hist is None:
+            hist = _histograms[(name, labels)] = [0] * (len(BUCKETS) + 1) + [0.0]
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                hist[i] += 1
+                break
+        else:
+            hist[len(BUCKETS)] += 1
+        hist[-1] += seconds
+    _maybe_flush()
+
+
+def increment(name, labels, amount=1):
+    """
+    Increments a counter.
+
+    Args:
+        name (string): metric name
+        labels (tuple): (label, value) pairs
+        amount (int): how much to add
+    """
+    if not enabled:
+        return
+    with _lock:
+        _counters[(name, labels)] = _counters.get((name, labels), 0) + amount
+    _maybe_flush()
+
+
+def _snapshot():
+    with _lock:
+        return {key: list(value) for key, value in _histograms.items()}, dict(_counters)
+
+
+def _maybe_flush():
+    if metrics_dir is not None and time.monotonic() >= _next_flush:
+        flush()
+
+
+def flush():
+    """
+    Writes this process's totals to metrics_dir (see DASHBOARD_METRICS_DIR), replacing
+    its previous file. Does nothing when no directory is configured.
+    """
+    global _next_flush
+    if metrics_dir is None:
+        return
+    _next_flush = time.monotonic() + FLUSH_INTERVAL_S
+    histograms, counters = _snapshot()
+    payload = {
+        "histograms": [[name, labels, hist] for (name, labels), hist in histograms.items()],
+        "counters": [[name, labels, value] for (name, labels), value in counters.items()],
+    }
+    path = metrics_dir / f"metrics_{os.getpid()}.json"
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        metrics_dir.mkdir(parents=True, exist_ok=True)
+        with tmp.open("w") as f:
+            json.dump(payload, f)
+        tmp.replace(path)
+    except Exception as e:
+        print(f"⚠️ Failed to write metrics: {e}")
+
+
+def _collect():
+    """Returns the totals to report: this process's, or every worker's when metrics_dir is set."""
+    if metrics_dir is None:
+        return _snapshot()
+    flush()
+    histograms, counters = {}, {}
+    for path in metrics_dir.glob("metrics_*.json"):
+        try:
+            with path.open("r") as f:
+                payload = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Failed to read {path}: {e}")
+            continue
+        for name, labels, hist in payload["histograms"]:
+            key = (name, tuple(tuple(pair) for pair in labels))
+            total = histograms.setdefault(key, [0] * len(hist))
+            histograms[key] = [a + b for a, b in zip(total, hist)]
+        for name, labels, value in payload["counters"]:
+            key = (name, tuple(tuple(pair) for pair in labels))
+            counters[key] = counters.get(key, 0) + value
+    return histograms, counters
+
+
+class _Timer:
+    """Context manager that records its duration in a histogram (and errors in a counter)."""
+
+    __slots__ = ("name", "labels", "error_counter", "start")
+
+    def __init__(self, name, labels, error_counter=None):
+        self.name = name
+        self.labels = labels
+        self.error_counter = error_counter
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.name, self.labels, time.perf_counter() - self.start)
+        if exc_type is not None and self.error_counter:
+            increment(self.error_counter, self.labels)
+        return False
+
+
+def stage_timer(stage):
+    """
+    Times a request stage, e.g. "todays_games" or "render".
+
+    Args:
+        stage (string): name of the stage
+
+    Returns:
+        context manager: records into dashboard_stage_seconds
+    """
+    if not enabled:
+        return _NULL_TIMER
+    return _Timer("dashboard_stage_seconds", (("stage", stage),))
+
+
+def upstream_call(endpoint):
+    """
+    Times a call to the NBA API and counts it as an error if it raises.
+
+    Args:
+        endpoint (string): name of the nba_api endpoint
+
+    Returns:
+        context manager: records into dashboard_upstream_seconds / dashboard_upstream_errors_total
+    """
+    if not enabled:
+        return _NULL_TIMER
+    return _Timer("dashboard_upstream_seconds", (("endpoint", endpoint),), "dashboard_upstream_errors_total")
+
+
+def cache_hit(cache):
+    """Counts a hit on the named cache."""
+    increment("dashboard_cache_requests_total", (("cache", cache), ("result", "hit")))
+
+
+def cache_miss(cache):
+    """Counts a miss on the named cache."""
+    increment("dashboard_cache_requests_total", (("cache", cache), ("result", "miss")))
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def render_prometheus():
+    """
+    Renders every collected metric in the Prometheus text exposition format, summed
+    over all workers when DASHBOARD_METRICS_DIR is set.
+
+    Returns:
+        string: the metrics page
+    """
+    histograms, counters = _collect()
+
+    lines = []
+    for name, (kind, help_text) in _HELP.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "histogram":
+            for (metric, labels), hist in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(BUCKETS, hist):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+                cumulative += hist[len(BUCKETS)]
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {hist[-1]}")
+                lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+        else:
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
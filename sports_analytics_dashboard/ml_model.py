@@ -10,37 +10,27 @@ import time
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LogisticRegression
 import joblib
-from datetime import datetime
 from nba_api.stats.endpoints import LeagueDashTeamStats
 from .nba import get_last5_games_stats
-from .utils import get_team_id
-
-def get_current_season():
-    """
-    Returns the current NBA season.
-
-    Returns:
-        string: current NBA season
-    """
-    year = datetime.today().year
-    month = datetime.today().month
-    return f"{year}-{str(year + 1)[2:]}" if month >= 10 else f"{year - 1}-{str(year)[2:]}"
+from .predictor import get_model_path
+from .utils import league_path, get_team_id, remember_league_teams, get_current_season, LEAGUES, DEFAULT_LEAGUE
 
 
-def retry_get_last5_games_stats(team_id, retries=3, delay=3):
+def retry_get_last5_games_stats(team_id, retries=3, delay=3, league_id=DEFAULT_LEAGUE):
     """
     Retries the API call to get last 5 game stats up to `retries` times.
 
     Args:
-        team_id (int): NBA team ID.
+        team_id (int): team ID.
         retries (int): Number of retry attempts.
         delay (int): Delay in seconds between retries.
+        league_id (string): league ID (see utils.LEAGUES)
 
     Returns:
         dict: last 5 game stats or empty dictionary on failure.
     """
     for attempt in range(retries):
-        result = get_last5_games_stats(team_id)
+        result = get_last5_games_stats(team_id, league_id)
         if result:
             return result
         print(f"⏳ Retrying team_id {team_id} (attempt {attempt + 1})...")
@@ -49,23 +39,27 @@ def retry_get_last5_games_stats(team_id, retries=3, delay=3):
     return {}
 
 
-def fetch_historical_data():
+def fetch_historical_data(league_id=DEFAULT_LEAGUE):
     """
     Uses current season stats to create and populate a Pandas dataframe
     containing important statistics for later use in determining
     likely outcome.
 
+    Args:
+        league_id (string): league ID (see utils.LEAGUES)
+
     Returns:
         df (Pandas Dataframe): dataframe with team identifiers and necessary statistics
         for calculating likely winner.
     """
-    current_season = get_current_season()
-    stats = LeagueDashTeamStats(season=current_season).get_dict()
+    current_season = get_current_season(league_id)
+    stats = LeagueDashTeamStats(season=current_season, league_id_nullable=league_id).get_dict()
 
     actual_columns = stats["resultSets"][0]["headers"]
     team_data = stats["resultSets"][0]["rowSet"]
 
     df = pd.DataFrame(team_data, columns=actual_columns)
+    remember_league_teams(league_id, dict(zip(df["TEAM_ID"], df["TEAM_NAME"])))
     df = df[["TEAM_ID", "TEAM_NAME", "GP", "W", "L", "W_PCT", "PLUS_MINUS", "TOV", "FGA", "FTA"]]
     df["NET_RATING"] = df["PLUS_MINUS"] / df["GP"]
     df["TURNOVER_PCT"] = (df["TOV"] / (df["FGA"] + (0.44 * df["FTA"]) + df["TOV"])) * 100
@@ -80,9 +74,9 @@ def fetch_historical_data():
 
     for idx, row in df.iterrows():
         team_name = row["TEAM_NAME"]
-        team_id = get_team_id(team_name)
+        team_id = get_team_id(team_name, league_id)
         if team_id:
-            last5 = retry_get_last5_games_stats(team_id)
+            last5 = retry_get_last5_games_stats(team_id, league_id=league_id)
             if last5:
                 df.at[idx, "W_PCT_LAST5"] = last5.get("W_PCT")
                 df.at[idx, "NET_RATING_LAST5"] = last5.get("NET_RATING")
@@ -99,11 +93,15 @@ def fetch_historical_data():
     return df
 
 
-def train_model():
+def train_model(league_id=DEFAULT_LEAGUE):
     """
-    Trains a logistic regression model to predict win probabilites.
+    Trains a logistic regression model to predict win probabilites and saves it to the
+    league's slot in the model registry (see predictor.get_model_path).
+
+    Args:
+        league_id (string): league ID (see utils.LEAGUES)
     """
-    df = fetch_historical_data()
+    df = fetch_historical_data(league_id)
     print("✅ Final training columns:", df.columns.tolist())
 
     print("📊 Nulls per column:\n", df.isna().sum())
@@ -112,7 +110,7 @@ def train_model():
     print(f"🧪 Training on {len(df)} teams after dropping NaNs")
 
     # Optional: Save for debugging
-    df.to_csv("training_data.csv", index=False)
+    df.to_csv(league_path("training_data.csv", league_id, create=True), index=False)
 
     # Define features and target
     X = df[[
@@ -131,10 +129,14 @@ def train_model():
     
     model.fit(X_train, y_train)
     print("✅ Model was trained on:", list(model.feature_names_in_))
-    joblib.dump(model, "win_probability_model.pkl")
+    joblib.dump(model, get_model_path(league_id))
 
-    print("✅ Model trained and saved!")
+    print(f"✅ {LEAGUES[league_id]['name']} model trained and saved!")
 
 
 if __name__ == "__main__":
-    train_model()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train a league's win probability model.")
+    parser.add_argument("--league", choices=sorted(LEAGUES), default=DEFAULT_LEAGUE, help="league ID")
+    train_model(parser.parse_args().league)
\ No newline at end of file
@@ -1,64 +1,116 @@
-"""This module interacts with nba_api and gathers today's NBA games."""
-
-from nba_api.stats.endpoints import ScoreboardV2, LeagueGameLog, LeagueDashTeamStats
-from .utils import get_current_season, get_team_id, team_names, today
+"""This module interacts with nba_api and gathers today's games and team stats for each league."""
+
+from .utils import (get_current_season, get_team_id, get_league_teams, remember_league_teams,
+                    league_path, LEAGUES, DEFAULT_LEAGUE)
+from .profiling import side_effect
+from .records import Game
+from . import metrics
+from datetime import datetime
 from pathlib import Path
 import json
+import time
 
 CACHE_FILE = Path("team_stats_cache.json")
+SCOREBOARD_RETRY_S = 300            # Wait this long before retrying a failed scoreboard fetch
+
+# Today's scoreboard rows per league, fetched on first use rather than at import
+_scoreboards = {}
+
+def stats_cache_file(league_id=DEFAULT_LEAGUE, create=False):
+    """Returns the team stats cache file of a league (see utils.league_path)."""
+    return league_path(CACHE_FILE, league_id, create)
+
+def get_scoreboard_games(league_id=DEFAULT_LEAGUE):
+    """
+    Fetches a league's scoreboard for today once per day. A failed fetch is not
+    retried for SCOREBOARD_RETRY_S.
+
+    Args:
+        league_id (string): league ID (see utils.LEAGUES)
 
-# Fetch scoreboard data
-scoreboard = ScoreboardV2(day_offset = '0', game_date = today, league_id = '00')
-# Convert all of today's games to a dictionary
-games = scoreboard.get_dict()['resultSets'][0]['rowSet']
+    Returns:
+        list: ScoreboardV2 game header rows for today, empty if the fetch failed
+    """
+    from nba_api.stats.endpoints import ScoreboardV2
+
+    today = datetime.today().strftime('%Y-%m-%d')
+    scoreboard = _scoreboards.setdefault(league_id, {"date": None, "games": [], "failed_at": 0})
+    if scoreboard["date"] == today:
+        metrics.cache_hit("scoreboard")
+        return scoreboard["games"]
+    metrics.cache_miss("scoreboard")
+    if time.time() - scoreboard["failed_at"] < SCOREBOARD_RETRY_S:
+        return []
+    try:
+        with side_effect("ScoreboardV2", "network"), metrics.upstream_call("ScoreboardV2"):
+            response = ScoreboardV2(day_offset = '0', game_date = today, league_id = league_id)
+            scoreboard["games"] = response.get_dict()['resultSets'][0]['rowSet']
+    except Exception as e:
+        print(f"⚠️ Could not fetch today's scoreboard: {e}")
+        scoreboard["failed_at"] = time.time()
+        return []
+    scoreboard["date"] = today
+    return scoreboard["games"]
 
 # Function to parse and display game details
-def todays_games():
+def todays_games(league_id=DEFAULT_LEAGUE):
     """
     Parses and formats game details for display.
 
+    Today's slate comes from the local schedule store; the scoreboard is only
+    queried directly if the season schedule couldn't be loaded.
+
+    Args:
+        league_id (string): league ID (see utils.LEAGUES)
+
     Returns:
-        game_list (list): A list of all the NBA games being
+        game_list (list): A Game for each of the league's games being
         played today w/ scheduled time, home team, and away team.
     """
-    game_list = []
-    for game in games:
-        game_id = game[2]  # Game ID
-        home_team = team_names[game[6]]  # Home team
-        away_team = team_names[game[7]]  # Away team
-        game_time = game[4]  # Scheduled time
-
-        game_list.append({
-            "game_id": game_id,
-            "home_team": home_team,
-            "away_team": away_team,
-            "game_time": game_time
-        })
+    from .schedule import games_on, schedule_loaded
+
+    team_names = get_league_teams(league_id)
+    game_list = [Game.from_row(row, team_names) for row in games_on(league_id=league_id)]
+    if not game_list and not schedule_loaded(league_id=league_id):
+        for g in get_scoreboard_games(league_id):
+            home_id, away_id = int(g[6]), int(g[7])
+            game_list.append(Game(
+                game_id=g[2],
+                home_team_id=home_id,
+                away_team_id=away_id,
+                home_team=team_names.get(home_id, str(home_id)),  # Home team
+                away_team=team_names.get(away_id, str(away_id)),  # Away team
+                game_time=g[4]
+            ))
     return game_list
 
-def get_last5_games_stats(team_id):
+def get_last5_games_stats(team_id, league_id=DEFAULT_LEAGUE):
     """
-    Calculates and returns stats over the past 5 games played for a given NBA team.
+    Calculates and returns stats over the past 5 games played for a given team.
 
     Args:
-        team_id (int): the unique identification number of the NBA team
+        team_id (int): the unique identification number of the team
+        league_id (string): league ID (see utils.LEAGUES)
 
     Returns:
         Dictionary: contains the win percentage, avg. plus/minus,
         turnover %, rebounds, and assists.
     """
+    from nba_api.stats.endpoints import LeagueGameLog
     from time import sleep
     import random
 
     max_attempts = 3
     for attempt in range(max_attempts):
         try:
-            log = LeagueGameLog(
-                season=get_current_season(),
-                season_type_all_star="Regular Season",
-                timeout=10  # Shorter timeout to avoid long hangs
-            )
-            df = log.get_data_frames()[0]
+            with metrics.upstream_call("LeagueGameLog"):
+                log = LeagueGameLog(
+                    league_id=league_id,
+                    season=get_current_season(league_id),
+                    season_type_all_star="Regular Season",
+                    timeout=10  # Shorter timeout to avoid long hangs
+                )
+                df = log.get_data_frames()[0]
             team_games = df[df["TEAM_ID"] == team_id].head(5)
 
             if team_games.empty:
@@ -88,29 +140,63 @@ def get_last5_games_stats(team_id):
     print(f"❌ All {max_attempts} attempts failed for team_id {team_id}")
     return {}
 
-def fetch_team_stats():
+def _read_stats_cache(cache_path):
+    """Reads a team stats cache file, returning None if it can't be read."""
+    try:
+        with side_effect(cache_path.name, "file"), cache_path.open("r") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"⚠️ Failed to read cache: {e}")
+        return None
+
+def stats_cache_fresh(league_id=DEFAULT_LEAGUE):
     """
-    Returns performance statistics for all NBA teams with caching.
+    Returns whether a league's cached team stats are within its refresh schedule.
+
+    Args:
+        league_id (string): league ID (see utils.LEAGUES)
 
     Returns:
-        stats (dictionary): contains all NBA teams and their statistics.
+        bool: True if the cache exists and hasn't expired
+    """
+    cache_path = stats_cache_file(league_id)
+    if not cache_path.exists():
+        return False
+    max_age = LEAGUES[league_id]["stats_max_age_s"]
+    return max_age is None or time.time() - cache_path.stat().st_mtime < max_age
+
+def fetch_team_stats(league_id=DEFAULT_LEAGUE):
     """
-    cache_path = CACHE_FILE
+    Returns performance statistics for all teams of a league with caching. The cache
+    is re-fetched once it is older than the league's stats_max_age_s; if that fails
+    the stale cache is served.
+
+    Args:
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        stats (dictionary): contains all teams and their statistics.
+    """
+    from nba_api.stats.endpoints import LeagueDashTeamStats
+
+    cache_path = stats_cache_file(league_id)
 
     # Load from cache if available
-    if cache_path.exists():
-        try:
-            with cache_path.open("r") as f:
-                cached_stats = json.load(f)
+    if stats_cache_fresh(league_id):
+        cached_stats = _read_stats_cache(cache_path)
+        if cached_stats is not None:
             print("📦 Loaded team stats from cache.")
+            metrics.cache_hit("team_stats")
             return cached_stats
-        except Exception as e:
-            print(f"⚠️ Failed to read cache: {e}")
 
+    metrics.cache_miss("team_stats")
     try:
-        print("Fetching stats for current season:", get_current_season())
-        response = LeagueDashTeamStats(season=get_current_season())
+        season = get_current_season(league_id)
+        print(f"Fetching {LEAGUES[league_id]['name']} stats for current season:", season)
+        with side_effect("LeagueDashTeamStats", "network"), metrics.upstream_call("LeagueDashTeamStats"):
+            response = LeagueDashTeamStats(season=season, league_id_nullable=league_id)
         df = response.get_data_frames()[0]
+        remember_league_teams(league_id, dict(zip(df["TEAM_ID"], df["TEAM_NAME"])))
 
         stats = {}
         for _, row in df.iterrows():
@@ -134,11 +220,11 @@ def fetch_team_stats():
                 "AST": row["AST"]
             }
 
-            team_id = get_team_id(team)
+            team_id = get_team_id(team, league_id)
             print(f"🔑 Team ID for {team}: {team_id}")
             if team_id:
                 try:
-                    last5 = get_last5_games_stats(team_id)
+                    last5 = get_last5_games_stats(team_id, league_id)
                     if last5:
                         stats[team]["W_PCT_LAST5"] = last5["W_PCT"]
                         stats[team]["NET_RATING_LAST5"] = last5["NET_RATING"]
@@ -152,7 +238,7 @@ def fetch_team_stats():
 
         # Save to cache
         try:
-            with cache_path.open("w") as f:
+            with stats_cache_file(league_id, create=True).open("w") as f:
                 json.dump(stats, f, indent=2)
             print("💾 Team stats cached.")
         except Exception as e:
@@ -161,4 +247,7 @@ def fetch_team_stats():
         return stats
     except Exception as e:
         print("⚠️ Could not fetch stats from NBA API:", e)
+        if cache_path.exists():
+            print("📦 Serving stale team stats from cache.")
+            return _read_stats_cache(cache_path)
         return None
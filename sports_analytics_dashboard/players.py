@@ -0,0 +1,521 @@
+"""
+Player game logs, rolling player impact and availability-adjusted team features.
+
+Player box score lines are kept in a compact NumPy structured array (one fixed-size
+record per player per game) sorted by player and date and saved as player_logs.npy.
+New lines are merged in with one vectorized sort, and a player's games are a
+contiguous slice found by binary search, so a full season of lines stays cheap to
+update and query.
+
+Rolling per-player impact (exponentially weighted minutes, plus-minus, points,
+rebounds and assists) is updated incrementally as lines arrive: one vectorized step
+per game date, touching only the players who played. Lines that arrive out of order
+or correct earlier ones replay just the affected players.
+
+Players expected to miss a game are listed in availability.json (see set_unavailable).
+adjust_features() takes their contribution out of their team's features, and the
+predictor recomputes only that team's row of the matchup matrix.
+"""
+
+from .utils import league_path, LEAGUES, DEFAULT_LEAGUE
+from .profiling import side_effect
+from . import metrics
+from pathlib import Path
+import numpy as np
+import json
+
+PLAYER_LOG_FILE = Path("player_logs.npy")
+IMPACT_FILE = Path("player_impact.npz")
+AVAILABILITY_FILE = Path("availability.json")
+
+ROLLING_GAMES = 10                   # EWMA span: recent form outweighs the season
+ALPHA = 2 / (ROLLING_GAMES + 1)
+ROSTER_WINDOW_DAYS = 21              # Only players seen within this window of their team's latest game count as out
+REPLACEMENT_PM_PER_MIN = -0.05       # On-court margin per minute of a replacement-level player
+REPLACEMENT_SHARE = 0.5              # Share of a missing player's rebounds and assists others recover
+
+# LeagueGameLog (player mode) columns kept per line
+STATS = ["MIN", "PTS", "REB", "AST", "STL", "BLK", "TOV", "FGA", "FTA", "PLUS_MINUS"]
+RECORD = np.dtype([
+    ("player_id", "<i4"),
+    ("game_id", "<i4"),
+    ("team_id", "<i4"),
+    ("game_date", "<M8[D]"),
+    ("is_home", "i1"),
+] + [(stat.lower(), "<f4") for stat in STATS])
+
+IMPACT_STATS = ["min", "plus_minus", "pts", "reb", "ast"]
+
+
+def to_records(source):
+    """
+    Converts player game log rows to store records.
+
+    Args:
+        source (DataFrame or iterable of dict): rows from LeagueGameLog with
+            player_or_team_abbreviation="P"
+
+    Returns:
+        ndarray: RECORD array
+    """
+    if not hasattr(source, "to_dict"):
+        import pandas as pd
+        source = pd.DataFrame(list(source))
+    records = np.zeros(len(source), dtype=RECORD)
+    if not len(source):
+        return records
+    records["player_id"] = source["PLAYER_ID"].astype(np.int64)
+    records["game_id"] = source["GAME_ID"].astype(np.int64)
+    records["team_id"] = source["TEAM_ID"].astype(np.int64)
+    records["game_date"] = np.array(source["GAME_DATE"].astype(str).str[:10], dtype="M8[D]")
+    records["is_home"] = source["MATCHUP"].astype(str).str.contains("vs.", regex=False)
+    for stat in STATS:
+        values = source[stat] if stat in source else np.nan
+        records[stat.lower()] = np.asarray(values, dtype=np.float64)
+    return records
+
+
+class PlayerLogStore:
+    """
+    Array-backed store of player game lines keyed by (player, game).
+
+    Args:
+        path (Path or string): the .npy file the records are kept in
+    """
+
+    def __init__(self, path=PLAYER_LOG_FILE):
+        self.path = Path(path)
+        self.records = np.zeros(0, dtype=RECORD)
+        self._player_ids = None
+        self._game_order = None
+        if self.path.exists():
+            try:
+                with side_effect(self.path.name, "file"):
+                    self.records = np.load(self.path)
+            except Exception as e:
+                print(f"⚠️ Failed to read player logs: {e}")
+
+    def __len__(self):
+        return len(self.records)
+
+    def merge(self, new):
+        """
+        Inserts or replaces lines, keeping the store sorted by player, date and game.
+
+        Args:
+            new (ndarray): RECORD array
+
+        Returns:
+            tuple: (lines for (player, game) keys not seen before, IDs of players whose
+            stored lines were replaced by different ones)
+        """
+        if not len(new):
+            return new, np.zeros(0, dtype=np.int64)
+        combined = np.concatenate([self.records, new])
+        newer = np.r_[np.zeros(len(self.records), dtype=np.int8), np.ones(len(new), dtype=np.int8)]
+        order = np.lexsort((newer, combined["game_id"], combined["game_date"], combined["player_id"]))
+        combined, newer = combined[order], newer[order]
+
+        # Of each run of identical (player, game) keys keep the last, i.e. the newest line.
+        # Stored lines sort first in their run, so a run's first line says whether the key
+        # was already stored.
+        duplicate = ((combined["player_id"][1:] == combined["player_id"][:-1])
+                     & (combined["game_id"][1:] == combined["game_id"][:-1]))
+        keep = np.r_[~duplicate, True]
+        first = np.r_[True, ~duplicate]
+        kept, stored = combined[keep], combined[first]
+        is_new = newer[keep] == 1
+        was_stored = newer[first] == 0
+        raw = np.dtype((np.void, RECORD.itemsize))
+        changed = is_new & was_stored & (kept.view(raw) != stored.view(raw))
+
+        self.records = kept
+        self._player_ids = self._game_order = None
+        return kept[is_new & ~was_stored], np.unique(kept["player_id"][changed]).astype(np.int64)
+
+    def save(self):
+        """Writes the store atomically."""
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with tmp.open("wb") as f:
+            np.save(f, self.records)
+        tmp.replace(self.path)
+
+    def player_games(self, player_id, n=None):
+        """
+        Returns a player's lines, newest first.
+
+        Args:
+            player_id (int): player ID
+            n (int): maximum number of games
+
+        Returns:
+            ndarray: RECORD array
+        """
+        if self._player_ids is None:
+            self._player_ids = np.ascontiguousarray(self.records["player_id"])
+        ids = self._player_ids
+        lo, hi = np.searchsorted(ids, player_id, "left"), np.searchsorted(ids, player_id, "right")
+        lines = self.records[lo:hi][::-1]
+        return lines[:n] if n else lines
+
+    def game_lines(self, game_id):
+        """
+        Returns every player's line for one game.
+
+        Args:
+            game_id (int or string): game ID
+
+        Returns:
+            ndarray: RECORD array
+        """
+        if self._game_order is None:
+            self._game_order = np.argsort(self.records["game_id"], kind="stable")
+            self._game_ids = self.records["game_id"][self._game_order]
+        ids = self._game_ids
+        lo, hi = np.searchsorted(ids, int(game_id), "left"), np.searchsorted(ids, int(game_id), "right")
+        return self.records[self._game_order[lo:hi]]
+
+
+class PlayerImpact:
+    """
+    Rolling per-player impact, maintained incrementally from new game lines.
+
+    Each tracked player has a row of exponentially weighted averages (IMPACT_STATS),
+    a game count, their most recent team and the date of their last line.
+    """
+
+    def __init__(self):
+        self.player_ids = np.zeros(0, dtype=np.int64)
+        self.games = np.zeros(0, dtype=np.int64)
+        self.team_id = np.zeros(0, dtype=np.int64)
+        self.last_date = np.zeros(0, dtype="M8[D]")
+        self.ewma = np.zeros((0, len(IMPACT_STATS)))
+        self.version = 0
+        self._index = {}
+
+    def _rows(self, player_ids):
+        """Returns row positions for players, adding rows for new ones."""
+        missing = [p for p in dict.fromkeys(player_ids.tolist()) if p not in self._index]
+        if missing:
+            start = len(self.player_ids)
+            self._index.update({p: start + i for i, p in enumerate(missing)})
+            self.player_ids = np.r_[self.player_ids, missing]
+            self.games = np.r_[self.games, np.zeros(len(missing), dtype=np.int64)]
+            self.team_id = np.r_[self.team_id, np.zeros(len(missing), dtype=np.int64)]
+            self.last_date = np.r_[self.last_date, np.full(len(missing), np.datetime64("NaT"), dtype="M8[D]")]
+            self.ewma = np.vstack([self.ewma, np.zeros((len(missing), len(IMPACT_STATS)))])
+        return np.array([self._index[p] for p in player_ids.tolist()], dtype=np.int64)
+
+    def _apply(self, lines):
+        """Folds lines into the averages, one vectorized step per game date."""
+        lines = lines[np.argsort(lines["game_date"], kind="stable")]
+        rows = self._rows(lines["player_id"])
+        values = np.column_stack([lines[stat].astype(np.float64) for stat in IMPACT_STATS])
+        dates = lines["game_date"]
+        bounds = np.flatnonzero(np.r_[True, dates[1:] != dates[:-1], True])
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            r, x = rows[lo:hi], values[lo:hi]
+            played = ~np.isnan(x)
+            first = (self.games[r] == 0)[:, None]
+            blended = np.where(first, x, ALPHA * x + (1 - ALPHA) * self.ewma[r])
+            self.ewma[r] = np.where(played, blended, self.ewma[r])
+            self.games[r] += 1
+            self.team_id[r] = lines["team_id"][lo:hi]
+            self.last_date[r] = dates[lo:hi]
+
+    def update(self, added, replaced, store):
+        """
+        Applies newly stored lines.
+
+        Lines dated after each player's last line are folded in directly; players with
+        backfilled or corrected lines are replayed from the store.
+
+        Args:
+            added (ndarray): RECORD lines not previously in the store
+            replaced (ndarray): IDs of players whose existing lines changed
+            store (PlayerLogStore): the store, already containing the lines
+        """
+        if not len(added) and not len(replaced):
+            return
+        rows = self._rows(added["player_id"])
+        known = self.last_date[rows]
+        late = ~np.isnat(known) & (added["game_date"] <= known)
+        replay = np.union1d(np.unique(added["player_id"][late]), replaced).astype(np.int64)
+        self._apply(added[~np.isin(added["player_id"], replay)])
+
+        if len(replay):
+            r = self._rows(replay)
+            self.games[r] = 0
+            self.ewma[r] = 0
+            self._apply(np.concatenate([store.player_games(p)[::-1] for p in replay.tolist()]))
+        self.version += 1
+
+    def impact(self, player_id):
+        """
+        Returns a player's rolling averages.
+
+        Args:
+            player_id (int): player ID
+
+        Returns:
+            dictionary: games, team_id, last_date and one entry per IMPACT_STATS, or None
+        """
+        i = self._index.get(int(player_id))
+        if i is None:
+            return None
+        result = {"player_id": int(player_id), "games": int(self.games[i]), "team_id": int(self.team_id[i]),
+                  "last_date": str(self.last_date[i])}
+        result.update({stat: float(v) for stat, v in zip(IMPACT_STATS, self.ewma[i])})
+        return result
+
+    def save(self, path, rows):
+        """Writes the averages along with the store size they reflect."""
+        np.savez(path, player_ids=self.player_ids, games=self.games, team_id=self.team_id,
+                 last_date=self.last_date, ewma=self.ewma, rows=np.array(rows))
+
+    @classmethod
+    def load(cls, path, rows):
+        """Loads saved averages, or returns None if they don't match the store."""
+        path = Path(path)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as saved:
+                if int(saved["rows"]) != rows:
+                    return None
+                impact = cls()
+                impact.player_ids = saved["player_ids"]
+                impact.games = saved["games"]
+                impact.team_id = saved["team_id"]
+                impact.last_date = saved["last_date"]
+                impact.ewma = saved["ewma"]
+        except Exception as e:
+            print(f"⚠️ Failed to read player impact: {e}")
+            return None
+        impact._index = {p: i for i, p in enumerate(impact.player_ids.tolist())}
+        return impact
+
+
+# Store and impact per league, loaded on first use and reloaded when another process
+# ingests new lines
+_leagues = {}
+
+def _mtime(path):
+    return path.stat().st_mtime_ns if path.exists() else None
+
+def _league(league_id):
+    path = league_path(PLAYER_LOG_FILE, league_id)
+    state = _leagues.get(league_id)
+    if state is None or state["store_mtime"] != _mtime(path):
+        store = PlayerLogStore(path)
+        impact = PlayerImpact.load(league_path(IMPACT_FILE, league_id), len(store))
+        if impact is None:
+            impact = PlayerImpact()
+            if len(store):
+                print("🧮 Rebuilding player impact from the player log store...")
+                impact.update(store.records, np.zeros(0, dtype=np.int64), store)
+        # Versions start from the file time so keys from before a reload never match
+        impact.version = _mtime(path) or 0
+        state = _leagues[league_id] = {"store": store, "impact": impact, "store_mtime": _mtime(path)}
+    return state
+
+
+def get_player_store(league_id=DEFAULT_LEAGUE):
+    """Returns a league's player log store."""
+    return _league(league_id)["store"]
+
+
+def get_player_impact(league_id=DEFAULT_LEAGUE):
+    """Returns a league's rolling player impact."""
+    return _league(league_id)["impact"]
+
+
+def ingest_player_logs(source, league_id=DEFAULT_LEAGUE):
+    """
+    Stores player game lines and updates rolling impact for the players involved.
+
+    Args:
+        source (DataFrame, iterable of dict or RECORD array): player game log rows
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        int: number of lines not previously stored
+    """
+    state = _league(league_id)
+    store, impact = state["store"], state["impact"]
+    records = source if isinstance(source, np.ndarray) and source.dtype == RECORD else to_records(source)
+    added, replaced = store.merge(records)
+    impact.update(added, replaced, store)
+    try:
+        impact_path = league_path(IMPACT_FILE, league_id, create=True)
+        store.save()
+        impact.save(impact_path, len(store))
+        state["store_mtime"] = _mtime(store.path)
+    except Exception as e:
+        print(f"⚠️ Failed to write player logs: {e}")
+    print(f"💾 Stored {len(added)} new player game lines ({len(replaced)} players corrected).")
+    return len(added)
+
+
+def fetch_player_logs(season=None, league_id=DEFAULT_LEAGUE):
+    """
+    Fetches a season's player game logs in one request and ingests them.
+
+    Args:
+        season (string): season (defaults to the league's current season)
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        int: number of new lines stored, or 0 if the request failed
+    """
+    from nba_api.stats.endpoints import LeagueGameLog
+    from .utils import get_current_season
+
+    season = season or get_current_season(league_id)
+    try:
+        print(f"📥 Fetching {LEAGUES[league_id]['name']} player game logs for {season}")
+        with side_effect("LeagueGameLog", "network"), metrics.upstream_call("LeagueGameLog"):
+            df = LeagueGameLog(league_id=league_id, season=season, player_or_team_abbreviation="P",
+                               season_type_all_star="Regular Season").get_data_frames()[0]
+    except Exception as e:
+        print(f"⚠️ Could not fetch player game logs: {e}")
+        return 0
+    return ingest_player_logs(df, league_id)
+
+
+# Availability per league, kept apart from the player logs so that checking it doesn't
+# load them
+_availability = {}
+
+def get_unavailable(league_id=DEFAULT_LEAGUE):
+    """
+    Returns the players expected to miss their team's next game.
+
+    Args:
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        dictionary: team IDs mapped to tuples of player IDs
+    """
+    state = _availability.setdefault(league_id, {"availability": None, "availability_mtime": None})
+    mtime = _mtime(league_path(AVAILABILITY_FILE, league_id))
+    if state["availability"] is None or mtime != state["availability_mtime"]:
+        unavailable = {}
+        if mtime is not None:
+            try:
+                with league_path(AVAILABILITY_FILE, league_id).open("r") as f:
+                    unavailable = {int(team): tuple(sorted(int(p) for p in players))
+                                   for team, players in json.load(f).items() if players}
+            except Exception as e:
+                print(f"⚠️ Failed to read availability: {e}")
+        state["availability"], state["availability_mtime"] = unavailable, mtime
+    return state["availability"]
+
+
+def set_unavailable(team_id, player_ids, league_id=DEFAULT_LEAGUE):
+    """
+    Records which of a team's players will miss its next game (an empty list clears it).
+
+    Workers that build their own matchup matrix apply the change on their next
+    prediction. With DASHBOARD_SHARED_FEATURES=1 workers read the loader's snapshot
+    instead, and see the change once the loader republishes, within
+    shared.AVAILABILITY_POLL_S.
+
+    Args:
+        team_id (int): team ID
+        player_ids (iterable): IDs of the players who are out
+        league_id (string): league ID (see utils.LEAGUES)
+    """
+    unavailable = dict(get_unavailable(league_id))
+    unavailable[int(team_id)] = tuple(sorted(int(p) for p in player_ids))
+    path = league_path(AVAILABILITY_FILE, league_id, create=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w") as f:
+        json.dump({str(team): list(players) for team, players in unavailable.items() if players}, f, indent=2)
+    tmp.replace(path)
+
+
+def availability_keys(league_id=DEFAULT_LEAGUE):
+    """
+    Identifies the inputs of every adjusted team row: its missing players and the
+    impact version they were measured at. A team's row only needs recomputing when
+    its key changes. Player logs are only loaded when some team has players out.
+
+    Returns:
+        dictionary: team IDs mapped to hashable keys
+    """
+    unavailable = get_unavailable(league_id)
+    if not unavailable:
+        return {}
+    version = get_player_impact(league_id).version
+    return {team: (players, version) for team, players in unavailable.items()}
+
+
+def adjust_features(team_id, features, names, league_id=DEFAULT_LEAGUE):
+    """
+    Takes the contribution of a team's missing players out of its features.
+
+    Only players who played for the team within ROSTER_WINDOW_DAYS of its latest game
+    count: anyone out for longer is already missing from its recent form.
+    A player's share of the team's scoring margin is their on-court plus-minus / 5
+    (five players share every point), less what a replacement-level player would
+    produce in their minutes. Margin-based features move by that amount; rebounds
+    and assists lose the share replacements don't recover.
+
+    Args:
+        team_id (int): team ID
+        features (sequence): the team's feature values, None or NaN where missing
+        names (list): feature names, in the same order as `features`
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        ndarray: adjusted feature values (unchanged if nobody is out)
+    """
+    values = np.array([np.nan if v is None else v for v in features], dtype=np.float64)
+    out = get_unavailable(league_id).get(int(team_id))
+    if not out:
+        return values
+
+    impact = get_player_impact(league_id)
+    on_team = impact.team_id == int(team_id)
+    if not on_team.any():
+        return values
+    latest = impact.last_date[on_team].max()
+    recent = on_team & (impact.last_date >= latest - np.timedelta64(ROSTER_WINDOW_DAYS, "D"))
+    rows = np.flatnonzero(recent & np.isin(impact.player_ids, out))
+    if not len(rows):
+        return values
+    lost = impact.ewma[rows].sum(axis=0)
+    lost = dict(zip(IMPACT_STATS, lost))
+    margin = (lost["plus_minus"] - REPLACEMENT_PM_PER_MIN * lost["min"]) / 5
+
+    col = {name: i for i, name in enumerate(names)}
+    if "NET_RATING" in col and "PLUS_MINUS" in col and np.isfinite(values[col["NET_RATING"]]) \
+            and values[col["NET_RATING"]] != 0:
+        games_played = values[col["PLUS_MINUS"]] / values[col["NET_RATING"]]
+        values[col["PLUS_MINUS"]] -= margin * games_played
+    for name in ("NET_RATING", "NET_RATING_LAST5"):
+        if name in col:
+            values[col[name]] -= margin
+    for name, stat in (("REB", "reb"), ("REB_LAST5", "reb"), ("AST", "ast"), ("AST_LAST5", "ast")):
+        if name in col:
+            values[col[name]] -= (1 - REPLACEMENT_SHARE) * lost[stat]
+    return values
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ingest player game logs and manage player availability.")
+    parser.add_argument("--league", choices=sorted(LEAGUES), default=DEFAULT_LEAGUE, help="league ID")
+    parser.add_argument("--fetch", action="store_true", help="fetch and ingest the current season's player logs")
+    parser.add_argument("--out", nargs="+", type=int, metavar=("TEAM_ID", "PLAYER_ID"),
+                        help="mark players as out for a team's next game (TEAM_ID alone clears the list)")
+    args = parser.parse_args()
+
+    if args.fetch:
+        fetch_player_logs(league_id=args.league)
+    if args.out:
+        set_unavailable(args.out[0], args.out[1:], args.league)
+    for team, players in get_unavailable(args.league).items():
+        print(f"{team}: {', '.join(map(str, players))}")
@@ -1,145 +1,501 @@
 """
-This module predicts the winner of an NBA game using a machine learning model.
+This module predicts the winner of a game using a machine learning model.
 
 It pulls recent team statistics, processes input features, and returns a win prediction based on historical performance data and model inference.
+Predictions for every home/away pairing are computed together in one batched pass and kept in a
+(teams × teams) matchup matrix, which is rebuilt whenever the team stats or the model change.
+Each league has its own model file, team stats, matrix cache and in-memory state, so
+loading one league never touches another's. When players are listed as out (see
+players.set_unavailable), only the affected teams are re-scored and only their rows and
+columns of the matrix change. Each team's per-feature contributions to its score are
+computed in the same batch and cached alongside, so predictions carry an explanation
+at the cost of one subtraction. Predictions are returned as records.Prediction.
 """
 
-from .utils import normalize_team_name
-from .nba import fetch_team_stats
-import pandas as pd
-import joblib
+from .utils import (normalize_team_name, team_ids, team_names, get_league_teams, league_path, stats_fingerprint,
+                    LEAGUES, DEFAULT_LEAGUE)
+from .nba import fetch_team_stats, CACHE_FILE
+from .profiling import side_effect
+from .records import Prediction, TeamStats, STAT_COLUMNS
+from . import attribution
+from . import metrics
+from . import players
+from . import shared
+import numpy as np
+import hashlib
+import time
 import os
 
-# Load model
-model_path = os.path.join(os.path.dirname(__file__), "win_probability_model.pkl")
-try:
-    model = joblib.load(model_path)
-    print("✅ Model loaded.")
-except FileNotFoundError:
-    print("⚠️ Warning: Model file not found. Please train the model first.")
-    model = None
+MATRIX_FILE = CACHE_FILE.with_name("matchup_matrix.npz")
 
-# Pre-load stats
-team_stats = fetch_team_stats()
+FEATURES = list(STAT_COLUMNS)
 
-def get_team_stats():
+# NBA team names in matrix order (same order as utils.team_ids), as they appear in team_stats
+matrix_teams = [normalize_team_name(team_names[team_id]) for team_id in team_ids]
+matrix_index = {team: i for i, team in enumerate(matrix_teams)}
+
+def league_team_ids(league_id=DEFAULT_LEAGUE):
+    """Returns a league's team IDs in matrix order."""
+    return team_ids if league_id == DEFAULT_LEAGUE else sorted(get_league_teams(league_id))
+
+def league_matrix_teams(league_id=DEFAULT_LEAGUE):
+    """
+    Returns a league's team names in matrix order (sorted by team ID).
+
+    Args:
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        list: team names
+    """
+    if league_id == DEFAULT_LEAGUE:
+        return matrix_teams
+    league_teams = get_league_teams(league_id)
+    return [league_teams[team_id].strip() for team_id in league_team_ids(league_id)]
+
+# Model registry: one trained model per league, next to this module
+MODEL_DIR = os.path.dirname(__file__)
+model_path = os.path.join(MODEL_DIR, "win_probability_model.pkl")
+
+def get_model_path(league_id=DEFAULT_LEAGUE):
+    """Returns where a league's trained model is stored."""
+    if league_id == DEFAULT_LEAGUE:
+        return model_path
+    return os.path.join(MODEL_DIR, f"win_probability_model_{league_id}.pkl")
+
+def _model_signature(league_id=DEFAULT_LEAGUE):
+    """Identifies a league's model on disk by its modification time and size."""
+    try:
+        st = os.stat(get_model_path(league_id))
+        return f"{st.st_mtime_ns}:{st.st_size}"
+    except OSError:
+        return "missing"
+
+# Per-league state: model, stats and matrix are loaded on first use so that importing
+# this module stays cheap
+_leagues = {}
+
+def _state(league_id):
+    return _leagues.setdefault(league_id, {
+        "model": None,
+        "model_signature": None,
+        "team_stats": None,
+        "stats_loaded_at": 0.0,
+        "matrix": None,
+        "matrix_source": None,
+        "base": None,          # unadjusted features, strengths and matrix
+        "features": None,      # features after availability adjustments
+        "strength": None,      # per-team model probability the matrix is derived from
+        "contrib": None,       # per-team, per-feature log-odds contributions
+        "scale": None,         # per-feature spread across the league, for standardizing
+        "roster_keys": {},     # team ID -> players.availability_keys() entry applied
+    })
+
+def load_model(league_id=DEFAULT_LEAGUE):
+    """
+    Loads a league's trained model from disk.
+
+    Args:
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        model: the fitted classifier, or None if it hasn't been trained yet
+    """
+    import joblib
+
+    path = get_model_path(league_id)
+    _state(league_id)["model_signature"] = _model_signature(league_id)
+    try:
+        with side_effect(os.path.basename(path), "model"):
+            loaded = joblib.load(path)
+        print("✅ Model loaded.")
+        return loaded
+    except FileNotFoundError:
+        print(f"⚠️ Warning: No {LEAGUES[league_id]['name']} model file found. Please train the model first.")
+        return None
+
+def get_team_stats(league_id=DEFAULT_LEAGUE):
+    """
+    Uses fetch_team_stats() to get the stats of all teams in a league, reloading them
+    once they are older than the league's stats_max_age_s.
+
+    Args:
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        team_stats (dictionary): teams attached to their stats
+    """
+    state = _state(league_id)
+    max_age = LEAGUES[league_id]["stats_max_age_s"]
+    if state["team_stats"] is None or (max_age is not None and time.time() - state["stats_loaded_at"] > max_age):
+        with metrics.stage_timer("fetch_team_stats"):
+            state["team_stats"] = fetch_team_stats(league_id)
+        state["stats_loaded_at"] = time.time()
+    return state["team_stats"]
+
+def reset_team_stats(league_id=DEFAULT_LEAGUE):
+    """Forgets a league's in-memory team stats so the next use re-reads the cache."""
+    _state(league_id)["team_stats"] = None
+
+def get_model(league_id=DEFAULT_LEAGUE):
     """
-    Uses fetch_team_stats() to get the stats of all NBA teams.
+    Returns a league's trained model, loading it on first use or when the file on disk changes.
+
+    Args:
+        league_id (string): league ID (see utils.LEAGUES)
 
     Returns:
-        team_stats (dictionary): NBA teams attached to their stats
+        model: the fitted classifier, or None if it hasn't been trained yet
     """
-    global team_stats
-    if team_stats is None:
-        team_stats = fetch_team_stats()
-    return team_stats
+    state = _state(league_id)
+    if state["model_signature"] != _model_signature(league_id):
+        state["model"] = load_model(league_id)
+    return state["model"]
 
 def get_features(team, stats, feature_keys):
     # print("Inside get_features, team_a keys:", team.keys()) # debug line
     return [stats[team].get(k) for k in feature_keys]
 
-def predict_win_probability(home_team, away_team):
+def model_version(league_id=DEFAULT_LEAGUE):
+    """
+    Returns a short identifier for a league's model file on disk, recorded with every
+    served prediction. It needs no model load, so shared-memory workers report it too.
+
+    Returns:
+        string: 16 hex characters
     """
-    Feeds data to the machine learning model so that it can predict the game winner.
+    return hashlib.sha1(_model_signature(league_id).encode()).hexdigest()[:16]
+
+def matrix_fingerprint(stats, league_id=DEFAULT_LEAGUE):
+    """Hashes the team stats and model signature that a matchup matrix was built from."""
+    return stats_fingerprint(stats, _model_signature(league_id))
+
+def team_feature_matrix(stats, league_id=DEFAULT_LEAGUE):
+    """
+    Lays out every team's features as one array.
 
     Args:
-        home_team (string): team playing at home
-        away_team (string): team playing as visitor
-    
+        stats (dictionary): teams attached to their stats
+        league_id (string): league ID (see utils.LEAGUES)
+
     Returns:
-        dictionary: proabilities
+        ndarray: (teams × FEATURES) in league_matrix_teams order, NaN where missing
+    """
+    return TeamStats.from_cache(stats, league_id).features(league_team_ids(league_id), FEATURES)
+
+def score_teams(features, league_id=DEFAULT_LEAGUE):
     """
-    global team_stats
-    if team_stats is None:
-        print("❌ team_stats is None")
+    Scores teams with one batched predict_proba call and attributes each score to its
+    features in the same pass.
+
+    Args:
+        features (ndarray): (teams × FEATURES), NaN where missing
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        tuple: (each team's model probability, (teams × FEATURES) log-odds contributions),
+        NaN for teams with missing features
+    """
+    import pandas as pd
+
+    strength = np.full(len(features), np.nan)
+    contrib = np.full(features.shape, np.nan)
+    complete = np.flatnonzero(~np.isnan(features).any(axis=1))
+    if len(complete):
+        model = get_model(league_id)
+        X = pd.DataFrame(features[complete], columns=FEATURES)
+        strength[complete] = model.predict_proba(X)[:, 1]
+        contrib[complete] = attribution.contributions(model, X)
+    return strength, contrib
+
+def matrix_from_strengths(strength):
+    """
+    Derives every pairing's home win probability from per-team strengths with the same
+    normalisation as scoring each side separately: p_home / (p_home + p_away).
+
+    Returns:
+        ndarray: (home × away) probabilities, NaN for missing teams and on the diagonal
+    """
+    matrix = strength[:, None] / (strength[:, None] + strength[None, :])
+    np.fill_diagonal(matrix, np.nan)
+    return matrix
+
+def build_matchup_matrix(stats, league_id=DEFAULT_LEAGUE):
+    """
+    Scores every team with one batched predict_proba call and derives the home win
+    probability of every pairing from it.
+
+    Args:
+        stats (dictionary): teams attached to their stats
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        ndarray: (home × away) home win probabilities in league_matrix_teams order; NaN
+        where a team is missing stats and on the diagonal
+    """
+    return matrix_from_strengths(score_teams(team_feature_matrix(stats, league_id), league_id)[0])
+
+def _refresh_team(state, i, team_id, league_id):
+    """Re-scores one team after its availability changed and patches its row and column."""
+    base = state["base"]
+    row = players.adjust_features(team_id, base["features"][i], FEATURES, league_id)
+    state["features"][i] = row
+    p, contrib = score_teams(row[None, :], league_id)
+    p = p[0]
+    state["contrib"][i] = contrib[0]
+    strength = state["strength"]
+    strength[i] = p
+    matrix = state["matrix"]
+    matrix[i, :] = p / (p + strength)
+    matrix[:, i] = strength / (strength + p)
+    matrix[i, i] = np.nan
+
+def _apply_availability(state, league_id):
+    """Re-scores exactly the teams whose missing players changed since the last call."""
+    keys = players.availability_keys(league_id)
+    applied = state["roster_keys"]
+    changed = [team for team in set(keys) | set(applied) if keys.get(team) != applied.get(team)]
+    if not changed:
+        return
+    index = {team_id: i for i, team_id in enumerate(league_team_ids(league_id))}
+    # Copy on first change so the cached base arrays stay untouched
+    if state["matrix"] is state["base"]["matrix"]:
+        state["matrix"] = state["matrix"].copy()
+        state["features"] = state["features"].copy()
+        state["strength"] = state["strength"].copy()
+        state["contrib"] = state["contrib"].copy()
+    for team in changed:
+        if team in index:
+            _refresh_team(state, index[team], team, league_id)
+    state["roster_keys"] = dict(keys)
+
+def _set_base(state, matrix, features, strength, contrib, source):
+    state["base"] = {"matrix": matrix, "features": features, "strength": strength, "contrib": contrib}
+    state["matrix"], state["features"], state["strength"], state["contrib"] = matrix, features, strength, contrib
+    state["scale"] = feature_scale(features)
+    state["roster_keys"] = {}
+    state["matrix_source"] = source
+
+def get_local_matchup_matrix(league_id=DEFAULT_LEAGUE):
+    """
+    Returns this process's matchup matrix for a league, loading it from disk or
+    rebuilding it when the team stats or the model have changed since it was built.
+
+    Args:
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        ndarray: (home × away) home win probabilities, or None if no model or stats are available
+    """
+    state = _state(league_id)
+    model = get_model(league_id)
+    stats = get_team_stats(league_id)
+    if stats is None or model is None:
         return None
 
-    if model is None:
-        print("❌ Model is None, cannot predict.")
+    teams = league_matrix_teams(league_id)
+    source = (id(stats), state["model_signature"], len(teams))
+    if state["matrix"] is not None and state["matrix_source"] == source:
+        metrics.cache_hit("matchup_matrix")
+        _apply_availability(state, league_id)
+        return state["matrix"]
+    metrics.cache_miss("matchup_matrix")
+
+    matrix_file = league_path(MATRIX_FILE, league_id)
+    fingerprint = matrix_fingerprint(stats, league_id)
+    if matrix_file.exists():
+        try:
+            with np.load(matrix_file) as cached:
+                if (str(cached["fingerprint"]) == fingerprint and list(cached["teams"]) == teams
+                        and "contrib" in cached.files):
+                    _set_base(state, cached["matrix"], cached["features"], cached["strength"],
+                              cached["contrib"], source)
+                    print("📦 Loaded matchup matrix from cache.")
+                    _apply_availability(state, league_id)
+                    return state["matrix"]
+        except Exception as e:
+            print(f"⚠️ Failed to read matchup matrix: {e}")
+
+    print("🧮 Building matchup matrix...")
+    features = team_feature_matrix(stats, league_id)
+    strength, contrib = score_teams(features, league_id)
+    _set_base(state, matrix_from_strengths(strength), features, strength, contrib, source)
+    try:
+        np.savez(league_path(MATRIX_FILE, league_id, create=True), matrix=state["matrix"], features=features,
+                 strength=strength, contrib=contrib, teams=np.array(teams), fingerprint=np.array(fingerprint))
+        print("💾 Matchup matrix cached.")
+    except Exception as e:
+        print(f"⚠️ Failed to write matchup matrix: {e}")
+    _apply_availability(state, league_id)
+    return state["matrix"]
+
+def get_team_features(league_id=DEFAULT_LEAGUE):
+    """
+    Returns every team's features as the model currently sees them, i.e. adjusted
+    for players who are out.
+
+    Args:
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        ndarray: (teams × FEATURES) in league_matrix_teams order, or None if no model or
+        stats are available
+    """
+    if get_local_matchup_matrix(league_id) is None:
+        return None
+    return _state(league_id)["features"]
+
+def get_team_contributions(league_id=DEFAULT_LEAGUE):
+    """
+    Returns every team's per-feature contributions to its model score.
+
+    Args:
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        ndarray: (teams × FEATURES) log-odds in league_matrix_teams order, or None if no
+        model or stats are available
+    """
+    if get_local_matchup_matrix(league_id) is None:
         return None
+    return _state(league_id)["contrib"]
+
+def get_feature_scale(league_id=DEFAULT_LEAGUE):
+    """
+    Returns each feature's spread across a league's teams, as used to standardize
+    feature differences in explanations.
 
-    print("🧠 Model is ready, about to predict...")
-    print(f"🏷️ Model classes: {getattr(model, 'classes_', 'N/A')}")
+    Args:
+        league_id (string): league ID (see utils.LEAGUES)
 
+    Returns:
+        ndarray: one standard deviation per FEATURES entry, or None if no model or stats
+        are available
+    """
+    if get_local_matchup_matrix(league_id) is None:
+        return None
+    return _state(league_id)["scale"]
+
+def feature_scale(features):
+    """Each feature's standard deviation across teams, used to standardize differences."""
+    with np.errstate(invalid="ignore"):
+        return np.nan_to_num(np.nanstd(features, axis=0)) if len(features) else np.zeros(len(FEATURES))
+
+def get_matchup_matrix(league_id=DEFAULT_LEAGUE):
+    """
+    Returns a league's precomputed matchup matrix, from the shared segment when a
+    loader process publishes one and from this process otherwise.
+
+    Args:
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        ndarray: (home × away) home win probabilities, or None if no model or stats are available
+    """
+    segment = shared.get_segment(league_id)
+    if segment is not None:
+        matrix = segment.read(lambda s: s.matrix.copy())
+        if matrix is not None:
+            return matrix
+    return get_local_matchup_matrix(league_id)
+
+def _lookup_matchup(i, j, league_id=DEFAULT_LEAGUE):
+    """
+    Returns (home win probability, home features, away features, home contributions,
+    away contributions, feature scale) for two matrix positions, reading the shared
+    segment when available.
+    """
+    segment = shared.get_segment(league_id)
+    if segment is not None:
+        found = segment.matchup(i, j)
+        if found is not None:
+            prob, home_features, away_features, home_contrib, away_contrib, scale = found
+            home_features = [None if np.isnan(v) else v for v in home_features]
+            away_features = [None if np.isnan(v) else v for v in away_features]
+            return prob, home_features, away_features, home_contrib, away_contrib, scale
+
+    matrix = get_local_matchup_matrix(league_id)
+    if matrix is None:
+        return None
+    state = _state(league_id)
+    features, contrib = state["features"], state["contrib"]
+    home_features = [None if np.isnan(v) else float(v) for v in features[i]]
+    away_features = [None if np.isnan(v) else float(v) for v in features[j]]
+    return float(matrix[i, j]), home_features, away_features, contrib[i], contrib[j], state["scale"]
+
+def predict_win_probability(home_team, away_team, league_id=DEFAULT_LEAGUE):
+    """
+    Looks up the model's prediction for a game in the precomputed matchup matrix.
+
+    Args:
+        home_team (string): team playing at home
+        away_team (string): team playing as visitor
+        league_id (string): league ID (see utils.LEAGUES)
+    
+    Returns:
+        Prediction: probabilities, the features both teams were scored on and a
+        per-feature explanation of the gap between them (see attribution.explain),
+        or None if the game can't be scored
+    """
     home_team = normalize_team_name(home_team)
     away_team = normalize_team_name(away_team)
-    print(f"🔍 Normalized names: home={home_team}, away={away_team}")
 
-    print(f"📊 Available stats keys: {sorted(list(team_stats.keys()))}")
+    if league_id == DEFAULT_LEAGUE:
+        index = matrix_index
+    else:
+        # Other leagues learn their teams from their stats, so load those first
+        get_team_stats(league_id)
+        index = {team: i for i, team in enumerate(league_matrix_teams(league_id))}
+    i = index.get(home_team)
+    j = index.get(away_team)
+    if i is None or j is None:
+        print(f"🚫 Unknown team: {home_team if i is None else away_team}")
+        return None
 
-    if home_team not in team_stats:
-        print(f"🚫 Missing stats for home team: {home_team}")
-        print(f"✅ Available teams: {sorted(list(team_stats.keys()))}")
+    found = _lookup_matchup(i, j, league_id)
+    if found is None:
+        print("❌ Model or team stats unavailable, cannot predict.")
         return None
-    if away_team not in team_stats:
-        print(f"🚫 Missing stats for away team: {away_team}")
-        print(f"✅ Available teams: {sorted(list(team_stats.keys()))}")
+    home_win_prob, home_features, away_features, home_contrib, away_contrib, scale = found
+    if np.isnan(home_win_prob):
+        print(f"🚫 Missing stats for {home_team} or {away_team}")
         return None
 
-    features = [
-        "W_PCT", "NET_RATING", "TURNOVER_PCT",
-        "PLUS_MINUS", "TOV", "FGA", "FTA", "REB", "AST",
-        "W_PCT_LAST5", "NET_RATING_LAST5", "TURNOVER_PCT_LAST5", "REB_LAST5", "AST_LAST5"
-    ]
+    away_win_prob = 1 - home_win_prob
+    ids = league_team_ids(league_id)
 
-    try:
-        print(f"🔮 Predicting win probability for {home_team} vs {away_team}")
-        home_features = get_features(home_team, team_stats, features)
-        away_features = get_features(away_team, team_stats, features)
-        print(f"🧬 Keys for {home_team}: {list(team_stats[home_team].keys())}")
-        print(f"🧪 home_features: {home_features}")
-        print(f"🧪 away_features: {away_features}")
-
-        if any(f is None for f in home_features):
-            print(f"⚠️ Incomplete stats for {home_team}:")
-            print(f"    Features expected: {features}")
-            print(f"    Features found: {team_stats[home_team]}")
-            print("❌ Skipping due to missing feature(s)")
-            return None
-        if any(f is None for f in away_features):
-            print(f"⚠️ Incomplete stats for {away_team}:")
-            print(f"    Features expected: {features}")
-            print(f"    Features found: {team_stats[away_team]}")
-            print("❌ Skipping due to missing feature(s)")
-            return None
-
-        home = pd.DataFrame([home_features], columns=features)
-        away = pd.DataFrame([away_features], columns=features)
-
-        print(f"📥 Model input (home): {home}")
-        print(f"📥 Model input (away): {away}")
-
-        print("📤 Predicting with columns (home):", list(home.columns))
-        print("📤 Predicting with columns (away):", list(away.columns))
-        print("✅ Model expects:", list(model.feature_names_in_))
-        home_pred = model.predict_proba(home)
-        away_pred = model.predict_proba(away)
-
-        home_prob = home_pred[0][1]
-        away_prob = away_pred[0][1]
-        total = home_prob + away_prob
-
-        home_win_prob = home_prob / total
-        away_win_prob = away_prob / total
-
-        predicted_winner = home_team if home_win_prob > away_win_prob else away_team
-
-        print(f"✅ Predicted winner: {predicted_winner}")
-        print(f"    {home_team}: {home_win_prob * 100:.2f}%")
-        print(f"    {away_team}: {away_win_prob * 100:.2f}%")
-
-        return {
-            "winner": predicted_winner,
-            "home_team": home_team,
-            "home_prob": round(home_win_prob * 100, 2),
-            "away_team": away_team,
-            "away_prob": round(away_win_prob * 100, 2),
-            "model_input": {
-                home_team: home_features,
-                away_team: away_features
-            }
-        }
+    return Prediction(
+        home_team_id=ids[i],
+        away_team_id=ids[j],
+        home_team=home_team,
+        away_team=away_team,
+        home_prob=round(home_win_prob * 100, 2),
+        away_prob=round(away_win_prob * 100, 2),
+        home_features=home_features,
+        away_features=away_features,
+        explanation=attribution.explain(FEATURES, home_contrib, away_contrib,
+                                        home_features, away_features, scale)
+    )
 
-    except Exception as e:
-        print(f"❌ Error predicting win probability for {home_team} vs. {away_team}: {e}")
+def matchup_matrix_json(league_id=DEFAULT_LEAGUE):
+    """
+    Returns a league's matchup matrix in a JSON-friendly form for analysts.
+
+    Args:
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        dictionary: team order and home win percentages (None where unavailable),
+        rows are home teams and columns are away teams
+    """
+    matrix = get_matchup_matrix(league_id)
+    if matrix is None:
         return None
+    return {
+        "league": league_id,
+        "teams": league_matrix_teams(league_id),
+        "home_win_pct": [
+            [None if np.isnan(p) else round(float(p) * 100, 2) for p in row]
+            for row in matrix
+        ]
+    }
@@ -0,0 +1,199 @@
+"""
+Startup profiling for the Flask app.
+
+Reports how long a cold start spends importing each module and how long module-level
+side effects (network calls, model loading, file I/O) take. Set the environment
+variable DASHBOARD_PROFILE_STARTUP=1 to record side effects in-process, or run
+
+    python -m sports_analytics_dashboard.profiling [--budget SECONDS] [--warm]
+
+to profile a cold start in a fresh interpreter and fail when it exceeds the budget or
+pulls in one of HEAVY_MODULES. tests/test_profiling.py runs the same check.
+
+This module is imported by nba and predictor, so it must stay free of heavy imports.
+"""
+
+from contextlib import contextmanager
+import os
+import time
+
+PROFILE_ENV = "DASHBOARD_PROFILE_STARTUP"
+STARTUP_BUDGET_S = 1.5  # Cold import of the app must stay under this (seconds)
+APP_MODULE = "sports_analytics_dashboard"
+
+# Modules that must only be imported on first use, never by importing the app
+HEAVY_MODULES = ("pandas", "sklearn", "scipy", "joblib", "nba_api.stats.endpoints")
+
+enabled = os.environ.get(PROFILE_ENV, "") not in ("", "0")
+
+# Recorded side effects: {"label", "kind", "seconds"}
+startup_events = []
+
+
+@contextmanager
+def side_effect(label, kind):
+    """
+    Times a block that performs a side effect when profiling is enabled.
+
+    Args:
+        label (string): what is being done, e.g. an endpoint or file name
+        kind (string): "network", "model" or "file"
+    """
+    if not enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_events.append({
+            "label": label,
+            "kind": kind,
+            "seconds": time.perf_counter() - start,
+        })
+
+
+def parse_importtime(stderr):
+    """
+    Parses the output of `python -X importtime`.
+
+    Args:
+        stderr (string): the interpreter's stderr
+
+    Returns:
+        list: {"module", "self_s", "cumulative_s"} dicts, slowest cumulative first
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, module = line[len("import time:"):].split("|", 2)
+            rows.append({
+                "module": module.strip(),
+                "self_s": int(self_us) / 1e6,
+                "cumulative_s": int(cumulative_us) / 1e6,
+            })
+        except ValueError:
+            continue
+    rows.sort(key=lambda r: -r["cumulative_s"])
+    return rows
+
+
+_CHILD_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+import_s = time.perf_counter() - start
+heavy = [m for m in {heavy!r} if m in sys.modules]
+warm_s = None
+if {warm}:
+    from sports_analytics_dashboard import predictor
+    start = time.perf_counter()
+    predictor.get_matchup_matrix()
+    warm_s = time.perf_counter() - start
+from sports_analytics_dashboard import profiling
+print("@@PROFILE@@" + json.dumps({{"import_s": import_s, "warm_s": warm_s, "heavy": heavy,
+                                   "events": profiling.startup_events}}))
+"""
+
+
+def profile_startup(warm=False, module=APP_MODULE):
+    """
+    Imports the app in a fresh interpreter and reports where the time went.
+
+    Args:
+        warm (bool): also time the first model/stats load (matchup matrix build)
+        module (string): module to import cold (the app by default)
+
+    Returns:
+        dictionary: total import time, per-module import times, the HEAVY_MODULES the
+        import pulled in and side-effect timings
+    """
+    import json
+    import subprocess
+    import sys
+
+    # Make sure the child can import the package no matter where we were started from
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env[PROFILE_ENV] = "1"
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD_SCRIPT.format(warm=bool(warm), module=module, heavy=HEAVY_MODULES)],
+        env=env, capture_output=True, text=True,
+    )
+    payload = next((line[len("@@PROFILE@@"):] for line in proc.stdout.splitlines()
+                    if line.startswith("@@PROFILE@@")), None)
+    if proc.returncode != 0 or payload is None:
+        raise RuntimeError(f"Startup profiling failed:\n{proc.stderr[-2000:]}")
+
+    report = json.loads(payload)
+    report["imports"] = parse_importtime(proc.stderr)
+    return report
+
+
+def print_report(report, top=15):
+    """
+    Prints a startup report produced by profile_startup().
+
+    Args:
+        report (dictionary): the report to print
+        top (int): number of slowest imports to show
+    """
+    print(f"🚀 Cold import: {report['import_s'] * 1000:.1f} ms")
+    if report.get("heavy"):
+        print(f"🐘 Heavy modules imported at startup: {', '.join(report['heavy'])}")
+    if report.get("warm_s") is not None:
+        print(f"🔥 First prediction warm-up: {report['warm_s'] * 1000:.1f} ms")
+    print("📦 Slowest imports (cumulative):")
+    for row in report["imports"][:top]:
+        print(f"    {row['cumulative_s'] * 1000:8.1f} ms  (self {row['self_s'] * 1000:6.1f} ms)  {row['module']}")
+    if report["events"]:
+        print("⏱️ Side effects:")
+        for event in report["events"]:
+            print(f"    {event['seconds'] * 1000:8.1f} ms  [{event['kind']}]  {event['label']}")
+
+
+def check_startup_budget(budget_s=STARTUP_BUDGET_S, runs=3, module=APP_MODULE):
+    """
+    Checks that a cold import of the app stays under a time budget and doesn't import
+    any of HEAVY_MODULES. The fastest of several runs is used to keep the check stable
+    on noisy machines.
+
+    Args:
+        budget_s (float): allowed cold import time in seconds
+        runs (int): number of cold starts to measure
+        module (string): module to import cold (the app by default)
+
+    Returns:
+        tuple: (passed, fastest import time in seconds, report of the fastest run)
+    """
+    reports = [profile_startup(module=module) for _ in range(runs)]
+    fastest = min(reports, key=lambda r: r["import_s"])
+    passed = fastest["import_s"] <= budget_s and not any(r["heavy"] for r in reports)
+    return passed, fastest["import_s"], fastest
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Profile the dashboard's cold start.")
+    parser.add_argument("--budget", type=float, default=None, help="fail if cold import exceeds this many seconds")
+    parser.add_argument("--warm", action="store_true", help="also time the first model/stats load")
+    args = parser.parse_args()
+
+    if args.budget is not None:
+        passed, seconds, report = check_startup_budget(args.budget)
+        print_report(report)
+        if report["heavy"]:
+            print(f"❌ Cold import pulled in {', '.join(report['heavy'])}")
+            sys.exit(1)
+        if not passed:
+            print(f"❌ Cold import took {seconds:.3f}s, over the {args.budget:.3f}s budget")
+            sys.exit(1)
+        print(f"✅ Cold import took {seconds:.3f}s, within the {args.budget:.3f}s budget")
+    else:
+        print_report(profile_startup(warm=args.warm))
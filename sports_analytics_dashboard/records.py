@@ -0,0 +1,228 @@
+"""
+Typed, compact records for games, team stats and predictions.
+
+Single items are slotted dataclasses with integer team IDs, so a typo in a field name
+fails loudly instead of silently reading a missing dictionary key. Bulk collections
+are NumPy arrays: a season of games is one structured array (29 bytes per game) and
+a league's team stats are one (teams × columns) float array with an ID index, so
+multi-season working sets stay small and lookups are positional. Games and team
+stats are packed from the formats they are stored in (schedule store rows, team stats
+JSON); games and predictions convert to the JSON served to the browser.
+"""
+
+from .utils import normalize_team_name, get_league_teams, DEFAULT_LEAGUE
+from dataclasses import dataclass
+import numpy as np
+
+# Team stat columns, in the order stored by fetch_team_stats (and used as model features)
+STAT_COLUMNS = (
+    "W_PCT", "NET_RATING", "TURNOVER_PCT",
+    "PLUS_MINUS", "TOV", "FGA", "FTA", "REB", "AST",
+    "W_PCT_LAST5", "NET_RATING_LAST5", "TURNOVER_PCT_LAST5", "REB_LAST5", "AST_LAST5",
+)
+
+GAME_ID_WIDTH = 10  # Game IDs are zero-padded, e.g. "0022400061"
+
+GAME = np.dtype([
+    ("game_id", "<i8"),
+    ("game_date", "M8[D]"),
+    ("home_team_id", "<i4"),
+    ("away_team_id", "<i4"),
+    ("status", "i1"),
+    ("home_score", "<i2"),
+    ("away_score", "<i2"),
+])
+
+
+def format_game_id(game_id):
+    """Returns a game ID in its zero-padded string form."""
+    return str(int(game_id)).zfill(GAME_ID_WIDTH)
+
+
+def team_name_index(league_id=DEFAULT_LEAGUE):
+    """Maps every normalized team name of a league to its team ID."""
+    return {normalize_team_name(name): team_id for team_id, name in get_league_teams(league_id).items()}
+
+
+@dataclass(slots=True)
+class Prediction:
+    """One game's prediction, as returned by predictor.predict_win_probability."""
+    home_team_id: int
+    away_team_id: int
+    home_team: str
+    away_team: str
+    home_prob: float                # percent
+    away_prob: float                # percent
+    home_features: list             # features the home team was scored on (None where missing)
+    away_features: list
+    explanation: list = None        # see attribution.explain
+
+    @property
+    def winner(self):
+        """string: the team with the higher win probability (the away team on a tie)."""
+        return self.home_team if self.home_prob > self.away_prob else self.away_team
+
+    def to_dict(self):
+        """Returns the prediction in the JSON form served by the API."""
+        return {
+            "winner": self.winner,
+            "home_team": self.home_team,
+            "home_prob": self.home_prob,
+            "away_team": self.away_team,
+            "away_prob": self.away_prob,
+            "model_input": {
+                self.home_team: self.home_features,
+                self.away_team: self.away_features
+            },
+            "explanation": self.explanation
+        }
+
+
+@dataclass(slots=True)
+class Game:
+    """One scheduled game, with its prediction once one has been made."""
+    game_id: str
+    home_team_id: int
+    away_team_id: int
+    home_team: str
+    away_team: str
+    game_time: str
+    game_date: str = None
+    prediction: Prediction = None
+
+    @classmethod
+    def from_row(cls, row, team_names):
+        """
+        Builds a game from a schedule store row (see schedule.games_between).
+
+        Args:
+            row (dictionary): schedule row
+            team_names (dictionary): team ID -> name for the row's league
+
+        Returns:
+            Game
+        """
+        home_id, away_id = int(row["home_team_id"]), int(row["away_team_id"])
+        return cls(row["game_id"], home_id, away_id,
+                   team_names.get(home_id, str(home_id)), team_names.get(away_id, str(away_id)),
+                   row["status_text"], row.get("game_date"))
+
+    def to_dict(self):
+        """Returns the game (and its prediction) in the JSON form served by the API."""
+        return {
+            "game_id": self.game_id,
+            "game_date": self.game_date,
+            "home_team": self.home_team,
+            "away_team": self.away_team,
+            "game_time": self.game_time,
+            "win_probabilities": self.prediction.to_dict() if self.prediction else None
+        }
+
+
+class GameTable:
+    """
+    A collection of games stored as one structured array (see GAME).
+
+    Args:
+        games (ndarray): structured array with the GAME dtype
+    """
+
+    __slots__ = ("games",)
+
+    def __init__(self, games=None):
+        self.games = np.zeros(0, dtype=GAME) if games is None else games
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Packs schedule store rows (see schedule.games_between) into a table.
+
+        Args:
+            rows (list): schedule rows
+
+        Returns:
+            GameTable
+        """
+        games = np.zeros(len(rows), dtype=GAME)
+        if rows:
+            games["game_id"] = [int(r["game_id"]) for r in rows]
+            games["game_date"] = [r["game_date"] for r in rows]
+            games["home_team_id"] = [r["home_team_id"] for r in rows]
+            games["away_team_id"] = [r["away_team_id"] for r in rows]
+            games["status"] = [r["status"] or 0 for r in rows]
+            games["home_score"] = [r["home_score"] or 0 for r in rows]
+            games["away_score"] = [r["away_score"] or 0 for r in rows]
+        return cls(games)
+
+    def __len__(self):
+        return len(self.games)
+
+    @property
+    def game_ids(self):
+        """list: zero-padded game IDs in table order."""
+        return [format_game_id(game_id) for game_id in self.games["game_id"].tolist()]
+
+
+class TeamStats:
+    """
+    A league's team stats as one (teams × STAT_COLUMNS) array.
+
+    Args:
+        team_ids (ndarray): team ID of each row
+        team_names (list): team name of each row, as keyed in the stats cache
+        values (ndarray): (teams × STAT_COLUMNS) stats, NaN where missing
+    """
+
+    __slots__ = ("team_ids", "team_names", "values", "index")
+
+    def __init__(self, team_ids, team_names, values):
+        self.team_ids = np.asarray(team_ids, dtype=np.int64)
+        self.team_names = list(team_names)
+        self.values = values
+        self.index = {team_id: i for i, team_id in enumerate(self.team_ids.tolist())}
+
+    @classmethod
+    def from_cache(cls, stats, league_id=DEFAULT_LEAGUE):
+        """
+        Packs the team stats cache (see nba.fetch_team_stats) into an array. Teams
+        whose name isn't known for the league are left out.
+
+        Args:
+            stats (dictionary): team name -> {column: value}
+            league_id (string): league ID (see utils.LEAGUES)
+
+        Returns:
+            TeamStats
+        """
+        by_name = team_name_index(league_id)
+        ids, names, rows = [], [], []
+        for name, team_stats in stats.items():
+            team_id = by_name.get(normalize_team_name(name))
+            if team_id is None:
+                continue
+            ids.append(team_id)
+            names.append(name)
+            rows.append([np.nan if team_stats.get(c) is None else float(team_stats[c]) for c in STAT_COLUMNS])
+        values = np.array(rows, dtype=np.float64).reshape(len(rows), len(STAT_COLUMNS))
+        return cls(ids, names, values)
+
+    def __len__(self):
+        return len(self.team_ids)
+
+    def features(self, team_ids, columns=STAT_COLUMNS):
+        """
+        Gathers the given columns for the given teams in one indexing step.
+
+        Args:
+            team_ids (list): team IDs, one output row each
+            columns (sequence): stat columns, one output column each
+
+        Returns:
+            ndarray: (teams × columns), NaN for teams without stats
+        """
+        cols = [STAT_COLUMNS.index(c) for c in columns]
+        rows = np.array([self.index.get(team_id, -1) for team_id in team_ids], dtype=np.int64)
+        out = np.full((len(rows), len(cols)), np.nan)
+        found = rows >= 0
+        out[found] = self.values[np.ix_(rows[found], cols)]
+        return out
@@ -7,27 +7,168 @@ and predictions.
 
 Routes include:
 - Homepage/dashboard
-- Team statistics display
-- Game winner predictions
+- Team statistics display (HTML and JSON)
+- Game winner predictions with per-feature explanations (today and upcoming days, HTML and JSON)
 - Model evaluation results
+- Matchup probability matrix (heatmap and JSON download)
+- Season projections from Monte Carlo simulation (NBA only)
+- Live prediction accuracy monitoring
+- Prometheus metrics
+
+Every page except /metrics takes ?league= with a league ID from utils.LEAGUES
+(NBA by default).
 """
 
 # Importing Flask app instance from __init__.py
 from sports_analytics_dashboard import app
 from .nba import todays_games
-from .predictor import predict_win_probability
+from .schedule import upcoming_games
+from .utils import get_league_teams, LEAGUES, DEFAULT_LEAGUE
+from .records import Game
+from .predictor import predict_win_probability, matchup_matrix_json
+from .aggregates import stats_page
+from .simulate import project_season
+from . import ledger
+from . import metrics
 # Flask returns rendered templates instead of plain text
-from flask import render_template
+from flask import render_template, jsonify, request, abort
+def _league():
+    """Reads the league ID from ?league=, defaulting to the NBA; unknown leagues are a 404."""
+    league_id = request.args.get("league", DEFAULT_LEAGUE)
+    if league_id not in LEAGUES:
+        abort(404)
+    return league_id
+
+# Every template can link within the current league and offer the others
+@app.context_processor
+def inject_league():
+    league_id = request.args.get("league", DEFAULT_LEAGUE)
+    if league_id not in LEAGUES:
+        league_id = DEFAULT_LEAGUE
+    return {"league": league_id, "league_name": LEAGUES[league_id]["name"], "leagues": LEAGUES}
+
 # Use route() decorator to define root route
 @app.route('/')
 def home():
     return render_template("index.html")
+def _predict(games, league_id):
+    """Attaches a prediction to every game and logs each served prediction to the ledger."""
+    with metrics.stage_timer("predict_win_probability"):
+        for game in games:
+            game.prediction = predict_win_probability(game.home_team, game.away_team, league_id)
+    # Timed on its own so that disk writes don't show up as inference latency
+    with metrics.stage_timer("record_prediction"):
+        for game in games:
+            ledger.record_prediction(game.game_id, game.prediction, league_id)
+    return games
+
+def _todays_predictions(league_id):
+    """Today's games with their predictions, each logged to the ledger."""
+    with metrics.stage_timer("todays_games"):
+        games = todays_games(league_id)
+    return _predict(games, league_id)
+
 # Page showing all games today
 @app.route('/games')
 def games():
-    games = todays_games()
-    for game in games:
-        probabilities = predict_win_probability(game["home_team"], game["away_team"])
-        game["win_probabilities"] = probabilities
+    games = _todays_predictions(_league())
+    with metrics.stage_timer("render"):
+        return render_template("games.html", games=games)
+
+# Same predictions as JSON, including the per-feature explanations
+@app.route('/games.json')
+def games_json():
+    league_id = _league()
+    return jsonify({"league": league_id, "games": [game.to_dict() for game in _todays_predictions(league_id)]})
+
+def _stats_page_from_args():
+    """Reads sorting, filtering and paging options for the stats table from the query string."""
+    return stats_page(
+        sort=request.args.get("sort", "W_PCT"),
+        order=request.args.get("order", "desc"),
+        query=request.args.get("q", ""),
+        conference=request.args.get("conference", ""),
+        page=request.args.get("page", 1, type=int),
+        per_page=request.args.get("per_page", 30, type=int),
+        league_id=_league(),
+    )
+
+def _cacheable(response, table):
+    """Lets browsers and proxies reuse a stats response until the table is rebuilt."""
+    response.set_etag(table["version"])
+    response.cache_control.public = True
+    response.cache_control.max_age = 60
+    return response.make_conditional(request)
+
+# Predictions for the next few days of games
+@app.route('/upcoming')
+def upcoming():
+    league_id = _league()
+    days = min(max(request.args.get("days", 3, type=int), 0), 14)
+    team_names = get_league_teams(league_id)
+    with metrics.stage_timer("upcoming_games"):
+        games = [Game.from_row(row, team_names) for row in upcoming_games(days, league_id=league_id)]
+    slates = {}
+    for game in _predict(games, league_id):
+        slates.setdefault(game.game_date, []).append(game)
+    with metrics.stage_timer("render"):
+        return render_template("upcoming.html", slates=slates, days=days)
+
+# Season and last-N stats for every team
+@app.route('/stats')
+def stats():
+    with metrics.stage_timer("stats"):
+        table = _stats_page_from_args()
+    if table is None:
+        return render_template("stats.html", table=None), 503
+    with metrics.stage_timer("render"):
+        response = app.make_response(render_template("stats.html", table=table))
+    return _cacheable(response, table)
+
+@app.route('/stats.json')
+def stats_json():
+    table = _stats_page_from_args()
+    if table is None:
+        return jsonify({"error": "Team stats unavailable"}), 503
+    return _cacheable(jsonify(table), table)
+
+# Heatmap of home win probability for every home/away pairing
+@app.route('/matchups')
+def matchups():
+    matrix = matchup_matrix_json(_league())
+    return render_template("matchups.html", matrix=matrix)
+
+# Same matrix as JSON; ?download=1 serves it as a file
+@app.route('/matchups.json')
+def matchups_json():
+    league_id = _league()
+    matrix = matchup_matrix_json(league_id)
+    if matrix is None:
+        return jsonify({"error": "Model or team stats unavailable"}), 503
+    response = jsonify(matrix)
+    if request.args.get("download"):
+        response.headers["Content-Disposition"] = f"attachment; filename=matchup_matrix_{league_id}.json"
+    return response
+
+# Projected wins, seeds and playoff odds for the rest of the season (NBA only)
+@app.route('/projections.json')
+def projections_json():
+    if _league() != DEFAULT_LEAGUE:
+        abort(404)
+    n_sims = min(max(request.args.get("sims", 10000, type=int), 100), 50000)
+    seed = request.args.get("seed", 0, type=int)
+    with metrics.stage_timer("project_season"):
+        projections = project_season(n_sims, workers=1, seed=seed)
+    return jsonify({"league": DEFAULT_LEAGUE, "sims": n_sims, "seed": seed, "teams": projections})
+
+# Accuracy of served predictions as of the last grading run (see ledger.grade)
+@app.route('/accuracy.json')
+def accuracy_json():
+    return jsonify(ledger.monitoring_report(_league()))
 
-    return render_template("games.html", games=games)
+# Prometheus scrape endpoint (only when DASHBOARD_METRICS=1)
+@app.route('/metrics')
+def prometheus_metrics():
+    if not metrics.enabled:
+        abort(404)
+    return metrics.render_prometheus(), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
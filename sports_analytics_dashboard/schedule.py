@@ -0,0 +1,395 @@
+"""
+This module keeps the full season schedule in the local game store.
+
+The whole schedule is bulk-loaded once per season with ScheduleLeagueV2 and indexed by
+date and by team. After that only dates with a game past tip-off that isn't final yet
+are refreshed, one ScoreboardV2 call per such date, and only their status and score
+fields change. A date whose refresh fails is left alone for LIVE_RETRY_S by every
+worker, so an upstream outage doesn't put a blocking call in every request. Today's slate, upcoming slates and recent games are then local
+queries instead of one upstream request per calendar day.
+
+Every function takes a league ID; each league's schedule lives in that league's own
+database and is re-pulled on the league's own schedule_max_age_s.
+"""
+
+from .utils import get_current_season, get_team_id, LEAGUES, DEFAULT_LEAGUE
+from .profiling import side_effect
+from . import metrics
+from . import store
+from datetime import datetime, timedelta
+from pathlib import Path
+import time
+
+LIVE_REFRESH_S = 60                 # Minimum gap between scoreboard refreshes for a date
+LIVE_RETRY_S = 300                  # Wait this long before retrying a date whose refresh failed
+LIVE_TIMEOUT_S = 10                 # Scoreboard request timeout (nba_api defaults to 30 s)
+LIVE_LOOKBACK_DAYS = 2              # Unfinished games older than this are left alone
+LOAD_RETRY_S = 300                  # Wait this long before retrying a failed bulk load
+POSTPONED = ("PPD", "Postponed", "Cancelled")  # Status texts of games that won't finish on their date
+
+STATUS_SCHEDULED, STATUS_LIVE, STATUS_FINAL = 1, 2, 3
+
+# The third digit of a game ID is its type: 1 preseason, 2 regular season, 4 playoffs,
+# 5 play-in, 6 NBA Cup knockout rounds
+GAME_TYPE_REGULAR_SEASON = "2"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS schedule (
+    GAME_ID TEXT PRIMARY KEY,
+    SEASON TEXT,
+    GAME_DATE TEXT,
+    GAME_TIME TEXT,
+    HOME_TEAM_ID INTEGER,
+    AWAY_TEAM_ID INTEGER,
+    STATUS INTEGER,
+    STATUS_TEXT TEXT,
+    HOME_SCORE INTEGER,
+    AWAY_SCORE INTEGER,
+    UPDATED_AT REAL,
+    TIPOFF REAL
+);
+CREATE INDEX IF NOT EXISTS idx_schedule_date ON schedule (GAME_DATE);
+CREATE INDEX IF NOT EXISTS idx_schedule_home ON schedule (HOME_TEAM_ID, GAME_DATE);
+CREATE INDEX IF NOT EXISTS idx_schedule_away ON schedule (AWAY_TEAM_ID, GAME_DATE);
+CREATE TABLE IF NOT EXISTS schedule_loads (
+    SEASON TEXT PRIMARY KEY,
+    LOADED_AT REAL
+);
+"""
+
+_initialised = set()
+_load_attempts = {}
+
+
+def _connection(path):
+    """Returns the store connection with the schedule tables created."""
+    conn = store.get_connection(path)
+    key = Path(path).resolve()
+    if key not in _initialised:
+        conn.executescript(SCHEMA)
+        # Stores created before tip-off times were kept get the column; the next bulk load fills it
+        if "TIPOFF" not in {row["name"] for row in conn.execute("PRAGMA table_info(schedule)")}:
+            conn.execute("ALTER TABLE schedule ADD COLUMN TIPOFF REAL")
+        _initialised.add(key)
+    return conn
+
+
+def _parse_date(value):
+    """Normalises the schedule's date formats ("2024-10-22T00:00:00Z", "10/22/2024 00:00:00") to YYYY-MM-DD."""
+    value = str(value or "")
+    if len(value) >= 10 and value[4] == "-":
+        return value[:10]
+    try:
+        return datetime.strptime(value.split(" ")[0], "%m/%d/%Y").strftime("%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def _parse_tipoff(value):
+    """Converts the schedule's UTC tip-off ("2024-10-22T23:30:00Z") to a Unix timestamp, or None."""
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def load_season_schedule(season=None, path=None, league_id=DEFAULT_LEAGUE):
+    """
+    Bulk-loads a season's full schedule in one request.
+
+    Args:
+        season (string): season, e.g. "2024-25" (defaults to the league's current season)
+        path (Path or string): the SQLite database file (defaults to the league's)
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        int: number of games stored
+    """
+    from nba_api.stats.endpoints import ScheduleLeagueV2
+
+    season = season or get_current_season(league_id)
+    path = path or store.db_file(league_id)
+    try:
+        print(f"📅 Loading full {LEAGUES[league_id]['name']} schedule for {season}")
+        with side_effect("ScheduleLeagueV2", "network"), metrics.upstream_call("ScheduleLeagueV2"):
+            df = ScheduleLeagueV2(league_id=league_id, season=season).season_games.get_data_frame()
+    except Exception as e:
+        print(f"⚠️ Could not fetch schedule from NBA API: {e}")
+        return 0
+
+    now = time.time()
+    rows = []
+    for game in df.to_dict("records"):
+        game_date = _parse_date(game.get("gameDateEst") or game.get("gameDate"))
+        if not game_date or not game.get("homeTeam_teamId") or not game.get("awayTeam_teamId"):
+            continue
+        rows.append((
+            str(game["gameId"]).zfill(10), season, game_date, game.get("gameStatusText"),
+            int(game["homeTeam_teamId"]), int(game["awayTeam_teamId"]),
+            int(game.get("gameStatus") or STATUS_SCHEDULED), game.get("gameStatusText"),
+            int(game.get("homeTeam_score") or 0), int(game.get("awayTeam_score") or 0), now,
+            _parse_tipoff(game.get("gameDateTimeUTC")),
+        ))
+
+    conn = _connection(path)
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO schedule (GAME_ID, SEASON, GAME_DATE, GAME_TIME, HOME_TEAM_ID, AWAY_TEAM_ID, "
+            "STATUS, STATUS_TEXT, HOME_SCORE, AWAY_SCORE, UPDATED_AT, TIPOFF) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.execute("INSERT OR REPLACE INTO schedule_loads VALUES (?, ?)", (season, now))
+    print(f"💾 Stored {len(rows)} scheduled games.")
+    return len(rows)
+
+
+def ensure_schedule(season=None, path=None, league_id=DEFAULT_LEAGUE):
+    """
+    Loads the season schedule if it has never been loaded or is older than the league's
+    schedule_max_age_s.
+
+    Args:
+        season (string): season (defaults to the league's current season)
+        path (Path or string): the SQLite database file (defaults to the league's)
+        league_id (string): league ID (see utils.LEAGUES)
+    """
+    season = season or get_current_season(league_id)
+    path = path or store.db_file(league_id)
+    row = _connection(path).execute("SELECT LOADED_AT FROM schedule_loads WHERE SEASON = ?", (season,)).fetchone()
+    if row is None or time.time() - row["LOADED_AT"] > LEAGUES[league_id]["schedule_max_age_s"]:
+        metrics.cache_miss("schedule")
+        key = (league_id, season)
+        if time.time() - _load_attempts.get(key, 0) < LOAD_RETRY_S:
+            return
+        _load_attempts[key] = time.time()
+        load_season_schedule(season, path, league_id)
+    else:
+        metrics.cache_hit("schedule")
+
+
+def schedule_loaded(season=None, path=None, league_id=DEFAULT_LEAGUE):
+    """
+    Returns whether a season's schedule has been bulk-loaded.
+
+    Args:
+        season (string): season (defaults to the league's current season)
+        path (Path or string): the SQLite database file (defaults to the league's)
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        bool: True if the schedule is in the store
+    """
+    season = season or get_current_season(league_id)
+    return _connection(path or store.db_file(league_id)).execute(
+        "SELECT 1 FROM schedule_loads WHERE SEASON = ?", (season,)
+    ).fetchone() is not None
+
+
+def refresh_live(today=None, path=None, league_id=DEFAULT_LEAGUE):
+    """
+    Refreshes status and scores for recent dates with a game that has tipped off (or
+    whose tip-off time is unknown) but isn't final. Postponed games don't count.
+
+    Args:
+        today (string): reference date (YYYY-MM-DD), defaults to today
+        path (Path or string): the SQLite database file (defaults to the league's)
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        int: number of dates refreshed from the scoreboard
+    """
+    from nba_api.stats.endpoints import ScoreboardV2
+
+    today = today or datetime.today().strftime("%Y-%m-%d")
+    path = path or store.db_file(league_id)
+    earliest = (datetime.strptime(today, "%Y-%m-%d") - timedelta(days=LIVE_LOOKBACK_DAYS)).strftime("%Y-%m-%d")
+    conn = _connection(path)
+    now = time.time()
+    postponed = ", ".join("?" * len(POSTPONED))
+    dates = [row["GAME_DATE"] for row in conn.execute(
+        "SELECT GAME_DATE FROM schedule WHERE GAME_DATE BETWEEN ? AND ? "
+        f"AND STATUS != ? AND COALESCE(STATUS_TEXT, '') NOT IN ({postponed}) "
+        "AND (STATUS = ? OR COALESCE(TIPOFF, 0) <= ?) "
+        "GROUP BY GAME_DATE HAVING MAX(UPDATED_AT) < ?",
+        (earliest, today, STATUS_FINAL, *POSTPONED, STATUS_LIVE, now, now - LIVE_REFRESH_S),
+    )]
+
+    for game_date in dates:
+        try:
+            with side_effect("ScoreboardV2", "network"), metrics.upstream_call("ScoreboardV2"):
+                board = ScoreboardV2(game_date=game_date, league_id=league_id,
+                                     timeout=LIVE_TIMEOUT_S).get_normalized_dict()
+        except Exception as e:
+            print(f"⚠️ Could not refresh scoreboard for {game_date}: {e}")
+            # Mark the date as updated in the future, so that no worker polls it for LIVE_RETRY_S
+            with conn:
+                conn.execute("UPDATE schedule SET UPDATED_AT = ? WHERE GAME_DATE = ?",
+                             (time.time() + LIVE_RETRY_S - LIVE_REFRESH_S, game_date))
+            continue
+
+        points = {(str(line["GAME_ID"]), line["TEAM_ID"]): line["PTS"] for line in board.get("LineScore", [])}
+        now = time.time()
+        updates = [(
+            header["GAME_STATUS_ID"], header["GAME_STATUS_TEXT"],
+            points.get((str(header["GAME_ID"]), header["HOME_TEAM_ID"])) or 0,
+            points.get((str(header["GAME_ID"]), header["VISITOR_TEAM_ID"])) or 0,
+            now, str(header["GAME_ID"]).zfill(10),
+        ) for header in board.get("GameHeader", [])]
+        with conn:
+            conn.executemany(
+                "UPDATE schedule SET STATUS = ?, STATUS_TEXT = ?, HOME_SCORE = ?, AWAY_SCORE = ?, UPDATED_AT = ? "
+                "WHERE GAME_ID = ?",
+                updates,
+            )
+            # Touch the date even if the scoreboard was empty so it isn't re-polled immediately
+            conn.execute("UPDATE schedule SET UPDATED_AT = ? WHERE GAME_DATE = ?", (now, game_date))
+    return len(dates)
+
+
+def _rows(cursor):
+    return [{
+        "game_id": row["GAME_ID"],
+        "game_date": row["GAME_DATE"],
+        "game_time": row["GAME_TIME"],
+        "home_team_id": row["HOME_TEAM_ID"],
+        "away_team_id": row["AWAY_TEAM_ID"],
+        "status": row["STATUS"],
+        "status_text": row["STATUS_TEXT"],
+        "home_score": row["HOME_SCORE"],
+        "away_score": row["AWAY_SCORE"],
+    } for row in cursor]
+
+
+def games_between(start, end, path=None, league_id=DEFAULT_LEAGUE):
+    """
+    Returns scheduled games in a date range, in date order.
+
+    Args:
+        start (string): first date (YYYY-MM-DD)
+        end (string): last date (YYYY-MM-DD)
+        path (Path or string): the SQLite database file (defaults to the league's)
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        list: one dictionary per game
+    """
+    return _rows(_connection(path or store.db_file(league_id)).execute(
+        "SELECT * FROM schedule WHERE GAME_DATE BETWEEN ? AND ? ORDER BY GAME_DATE, GAME_ID", (start, end)
+    ))
+
+
+def games_on(game_date=None, path=None, league_id=DEFAULT_LEAGUE):
+    """
+    Returns the slate for one date, with live status and scores refreshed if needed.
+
+    Args:
+        game_date (string): date (YYYY-MM-DD), defaults to today
+        path (Path or string): the SQLite database file (defaults to the league's)
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        list: one dictionary per game
+    """
+    game_date = game_date or datetime.today().strftime("%Y-%m-%d")
+    path = path or store.db_file(league_id)
+    ensure_schedule(path=path, league_id=league_id)
+    refresh_live(path=path, league_id=league_id)
+    return games_between(game_date, game_date, path)
+
+
+def upcoming_games(days=7, start=None, path=None, league_id=DEFAULT_LEAGUE):
+    """
+    Returns every game from `start` (default today) through the following `days` days.
+
+    Args:
+        days (int): number of days after `start` to include
+        start (string): first date (YYYY-MM-DD), defaults to today
+        path (Path or string): the SQLite database file (defaults to the league's)
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        list: one dictionary per game, in date order
+    """
+    start = start or datetime.today().strftime("%Y-%m-%d")
+    end = (datetime.strptime(start, "%Y-%m-%d") + timedelta(days=days)).strftime("%Y-%m-%d")
+    path = path or store.db_file(league_id)
+    ensure_schedule(path=path, league_id=league_id)
+    refresh_live(path=path, league_id=league_id)
+    return games_between(start, end, path)
+
+
+def recent_games(team, n=5, path=None, league_id=DEFAULT_LEAGUE):
+    """
+    Returns a team's `n` most recent finished games, newest first.
+
+    Args:
+        team (int or string): team ID or name
+        n (int): number of games
+        path (Path or string): the SQLite database file (defaults to the league's)
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        list: one dictionary per game
+    """
+    team_id = get_team_id(team, league_id) if isinstance(team, str) else int(team)
+    path = path or store.db_file(league_id)
+    ensure_schedule(path=path, league_id=league_id)
+    return _rows(_connection(path).execute(
+        "SELECT * FROM schedule WHERE (HOME_TEAM_ID = ? OR AWAY_TEAM_ID = ?) AND STATUS = ? "
+        "ORDER BY GAME_DATE DESC LIMIT ?",
+        (team_id, team_id, STATUS_FINAL, int(n)),
+    ))
+
+
+def season_games(season=None, path=None, league_id=DEFAULT_LEAGUE):
+    """
+    Returns every game of a season, played or not, with live status and scores
+    refreshed if needed.
+
+    Args:
+        season (string): season (defaults to the league's current season)
+        path (Path or string): the SQLite database file (defaults to the league's)
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        list: one dictionary per game, in date order
+    """
+    season = season or get_current_season(league_id)
+    path = path or store.db_file(league_id)
+    ensure_schedule(season, path, league_id)
+    refresh_live(path=path, league_id=league_id)
+    return _rows(_connection(path).execute(
+        "SELECT * FROM schedule WHERE SEASON = ? ORDER BY GAME_DATE, GAME_ID", (season,)
+    ))
+
+
+def remaining_games(season=None, path=None, league_id=DEFAULT_LEAGUE):
+    """
+    Returns every game of a season that hasn't finished yet (scheduled or in progress).
+
+    Args:
+        season (string): season (defaults to the league's current season)
+        path (Path or string): the SQLite database file (defaults to the league's)
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        list: one dictionary per game, in date order
+    """
+    season = season or get_current_season(league_id)
+    path = path or store.db_file(league_id)
+    ensure_schedule(season, path, league_id)
+    return _rows(_connection(path).execute(
+        "SELECT * FROM schedule WHERE SEASON = ? AND STATUS != ? ORDER BY GAME_DATE, GAME_ID",
+        (season, STATUS_FINAL),
+    ))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Bulk-load a league's season schedule.")
+    parser.add_argument("--league", choices=sorted(LEAGUES), default=DEFAULT_LEAGUE, help="league ID")
+    parser.add_argument("--season", help="season to load (defaults to the current one)")
+    args = parser.parse_args()
+    load_season_schedule(args.season, league_id=args.league)
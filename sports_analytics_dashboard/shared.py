@@ -0,0 +1,365 @@
+"""
+Shares team features, model coefficients and the matchup matrix across worker processes.
+
+A single loader process (`python -m sports_analytics_dashboard.shared`) publishes them
+into a memory-mapped file. Every worker maps the same file read-only and reads it
+through NumPy views without copying, so memory stays flat as workers are added and a
+refresh is visible to all workers at once. Workers use it when DASHBOARD_SHARED_FEATURES=1.
+Each league has its own segment and its own loader (`--league`), so leagues refresh
+independently. The loader re-reads team stats every `--interval` but checks player
+availability every AVAILABILITY_POLL_S, so a player marked out shortly before tip-off
+reaches shared workers within seconds.
+
+Consistency uses a sequence counter in the header (a seqlock): the loader makes it odd
+while writing and even when done, and readers retry if it was odd or changed while
+they were reading. When a resize makes the loader swap in a new file, it marks the old
+one retired in its header, so readers notice from memory they already have mapped and
+never need to stat the file on the read path.
+
+Layout: 64-byte header, then float64 arrays
+features (teams × features), coef (features), intercept (1), matrix (teams × teams),
+contrib (teams × features), scale (features).
+"""
+
+from .nba import CACHE_FILE
+from .utils import league_path, LEAGUES, DEFAULT_LEAGUE
+import numpy as np
+import hashlib
+import struct
+import json
+import mmap
+import time
+import os
+
+SHARED_ENV = "DASHBOARD_SHARED_FEATURES"
+SHARED_FILE = CACHE_FILE.with_name("team_features.shm")
+REFRESH_INTERVAL_S = 3600
+AVAILABILITY_POLL_S = 5    # How often the loader checks availability.json between stats refreshes
+
+MAGIC = b"SADF"
+RETIRED = b"SADR"          # Magic of a segment that has been replaced by a resized one
+LAYOUT_VERSION = 3
+HEADER = struct.Struct("<4sIQII40s")  # magic, layout version, seq, n_teams, n_features, fingerprint
+HEADER_SIZE = 64
+SEQ_OFFSET = 8
+REOPEN_INTERVAL_S = 1.0    # Wait this long before retrying to map a missing or invalid file
+
+enabled = os.environ.get(SHARED_ENV, "") not in ("", "0")
+
+
+def _size(n_teams, n_features):
+    return HEADER_SIZE + 8 * (2 * n_teams * n_features + 2 * n_features + 1 + n_teams * n_teams)
+
+
+def _views(buffer, n_teams, n_features):
+    """Zero-copy NumPy views over the arrays in a mapped segment."""
+    offset = HEADER_SIZE
+    views = []
+    for shape in ((n_teams, n_features), (n_features,), (1,), (n_teams, n_teams), (n_teams, n_features),
+                  (n_features,)):
+        count = int(np.prod(shape))
+        views.append(np.frombuffer(buffer, dtype=np.float64, count=count, offset=offset).reshape(shape))
+        offset += 8 * count
+    return views
+
+
+def publish(features, coef, intercept, matrix, contrib, scale, fingerprint, path=SHARED_FILE):
+    """
+    Writes a new snapshot into the shared segment, creating or resizing it if needed.
+
+    Args:
+        features (ndarray): (teams × features) feature matrix, NaN where missing
+        coef (ndarray): linear model coefficients (NaN if the model has none)
+        intercept (float): linear model intercept (NaN if the model has none)
+        matrix (ndarray): (home × away) home win probabilities
+        contrib (ndarray): (teams × features) log-odds contributions to each team's score
+        scale (ndarray): each feature's spread across teams (see predictor.feature_scale)
+        fingerprint (string): hex digest identifying the stats and model
+        path (Path or string): the shared file
+
+    Returns:
+        int: the published version
+    """
+    n_teams, n_features = features.shape
+    size = _size(n_teams, n_features)
+    exists = os.path.exists(path)
+
+    if not exists or os.path.getsize(path) != size:
+        # New or resized segment: build it aside and swap it in atomically so that
+        # readers never map a half-sized file
+        old = open(path, "r+b") if exists else None
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, LAYOUT_VERSION, 0, n_teams, n_features, b""))
+            f.truncate(size)
+        os.replace(tmp, path)
+        if old is not None:
+            _retire(old)
+
+    with open(path, "r+b") as f, mmap.mmap(f.fileno(), size) as buf:
+        _, _, seq, _, _, _ = HEADER.unpack_from(buf, 0)
+        seq += 1 if seq % 2 == 0 else 0
+        struct.pack_into("<Q", buf, SEQ_OFFSET, seq)  # odd: write in progress
+
+        out_features, out_coef, out_intercept, out_matrix, out_contrib, out_scale = _views(buf, n_teams, n_features)
+        out_features[:] = features
+        out_coef[:] = coef
+        out_intercept[:] = intercept
+        out_matrix[:] = matrix
+        out_contrib[:] = contrib
+        out_scale[:] = scale
+        HEADER.pack_into(buf, 0, MAGIC, LAYOUT_VERSION, seq, n_teams, n_features,
+                         fingerprint.encode()[:40])
+
+        seq += 1
+        struct.pack_into("<Q", buf, SEQ_OFFSET, seq)  # even: consistent
+        buf.flush()
+        del out_features, out_coef, out_intercept, out_matrix, out_contrib, out_scale
+    return seq // 2
+
+
+def _retire(f):
+    """Marks a replaced segment so readers still mapping it switch to the new file."""
+    with f, mmap.mmap(f.fileno(), 0) as buf:
+        seq = struct.unpack_from("<Q", buf, SEQ_OFFSET)[0]
+        struct.pack_into("<Q", buf, SEQ_OFFSET, seq | 1)  # odd: in-flight reads retry
+        buf[:len(RETIRED)] = RETIRED
+        buf.flush()
+
+
+class SharedFeatures:
+    """
+    Read-only, zero-copy view of the shared segment.
+
+    Args:
+        path (Path or string): the shared file written by publish()
+    """
+
+    def __init__(self, path=SHARED_FILE):
+        self.path = str(path)
+        self.features = self.coef = self.intercept = self.matrix = self.contrib = self.scale = None
+        self._file = None
+        self._buf = None
+        self._retry_at = 0.0
+
+    def _ensure_open(self):
+        """
+        Maps the file on first use and remaps it once the loader has retired the mapped
+        one. While mapped this is a 4-byte memory read; the file system is only touched
+        to (re)open, at most every REOPEN_INTERVAL_S while the file is missing or invalid.
+        """
+        if self._buf is not None:
+            if self._buf[:len(MAGIC)] == MAGIC:
+                return True
+            self.close()  # retired by a resize
+        elif time.monotonic() < self._retry_at:
+            return False
+
+        try:
+            self._file = open(self.path, "rb")
+            self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, layout, _, n_teams, n_features, _ = HEADER.unpack_from(self._buf, 0)
+            valid = (magic == MAGIC and layout == LAYOUT_VERSION
+                     and len(self._buf) == _size(n_teams, n_features))
+        except (OSError, ValueError, struct.error):
+            valid = False
+        if not valid:
+            self.close()
+            self._retry_at = time.monotonic() + REOPEN_INTERVAL_S
+            return False
+        self.features, self.coef, self.intercept, self.matrix, self.contrib, self.scale = _views(
+            self._buf, n_teams, n_features)
+        return True
+
+    def close(self):
+        """Releases the mapping."""
+        self.features = self.coef = self.intercept = self.matrix = self.contrib = self.scale = None
+        if self._buf is not None:
+            self._buf.close()
+        if self._file is not None:
+            self._file.close()
+        self._buf = self._file = None
+
+    def _seq(self):
+        return struct.unpack_from("<Q", self._buf, SEQ_OFFSET)[0]
+
+    def read(self, fn, retries=100):
+        """
+        Calls fn(segment) and retries until it ran against a consistent snapshot.
+        fn must copy anything it returns out of the shared arrays.
+
+        Args:
+            fn (callable): reads from self.features, self.coef, self.intercept, self.matrix,
+                self.contrib and self.scale
+            retries (int): attempts before giving up
+
+        Returns:
+            the result of fn, or None if the segment is missing or never settled
+        """
+        for _ in range(retries):
+            if not self._ensure_open():
+                return None
+            before = self._seq()
+            if before == 0:
+                return None
+            if before % 2:
+                time.sleep(0.0005)
+                continue
+            result = fn(self)
+            if self._seq() == before:
+                return result
+        return None
+
+    @property
+    def version(self):
+        """int: number of snapshots published so far (0 if none)."""
+        return self._seq() // 2 if self._ensure_open() else 0
+
+    def matchup(self, home_idx, away_idx):
+        """
+        Returns the home win probability and both teams' feature and contribution rows
+        for one game.
+
+        Args:
+            home_idx (int): home team's position in utils.team_ids
+            away_idx (int): away team's position in utils.team_ids
+
+        Returns:
+            tuple: (home win probability, home features, away features, home contributions,
+            away contributions, feature spread across teams), or None
+        """
+        return self.read(lambda s: (
+            float(s.matrix[home_idx, away_idx]),
+            s.features[home_idx].tolist(),
+            s.features[away_idx].tolist(),
+            s.contrib[home_idx].copy(),
+            s.contrib[away_idx].copy(),
+            s.scale.copy(),
+        ))
+
+    def snapshot(self):
+        """
+        Returns a consistent copy of every shared array.
+
+        Returns:
+            dictionary: features, coef, intercept, matrix, contrib, scale and version, or None
+        """
+        return self.read(lambda s: {
+            "features": s.features.copy(),
+            "coef": s.coef.copy(),
+            "intercept": float(s.intercept[0]),
+            "matrix": s.matrix.copy(),
+            "contrib": s.contrib.copy(),
+            "scale": s.scale.copy(),
+            "version": s._seq() // 2,
+        })
+
+
+def shared_file(league_id=DEFAULT_LEAGUE, create=False):
+    """Returns the shared segment file of a league (see utils.league_path)."""
+    return league_path(SHARED_FILE, league_id, create)
+
+
+# This process's reader per league
+_segments = {}
+
+def get_segment(league_id=DEFAULT_LEAGUE):
+    """
+    Returns this process's reader for a league's shared segment when sharing is
+    enabled and the league's loader has published at least once.
+
+    Args:
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        SharedFeatures: the reader, or None
+    """
+    if not enabled:
+        return None
+    segment = _segments.get(league_id)
+    if segment is None:
+        segment = _segments[league_id] = SharedFeatures(shared_file(league_id))
+    return segment if segment.version else None
+
+
+def publish_from_predictor(league_id=DEFAULT_LEAGUE):
+    """
+    Loads a league's team stats and model the same way a worker would, and publishes them.
+
+    Args:
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        int: the published version, or None if stats or the model are unavailable
+    """
+    from . import predictor, players
+
+    matrix = predictor.get_local_matchup_matrix(league_id)
+    stats = predictor.get_team_stats(league_id)
+    model = predictor.get_model(league_id)
+    if matrix is None or stats is None or model is None:
+        print("⚠️ Nothing to publish: model or team stats unavailable.")
+        return None
+
+    features = predictor.get_team_features(league_id)
+    coef = np.ravel(getattr(model, "coef_", np.full(len(predictor.FEATURES), np.nan)))
+    intercept = float(np.ravel(getattr(model, "intercept_", [np.nan]))[0])
+    fingerprint = predictor.matrix_fingerprint(stats, league_id)
+    if players.get_unavailable(league_id):
+        # Availability-adjusted snapshots get their own fingerprint
+        payload = fingerprint + json.dumps(sorted(players.availability_keys(league_id).items()))
+        fingerprint = hashlib.sha1(payload.encode()).hexdigest()
+    contrib = predictor.get_team_contributions(league_id)
+    scale = predictor.get_feature_scale(league_id)
+    version = publish(features, coef, intercept, matrix, contrib, scale, fingerprint,
+                      shared_file(league_id, create=True))
+    print(f"📡 Published shared {LEAGUES[league_id]['name']} team features (version {version}).")
+    return version
+
+
+def refresh(league_id=DEFAULT_LEAGUE, last=None, reload_stats=True):
+    """
+    Publishes a league's snapshot if its stats, model or player availability changed
+    since the inputs in `last` were published.
+
+    Args:
+        league_id (string): league ID (see utils.LEAGUES)
+        last (tuple): what the previous call returned
+        reload_stats (bool): re-read the stats cache, picking up refreshes by other jobs
+
+    Returns:
+        tuple: the inputs that are now published
+    """
+    from . import predictor, players
+
+    if reload_stats:
+        predictor.reset_team_stats(league_id)
+    stats = predictor.get_team_stats(league_id)
+    current = ((predictor.matrix_fingerprint(stats, league_id), players.availability_keys(league_id))
+               if stats is not None else None)
+    if current != last and publish_from_predictor(league_id) is not None:
+        return current
+    return last
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Publish team features to the shared segment.")
+    parser.add_argument("--interval", type=float, default=REFRESH_INTERVAL_S,
+                        help="seconds between refreshes (0 publishes once and exits)")
+    parser.add_argument("--league", choices=sorted(LEAGUES), default=DEFAULT_LEAGUE,
+                        help="league ID to publish")
+    args = parser.parse_args()
+
+    last = None
+    next_stats = 0.0
+    while True:
+        now = time.monotonic()
+        reload_stats = now >= next_stats
+        if reload_stats:
+            next_stats = now + args.interval
+        last = refresh(args.league, last, reload_stats)
+        if not args.interval:
+            break
+        time.sleep(min(AVAILABILITY_POLL_S, args.interval))
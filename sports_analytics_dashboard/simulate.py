@@ -0,0 +1,358 @@
+"""
+This module projects the rest of the NBA season with Monte Carlo simulation.
+
+Win probabilities for each remaining game are looked up once from a (home × away)
+probability matrix, then whole seasons are played out as a (simulations × games)
+matrix of coin flips. Wins, conference seeds, the play-in and playoff odds are all
+derived with array operations, and batches of simulations can run across cores.
+
+project_season takes the current standings and the games left to play from the same
+snapshot of the schedule store: finals count toward the standings, and every other
+game (scheduled or in progress) is simulated.
+"""
+
+from .utils import team_ids, team_index, team_names, team_conference
+from .elo import GAME_LOG_FILE
+from .records import GameTable
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import numpy as np
+import hashlib
+import csv
+import os
+
+CONFERENCES = ("East", "West")
+BATCH_SIZE = 2000  # Simulations per batch; bounds memory at BATCH_SIZE × games booleans
+
+
+def current_standings(path=GAME_LOG_FILE):
+    """
+    Counts wins and losses for every team from the cached game log.
+
+    Args:
+        path (Path or string): the game log CSV written by accuracy.fetch_game_logs_with_cache
+
+    Returns:
+        tuple: (wins, losses) arrays ordered like utils.team_ids
+    """
+    wins = np.zeros(len(team_ids), dtype=np.int64)
+    losses = np.zeros(len(team_ids), dtype=np.int64)
+    path = Path(path)
+    if not path.exists():
+        print(f"⚠️ No game log found at {path}")
+        return wins, losses
+
+    with path.open("r", newline="") as f:
+        for row in csv.DictReader(f):
+            idx = team_index.get(int(row["TEAM_ID"]))
+            if idx is None:
+                continue
+            if row["WL"] == "W":
+                wins[idx] += 1
+            elif row["WL"] == "L":
+                losses[idx] += 1
+    return wins, losses
+
+
+def standings_from_games(table):
+    """
+    Counts wins and losses for every team from finished games.
+
+    Args:
+        table (GameTable): final games with scores
+
+    Returns:
+        tuple: (wins, losses) arrays ordered like utils.team_ids
+    """
+    known = np.asarray(team_ids, dtype=np.int64)
+    games = table.games
+    games = games[np.isin(games["home_team_id"], known) & np.isin(games["away_team_id"], known)]
+    home_won = games["home_score"] > games["away_score"]
+    winners = np.where(home_won, games["home_team_id"], games["away_team_id"])
+    losers = np.where(home_won, games["away_team_id"], games["home_team_id"])
+    wins = np.bincount(np.searchsorted(known, winners), minlength=len(known)).astype(np.int64)
+    losses = np.bincount(np.searchsorted(known, losers), minlength=len(known)).astype(np.int64)
+    return wins, losses
+
+
+def _predictor_probability(home_id, away_id):
+    """
+    Home win probability from predict_win_probability, falling back to Elo when the
+    model can't score the matchup.
+    """
+    from .predictor import predict_win_probability
+    result = predict_win_probability(team_names[home_id], team_names[away_id])
+    if result:
+        return result.home_prob / 100
+    from .elo import get_elo_engine
+    return get_elo_engine().win_probability(home_id, away_id)
+
+
+def _simulate_batch(probs, home_idx, away_idx, base_wins, matchup_probs, n_sims, seed):
+    """
+    Plays out `n_sims` seasons and returns aggregated counts (kept small so that
+    results from worker processes are cheap to send back).
+
+    Returns:
+        dict: win totals, seed counts, play-in and playoff counts per team
+    """
+    rng = np.random.default_rng(seed)
+    n_teams = len(base_wins)
+    n_games = len(probs)
+
+    # One-hot incidence of each game's home and away team, so wins are a matrix product
+    home_onehot = np.zeros((n_games, n_teams), dtype=np.float32)
+    away_onehot = np.zeros((n_games, n_teams), dtype=np.float32)
+    home_onehot[np.arange(n_games), home_idx] = 1
+    away_onehot[np.arange(n_games), away_idx] = 1
+
+    conf_members = {
+        conf: np.array([i for i, t in enumerate(team_ids) if team_conference.get(t) == conf])
+        for conf in CONFERENCES
+    }
+    max_seed = max(len(m) for m in conf_members.values())
+
+    totals = {
+        "wins": np.zeros(n_teams),
+        "wins_sq": np.zeros(n_teams),
+        "seeds": np.zeros((n_teams, max_seed), dtype=np.int64),
+        "play_in": np.zeros(n_teams, dtype=np.int64),
+        "playoffs": np.zeros(n_teams, dtype=np.int64),
+    }
+
+    done = 0
+    while done < n_sims:
+        n = min(BATCH_SIZE, n_sims - done)
+        home_wins = (rng.random((n, n_games)) < probs).astype(np.float32)
+        wins = base_wins + home_wins @ home_onehot + (1 - home_wins) @ away_onehot
+        totals["wins"] += wins.sum(axis=0)
+        totals["wins_sq"] += (wins ** 2).sum(axis=0)
+
+        # Random fractional tiebreak, then rank within each conference
+        keys = wins + rng.random(wins.shape) * 0.5
+        made = np.zeros((n, n_teams), dtype=bool)
+        rows = np.arange(n)
+        for members in conf_members.values():
+            order = members[np.argsort(-keys[:, members], axis=1)]  # (n, conf size) team indices by seed
+            for seed_pos in range(order.shape[1]):
+                totals["seeds"][:, seed_pos] += np.bincount(order[:, seed_pos], minlength=n_teams)
+            made[rows[:, None], order[:, :6]] = True
+
+            if order.shape[1] < 10:
+                continue
+            s7, s8, s9, s10 = order[:, 6], order[:, 7], order[:, 8], order[:, 9]
+            for col in (s7, s8, s9, s10):
+                totals["play_in"] += np.bincount(col, minlength=n_teams)
+            # 7 hosts 8 for the 7 seed; 9 hosts 10; the 7/8 loser hosts the 9/10 winner for the 8 seed
+            first = rng.random(n) < matchup_probs[s7, s8]
+            seventh = np.where(first, s7, s8)
+            loser = np.where(first, s8, s7)
+            second = rng.random(n) < matchup_probs[s9, s10]
+            survivor = np.where(second, s9, s10)
+            third = rng.random(n) < matchup_probs[loser, survivor]
+            eighth = np.where(third, loser, survivor)
+            made[rows, seventh] = True
+            made[rows, eighth] = True
+
+        totals["playoffs"] += made.sum(axis=0)
+        done += n
+
+    return totals
+
+
+class SeasonSimulator:
+    """
+    Monte Carlo simulator for the remaining regular season.
+
+    Args:
+        schedule (GameTable or list of dict): remaining games (schedule store rows are
+            packed into a GameTable)
+        wins (ndarray): current wins ordered like utils.team_ids (defaults to the cached game log)
+        losses (ndarray): current losses ordered like utils.team_ids
+        prob_fn (callable): prob_fn(home_id, away_id) -> home win probability
+    """
+
+    def __init__(self, schedule, wins=None, losses=None, prob_fn=None):
+        if wins is None:
+            wins, losses = current_standings()
+        self.wins = np.asarray(wins, dtype=np.int64).copy()
+        self.losses = (np.zeros_like(self.wins) if losses is None
+                       else np.asarray(losses, dtype=np.int64).copy())
+        self.prob_fn = prob_fn or _predictor_probability
+
+        if not isinstance(schedule, GameTable):
+            schedule = GameTable.from_rows(list(schedule))
+        # team_ids is sorted, so matrix positions are a binary search away
+        known = np.asarray(team_ids, dtype=np.int64)
+        games = schedule.games[np.isin(schedule.games["home_team_id"], known)
+                               & np.isin(schedule.games["away_team_id"], known)]
+        self.game_ids = GameTable(games).game_ids
+        self.home_idx = np.searchsorted(known, games["home_team_id"]).astype(np.int64)
+        self.away_idx = np.searchsorted(known, games["away_team_id"]).astype(np.int64)
+
+        # (home × away) probability matrix, filled only for pairings that are needed
+        self.matchup_probs = np.full((len(team_ids), len(team_ids)), np.nan)
+        self._fill_matchups(self._needed_pairs())
+
+    def _needed_pairs(self):
+        """Every (home, away) pairing in the remaining schedule, plus all same-conference pairs for the play-in."""
+        pairs = set(zip(self.home_idx.tolist(), self.away_idx.tolist()))
+        for conf in CONFERENCES:
+            members = [i for i, t in enumerate(team_ids) if team_conference.get(t) == conf]
+            pairs.update((h, a) for h in members for a in members if h != a)
+        return pairs
+
+    def _fill_matchups(self, pairs):
+        """Computes the probability of each missing pairing exactly once."""
+        for h, a in pairs:
+            if np.isnan(self.matchup_probs[h, a]):
+                p = self.prob_fn(team_ids[h], team_ids[a])
+                self.matchup_probs[h, a] = 0.5 if p is None else p
+
+    @property
+    def game_probs(self):
+        """ndarray: home win probability of every remaining game."""
+        return self.matchup_probs[self.home_idx, self.away_idx]
+
+    def record_result(self, game_id, home_won):
+        """
+        Removes a finished game from the remaining schedule and credits the result.
+        No probabilities are recomputed.
+
+        Args:
+            game_id (string): ID of the finished game
+            home_won (bool): whether the home team won
+        """
+        try:
+            pos = self.game_ids.index(str(game_id))
+        except ValueError:
+            print(f"⚠️ Game {game_id} is not in the remaining schedule")
+            return
+        h, a = self.home_idx[pos], self.away_idx[pos]
+        winner, loser = (h, a) if home_won else (a, h)
+        self.wins[winner] += 1
+        self.losses[loser] += 1
+        del self.game_ids[pos]
+        self.home_idx = np.delete(self.home_idx, pos)
+        self.away_idx = np.delete(self.away_idx, pos)
+
+    def refresh_teams(self, teams):
+        """
+        Recomputes only the matchup probabilities involving the given teams, e.g.
+        after their stats change.
+
+        Args:
+            teams (iterable): team IDs whose probabilities are stale
+        """
+        stale = {team_index[int(t)] for t in teams}
+        self.matchup_probs[list(stale), :] = np.nan
+        self.matchup_probs[:, list(stale)] = np.nan
+        self._fill_matchups(self._needed_pairs())
+
+    def run(self, n_sims=10000, workers=None, seed=None):
+        """
+        Simulates the remaining season `n_sims` times.
+
+        Args:
+            n_sims (int): number of seasons to simulate
+            workers (int): processes to spread simulations over (defaults to the CPU count)
+            seed (int): seed for reproducible projections
+
+        Returns:
+            list: one dict per team with projected wins, seed odds and playoff odds,
+            sorted by projected wins
+        """
+        workers = workers or os.cpu_count() or 1
+        workers = max(1, min(workers, n_sims // BATCH_SIZE or 1))
+        chunks = [n_sims // workers + (1 if i < n_sims % workers else 0) for i in range(workers)]
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        args = (self.game_probs, self.home_idx, self.away_idx,
+                self.wins.astype(np.float32), np.nan_to_num(self.matchup_probs, nan=0.5))
+
+        if workers == 1:
+            results = [_simulate_batch(*args, chunks[0], seeds[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_simulate_batch, *args, n, s) for n, s in zip(chunks, seeds)]
+                results = [f.result() for f in futures]
+
+        totals = {key: sum(r[key] for r in results) for key in results[0]}
+        mean_wins = totals["wins"] / n_sims
+        std_wins = np.sqrt(np.maximum(totals["wins_sq"] / n_sims - mean_wins ** 2, 0))
+
+        projections = []
+        for i, team_id in enumerate(team_ids):
+            seeds_pct = totals["seeds"][i] / n_sims * 100
+            projections.append({
+                "team": team_names[team_id],
+                "conference": team_conference.get(team_id),
+                "wins": int(self.wins[i]),
+                "losses": int(self.losses[i]),
+                "projected_wins": round(float(mean_wins[i]), 1),
+                "projected_wins_std": round(float(std_wins[i]), 2),
+                "seed_probs": [round(float(p), 2) for p in seeds_pct],
+                "top6_pct": round(float(seeds_pct[:6].sum()), 2),
+                "play_in_pct": round(float(totals["play_in"][i] / n_sims * 100), 2),
+                "playoff_pct": round(float(totals["playoffs"][i] / n_sims * 100), 2),
+            })
+        projections.sort(key=lambda p: -p["projected_wins"])
+        return projections
+
+
+# (schedule snapshot and matrix digest, n_sims, seed) and the projections computed for it
+_last_projection = {"key": None, "projections": None}
+
+
+def project_season(n_sims=10000, season=None, workers=None, seed=None, path=None):
+    """
+    Simulates the rest of a season from one snapshot of the schedule store: regular
+    season finals give the current standings and every regular season game that isn't
+    final is simulated. Preseason, play-in, playoff and NBA Cup knockout games are
+    left out. Projections are reused while the snapshot, the matchup matrix, n_sims and seed
+    are unchanged.
+
+    Args:
+        n_sims (int): number of seasons to simulate
+        season (string): NBA season (defaults to the current season)
+        workers (int): processes to spread simulations over
+        seed (int): seed for reproducible projections
+        path (Path or string): the schedule store database (defaults to the NBA's)
+
+    Returns:
+        list: per-team projections from SeasonSimulator.run
+    """
+    from .schedule import season_games, STATUS_FINAL, GAME_TYPE_REGULAR_SEASON
+    from .predictor import get_matchup_matrix
+
+    rows = [row for row in season_games(season, path) if row["game_id"][2:3] == GAME_TYPE_REGULAR_SEASON]
+    table = GameTable.from_rows(rows)
+    matrix = get_matchup_matrix()
+    digest = hashlib.sha1(table.games.tobytes())
+    if matrix is not None:
+        digest.update(matrix.tobytes())
+    key = (digest.hexdigest(), n_sims, seed)
+    if _last_projection["key"] == key:
+        return _last_projection["projections"]
+
+    final = table.games["status"] == STATUS_FINAL
+    wins, losses = standings_from_games(GameTable(table.games[final]))
+    simulator = SeasonSimulator(GameTable(table.games[~final]), wins, losses)
+    projections = simulator.run(n_sims, workers=workers, seed=seed)
+    _last_projection.update(key=key, projections=projections)
+    return projections
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Project the rest of the NBA season.")
+    parser.add_argument("--sims", type=int, default=10000, help="number of seasons to simulate")
+    parser.add_argument("--season", help="season to project (defaults to the current one)")
+    parser.add_argument("--workers", type=int, help="processes to spread simulations over")
+    parser.add_argument("--seed", type=int, help="seed for reproducible projections")
+    args = parser.parse_args()
+
+    print(f"{'Team':<28} {'W-L':>7} {'Proj W':>7} {'Playoff %':>10} {'Play-in %':>10}")
+    for p in project_season(args.sims, args.season, args.workers, args.seed):
+        print(f"{p['team']:<28} {p['wins']:>3}-{p['losses']:<3} {p['projected_wins']:>7} "
+              f"{p['playoff_pct']:>10} {p['play_in_pct']:>10}")
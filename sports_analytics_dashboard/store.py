@@ -0,0 +1,278 @@
+"""
+This module keeps the ingested game logs in an indexed SQLite database.
+
+Historical questions (a team's recent games, home record, head-to-head history, games
+in a date range) are answered with indexed queries against game_logs.db instead of
+loading game_logs.csv into pandas and scanning it. Each worker opens its own
+connection and only touches the pages a query needs. Every league has its own database
+(see db_file), so one league's games never sit in another's indexes or page cache.
+"""
+
+from .utils import get_team_id, league_path, DEFAULT_LEAGUE
+from pathlib import Path
+import threading
+import sqlite3
+import math
+import csv
+
+DB_FILE = Path("game_logs.db")
+GAME_LOG_FILE = Path("game_logs.csv")
+
+# LeagueGameLog columns and their SQLite types
+COLUMNS = {
+    "SEASON_ID": "TEXT", "TEAM_ID": "INTEGER", "TEAM_ABBREVIATION": "TEXT", "TEAM_NAME": "TEXT",
+    "GAME_ID": "TEXT", "GAME_DATE": "TEXT", "MATCHUP": "TEXT", "WL": "TEXT", "MIN": "INTEGER",
+    "FGM": "INTEGER", "FGA": "INTEGER", "FG_PCT": "REAL", "FG3M": "INTEGER", "FG3A": "INTEGER",
+    "FG3_PCT": "REAL", "FTM": "INTEGER", "FTA": "INTEGER", "FT_PCT": "REAL", "OREB": "INTEGER",
+    "DREB": "INTEGER", "REB": "INTEGER", "AST": "INTEGER", "STL": "INTEGER", "BLK": "INTEGER",
+    "TOV": "INTEGER", "PF": "INTEGER", "PTS": "INTEGER", "PLUS_MINUS": "REAL",
+}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS game_logs (
+    {", ".join(f"{name} {kind}" for name, kind in COLUMNS.items())},
+    IS_HOME INTEGER,
+    OPP_TEAM_ID INTEGER
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_game_logs_game ON game_logs (GAME_ID, TEAM_ID);
+CREATE INDEX IF NOT EXISTS idx_game_logs_team_date ON game_logs (TEAM_ID, GAME_DATE);
+CREATE INDEX IF NOT EXISTS idx_game_logs_date ON game_logs (GAME_DATE);
+"""
+
+_local = threading.local()
+
+
+def db_file(league_id=DEFAULT_LEAGUE):
+    """
+    Returns the database file of a league.
+
+    Args:
+        league_id (string): league ID (see utils.LEAGUES)
+
+    Returns:
+        Path: game_logs.db for the NBA, the league's own copy otherwise
+    """
+    return league_path(DB_FILE, league_id)
+
+
+def get_connection(path=DB_FILE):
+    """
+    Returns this thread's connection to the store, creating the schema if needed.
+    Connections are kept per resolved path, so a relative path opened after a chdir
+    gets the database it now points to.
+
+    Args:
+        path (Path or string): the SQLite database file
+
+    Returns:
+        sqlite3.Connection: connection with rows returned as sqlite3.Row
+    """
+    path = Path(path).resolve()
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(path)
+    if conn is None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(path)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")  # readers don't block the ingesting writer
+        conn.executescript(SCHEMA)
+        connections[path] = conn
+    return conn
+
+
+def _to_sql(value):
+    """Converts numpy scalars and NaN to values sqlite3 can bind."""
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if value == "":
+        return None
+    return value
+
+
+def ingest_game_logs(source=GAME_LOG_FILE, path=DB_FILE):
+    """
+    Loads game log rows into the store, replacing any rows already present for the
+    same game and team, then links each row to its opponent.
+
+    Args:
+        source (Path, string, DataFrame or iterable of dict): game log CSV, DataFrame
+            from LeagueGameLog, or rows
+        path (Path or string): the SQLite database file
+
+    Returns:
+        int: number of rows written
+    """
+    if isinstance(source, (str, Path)):
+        source = Path(source)
+        if not source.exists():
+            print(f"⚠️ No game log found at {source}")
+            return 0
+        with source.open("r", newline="") as f:
+            return ingest_game_logs(csv.DictReader(f), path)
+    if hasattr(source, "to_dict"):
+        source = source.to_dict("records")
+
+    names = list(COLUMNS) + ["IS_HOME"]
+    sql = f"INSERT OR REPLACE INTO game_logs ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})"
+
+    def rows():
+        for row in source:
+            values = [_to_sql(row.get(name)) for name in COLUMNS]
+            values[list(COLUMNS).index("GAME_ID")] = str(row["GAME_ID"]).zfill(10)
+            values.append(1 if "vs." in str(row.get("MATCHUP", "")) else 0)
+            yield values
+
+    conn = get_connection(path)
+    with conn:
+        before = conn.total_changes
+        conn.executemany(sql, rows())
+        written = conn.total_changes - before
+        conn.execute("""
+            UPDATE game_logs SET OPP_TEAM_ID = (
+                SELECT o.TEAM_ID FROM game_logs o
+                WHERE o.GAME_ID = game_logs.GAME_ID AND o.TEAM_ID != game_logs.TEAM_ID
+            )
+            WHERE OPP_TEAM_ID IS NULL
+        """)
+    print(f"💾 Stored {written} game log rows.")
+    return written
+
+
+def _team_id(team):
+    """Accepts a team ID or any name utils.get_team_id understands."""
+    return get_team_id(team) if isinstance(team, str) else int(team)
+
+
+def team_games(team, start=None, end=None, limit=None, path=DB_FILE):
+    """
+    Returns a team's games, newest first.
+
+    Args:
+        team (int or string): team ID or name
+        start (string): earliest GAME_DATE to include (YYYY-MM-DD)
+        end (string): latest GAME_DATE to include (YYYY-MM-DD)
+        limit (int): maximum number of games
+        path (Path or string): the SQLite database file
+
+    Returns:
+        list: game log rows as dictionaries
+    """
+    sql = "SELECT * FROM game_logs WHERE TEAM_ID = ? AND GAME_DATE BETWEEN ? AND ? ORDER BY GAME_DATE DESC"
+    params = [_team_id(team), start or "0000-00-00", end or "9999-99-99"]
+    if limit:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    return [dict(row) for row in get_connection(path).execute(sql, params)]
+
+
+def last_n_games(team, n=5, path=DB_FILE):
+    """
+    Returns a team's `n` most recent games, newest first.
+
+    Args:
+        team (int or string): team ID or name
+        n (int): number of games
+        path (Path or string): the SQLite database file
+
+    Returns:
+        list: game log rows as dictionaries
+    """
+    return team_games(team, limit=n, path=path)
+
+
+def team_record(team, home=None, season_id=None, path=DB_FILE):
+    """
+    Returns a team's win/loss record, optionally only at home or on the road.
+
+    Args:
+        team (int or string): team ID or name
+        home (bool): True for home games, False for road games, None for all
+        season_id (string): restrict to one SEASON_ID
+        path (Path or string): the SQLite database file
+
+    Returns:
+        dictionary: wins and losses
+    """
+    sql = "SELECT SUM(WL = 'W') AS wins, SUM(WL = 'L') AS losses FROM game_logs WHERE TEAM_ID = ?"
+    params = [_team_id(team)]
+    if home is not None:
+        sql += " AND IS_HOME = ?"
+        params.append(1 if home else 0)
+    if season_id is not None:
+        sql += " AND SEASON_ID = ?"
+        params.append(str(season_id))
+    row = get_connection(path).execute(sql, params).fetchone()
+    return {"wins": row["wins"] or 0, "losses": row["losses"] or 0}
+
+
+def home_record(team, season_id=None, path=DB_FILE):
+    """
+    Returns a team's home win/loss record.
+
+    Args:
+        team (int or string): team ID or name
+        season_id (string): restrict to one SEASON_ID
+        path (Path or string): the SQLite database file
+
+    Returns:
+        dictionary: wins and losses
+    """
+    return team_record(team, home=True, season_id=season_id, path=path)
+
+
+def head_to_head(team, opponent, limit=None, path=DB_FILE):
+    """
+    Returns every game between two teams from `team`'s point of view, newest first,
+    along with the series record.
+
+    Args:
+        team (int or string): team ID or name
+        opponent (int or string): opposing team ID or name
+        limit (int): maximum number of games
+        path (Path or string): the SQLite database file
+
+    Returns:
+        dictionary: wins, losses and the list of game log rows
+    """
+    sql = "SELECT * FROM game_logs WHERE TEAM_ID = ? AND OPP_TEAM_ID = ? ORDER BY GAME_DATE DESC"
+    params = [_team_id(team), _team_id(opponent)]
+    if limit:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    games = [dict(row) for row in get_connection(path).execute(sql, params)]
+    return {
+        "wins": sum(1 for g in games if g["WL"] == "W"),
+        "losses": sum(1 for g in games if g["WL"] == "L"),
+        "games": games,
+    }
+
+
+def games_between(start, end, path=DB_FILE):
+    """
+    Returns every game played in a date range, one entry per game.
+
+    Args:
+        start (string): first date (YYYY-MM-DD)
+        end (string): last date (YYYY-MM-DD)
+        path (Path or string): the SQLite database file
+
+    Returns:
+        list: dictionaries with game_id, game_date, home/away team IDs and points
+    """
+    sql = """
+        SELECT h.GAME_ID AS game_id, h.GAME_DATE AS game_date,
+               h.TEAM_ID AS home_team_id, h.PTS AS home_pts,
+               a.TEAM_ID AS away_team_id, a.PTS AS away_pts
+        FROM game_logs h JOIN game_logs a ON a.GAME_ID = h.GAME_ID AND a.TEAM_ID = h.OPP_TEAM_ID
+        WHERE h.IS_HOME = 1 AND h.GAME_DATE BETWEEN ? AND ?
+        ORDER BY h.GAME_DATE, h.GAME_ID
+    """
+    return [dict(row) for row in get_connection(path).execute(sql, (start, end))]
+
+
+if __name__ == "__main__":
+    ingest_game_logs()
@@ -1,5 +1,5 @@
-from nba_api.stats.endpoints import PlayByPlayV2, LeagueDashTeamStats, ScoreboardV2
-from datetime import datetime, timedelta
+from nba_api.stats.endpoints import PlayByPlayV2, LeagueDashTeamStats
+from datetime import datetime
 import pandas as pd
 
 # Manually mapping team IDs to names
@@ -18,30 +18,11 @@ team_id_map = {
 }
 
 def get_last_n_games(team_name, num_games=5):
-    """Fetches the last `num_games` games for a given team."""
-    today = datetime.today()
-    game_ids = []
-    
-    # Iterate over the last `num_games` days to find games
-    for i in range(num_games * 3):  # Search up to 3x the number of requested games
-        date_str = (today - timedelta(days=i)).strftime('%Y-%m-%d')
-        scoreboard = ScoreboardV2(game_date=date_str)
-        games = scoreboard.get_dict()['resultSets'][0]['rowSet']
-
-        for game in games:
-            home_team_id = game[6]
-            away_team_id = game[7]
-
-            home_team = team_id_map.get(home_team_id, f"Team {home_team_id}")
-            away_team = team_id_map.get(away_team_id, f"Team {away_team_id}")
-
-            if team_name in [home_team, away_team]:
-                game_ids.append(game[2])  # Game ID
-
-            if len(game_ids) >= num_games:
-                return game_ids
+    """Fetches the last `num_games` games for a given team from the local schedule store."""
+    from .schedule import recent_games
+    from .utils import get_team_id
 
-    return game_ids
+    return [game["game_id"] for game in recent_games(get_team_id(team_name), num_games)]
 
 def get_free_throw_data(game_id):
     """Extracts play-by-play data for free throw events."""
@@ -6,6 +6,21 @@ that has already been fetched.
 
 from nba_api.stats.static import teams
 from datetime import datetime
+from pathlib import Path
+import hashlib
+import json
+
+# Leagues served by the dashboard, keyed by the stats API's league ID. Each league has its
+# own refresh schedule: how long cached team stats are served before being re-fetched
+# (None: until the cache file is deleted) and how often the full schedule is re-pulled.
+NBA, WNBA, G_LEAGUE = "00", "10", "20"
+DEFAULT_LEAGUE = NBA
+LEAGUES = {
+    NBA: {"name": "NBA", "stats_max_age_s": None, "schedule_max_age_s": 7 * 24 * 3600},
+    WNBA: {"name": "WNBA", "stats_max_age_s": 12 * 3600, "schedule_max_age_s": 3 * 24 * 3600},
+    G_LEAGUE: {"name": "G League", "stats_max_age_s": 24 * 3600, "schedule_max_age_s": 7 * 24 * 3600},
+}
+LEAGUE_DIR = Path("leagues")
 
 # Get today's dates in YYYYMMDD format
 today = datetime.today().strftime('%Y-%m-%d')
@@ -20,6 +35,20 @@ for team in nba_teams:
     name = team["full_name"]
     team_names[id] = name
 
+# Stable 0..29 index for every team ID, used by array-backed structures (ratings, matrices)
+team_ids = sorted(team_names)
+team_index = {team_id: i for i, team_id in enumerate(team_ids)}
+
+# Conference membership, used for seeding and playoff projections
+eastern_conference = {
+    "ATL", "BOS", "BKN", "CHA", "CHI", "CLE", "DET", "IND",
+    "MIA", "MIL", "NYK", "ORL", "PHI", "TOR", "WAS"
+}
+team_conference = {
+    team["id"]: "East" if team["abbreviation"] in eastern_conference else "West"
+    for team in nba_teams
+}
+
 # A dictionary mapping NBA team name abbreviations and common variations to standardized names.
 team_name_mapping = {
     "NY Knicks": "New York Knicks",
@@ -79,28 +108,128 @@ def normalize_team_name(team_name):
     return team_name_mapping.get(team_name.strip(), team_name.strip())
 
 
-def get_current_season():
+def get_current_season(league_id=DEFAULT_LEAGUE):
     """
-    Returns the current NBA season.
+    Returns the current season of a league.
+
+    Args:
+        league_id (string): league ID (see LEAGUES)
 
     Returns:
-        string: current NBA season
+        string: current season, e.g. "2024-25" (NBA, G League) or "2024" (WNBA)
     """
     year = datetime.today().year
     month = datetime.today().month
+    if league_id == WNBA:
+        # The WNBA plays within one calendar year (May to October)
+        return str(year) if month >= 5 else str(year - 1)
     return f"{year}-{str(year + 1)[2:]}" if month >= 10 else f"{year - 1}-{str(year)[2:]}"
 
-def get_team_id(team_name):
+def stats_fingerprint(stats, salt=""):
+    """
+    Hashes a team stats dictionary, so that every worker holding the same stats derives
+    the same identifier (for cache keys and ETags).
+
+    Args:
+        stats (dictionary): teams attached to their stats
+        salt (string): anything else the identifier should depend on, e.g. a model signature
+
+    Returns:
+        string: 40 hex characters
+    """
+    payload = json.dumps(stats, sort_keys=True, default=float) + salt
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def league_path(filename, league_id=DEFAULT_LEAGUE, create=False):
+    """
+    Returns where a league keeps one of its cache or store files. NBA files stay in the
+    working directory; every other league gets its own directory under LEAGUE_DIR.
+
+    Args:
+        filename (Path or string): file name used for the NBA
+        league_id (string): league ID (see LEAGUES)
+        create (bool): create the league's directory, for callers about to write the file
+
+    Returns:
+        Path: the league's copy of the file
+    """
+    filename = Path(filename)
+    if league_id == DEFAULT_LEAGUE:
+        return filename
+    path = LEAGUE_DIR / league_id / filename.name
+    if create:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+# Team ID -> name for leagues other than the NBA, loaded on first use
+_league_teams = {}
+
+def get_league_teams(league_id=DEFAULT_LEAGUE):
+    """
+    Returns every known team of a league. WNBA teams come from nba_api's static list;
+    G League teams are learned from the stats API and kept in the league's teams.json.
+
+    Args:
+        league_id (string): league ID (see LEAGUES)
+
+    Returns:
+        dictionary: team IDs mapped to team names
+    """
+    if league_id == DEFAULT_LEAGUE:
+        return team_names
+    if league_id not in _league_teams:
+        known = {}
+        if league_id == WNBA:
+            known = {team["id"]: team["full_name"] for team in teams.get_wnba_teams()}
+        path = league_path("teams.json", league_id)
+        if path.exists():
+            try:
+                with path.open("r") as f:
+                    known.update({int(team_id): name for team_id, name in json.load(f).items()})
+            except Exception as e:
+                print(f"⚠️ Failed to read {path}: {e}")
+        _league_teams[league_id] = known
+    return _league_teams[league_id]
+
+def remember_league_teams(league_id, names):
+    """
+    Adds teams seen in API responses to a league's team list.
+
+    Args:
+        league_id (string): league ID (see LEAGUES)
+        names (dictionary): team IDs mapped to team names
+    """
+    if league_id == DEFAULT_LEAGUE:
+        return
+    known = get_league_teams(league_id)
+    new = {int(team_id): name for team_id, name in names.items() if int(team_id) not in known}
+    if not new:
+        return
+    known.update(new)
+    try:
+        with league_path("teams.json", league_id, create=True).open("w") as f:
+            json.dump({str(team_id): name for team_id, name in known.items()}, f, indent=2)
+    except Exception as e:
+        print(f"⚠️ Failed to write team list for league {league_id}: {e}")
+
+def get_team_id(team_name, league_id=DEFAULT_LEAGUE):
     """
-    Returns the unique team ID number of a given NBA team.
+    Returns the unique team ID number of a given team.
 
     Args:
-        team_name (string): The NBA team to find the ID of.
+        team_name (string): The team to find the ID of.
+        league_id (string): league ID (see LEAGUES)
     
     Returns:
-        None
+        int: the team ID, or None if the team is unknown
     """
     standardized_name = normalize_team_name(team_name)
+    if league_id != DEFAULT_LEAGUE:
+        for team_id, name in get_league_teams(league_id).items():
+            if name.strip() == standardized_name:
+                return team_id
+        return None
     for team in nba_teams:
         if normalize_team_name(team["full_name"]) == standardized_name:
             return team["id"]
@@ -0,0 +1,49 @@
+import threading
+
+import pytest
+
+from sports_analytics_dashboard import aggregates, store
+
+
+def team(w_pct, reb):
+    return {"W_PCT": w_pct, "NET_RATING": 0.0, "TURNOVER_PCT": 12.0, "PLUS_MINUS": 0.0, "REB": reb, "AST": 25.0}
+
+
+@pytest.fixture
+def stats(tmp_path, monkeypatch):
+    """Team stats with a missing and a NaN value, served from an empty game log store."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(store, "_local", threading.local())
+    current = {"stats": {
+        "Boston Celtics": team(0.7, 45.0),
+        "New York Knicks": team(0.6, None),
+        "Houston Rockets": team(0.5, float("nan")),
+        "Utah Jazz": team(0.2, 40.0),
+    }}
+    monkeypatch.setattr(aggregates, "get_team_stats", lambda league_id=None: current["stats"])
+    monkeypatch.setattr(aggregates, "_aggregates", {})
+    monkeypatch.setattr(aggregates, "_stats_fingerprints", {})
+    return current
+
+
+def teams(page):
+    return [row["TEAM"] for row in page["teams"]]
+
+
+def test_missing_values_sort_last_in_both_directions(stats):
+    assert teams(aggregates.stats_page(sort="REB", order="desc"))[:2] == ["Boston Celtics", "Utah Jazz"]
+    assert teams(aggregates.stats_page(sort="REB", order="asc"))[:2] == ["Utah Jazz", "Boston Celtics"]
+    assert set(teams(aggregates.stats_page(sort="REB", order="asc"))[2:]) == {"New York Knicks", "Houston Rockets"}
+    assert teams(aggregates.stats_page(sort="W_PCT", order="asc")) == [
+        "Utah Jazz", "Houston Rockets", "New York Knicks", "Boston Celtics"]
+
+
+def test_pages_come_from_the_table_they_were_cut_from(stats):
+    first = aggregates.stats_page(sort="W_PCT")
+    assert aggregates.stats_page(sort="W_PCT") is first
+
+    stats["stats"] = dict(stats["stats"], **{"Utah Jazz": team(0.9, 40.0)})
+    refreshed = aggregates.stats_page(sort="W_PCT")
+    assert refreshed["version"] != first["version"]
+    assert teams(refreshed)[0] == "Utah Jazz"
+    assert refreshed["version"] == aggregates.get_aggregates()["version"]
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from sports_analytics_dashboard import attribution
+
+NAMES = ["W_PCT", "NET_RATING", "REB"]
+
+
+@pytest.fixture
+def model_and_teams():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(200, len(NAMES))), columns=NAMES)
+    y = (X["W_PCT"] - X["REB"] + rng.normal(scale=0.5, size=200) > 0).astype(int)
+    teams = pd.DataFrame([[0.8, 4.0, 44.0], [0.3, -2.5, 47.0]], columns=NAMES)
+    return LogisticRegression().fit(X, y), teams
+
+
+def test_linear_gap_adds_up_to_the_log_odds_difference(model_and_teams):
+    model, teams = model_and_teams
+    contrib = attribution.contributions(model, teams)
+    home, away = teams.to_numpy()
+    explanation = attribution.explain(NAMES, contrib[0], contrib[1], home, away, scale=[0.2, 3.0, 2.0])
+
+    log_odds = model.decision_function(teams)
+    total = sum(row["contribution"] for row in explanation)
+    assert total == pytest.approx(log_odds[0] - log_odds[1], abs=1e-3)
+    assert [row["feature"] for row in explanation] == sorted(
+        NAMES, key=lambda n: -abs(contrib[0][NAMES.index(n)] - contrib[1][NAMES.index(n)]))
+    w_pct = next(row for row in explanation if row["feature"] == "W_PCT")
+    assert w_pct["std_diff"] == pytest.approx((0.8 - 0.3) / 0.2)
+
+
+def test_models_without_an_attributor_explain_nothing(model_and_teams):
+    _, teams = model_and_teams
+    contrib = attribution.contributions(object(), teams)
+    assert contrib.shape == (2, len(NAMES)) and np.isnan(contrib).all()
+    assert attribution.explain(NAMES, contrib[0], contrib[1], [0.8, None, 44.0], [0.3, 1.0, 47.0], [0.2, 0, 2]) is None
+
+
+def test_missing_features_and_flat_scales_are_reported_as_none():
+    explanation = attribution.explain(NAMES, [0.5, np.nan, 0.1], [0.2, np.nan, 0.3],
+                                      [0.8, None, 44.0], [0.3, 1.0, 44.0], [0.2, 3.0, 0.0])
+    rows = {row["feature"]: row for row in explanation}
+    assert rows["NET_RATING"]["home_value"] is None and rows["NET_RATING"]["contribution"] is None
+    assert rows["REB"]["std_diff"] == 0.0
+    assert explanation[-1]["feature"] == "NET_RATING"  # unknown contributions sort last
+
+
+def test_probability_contributions_are_rescaled_to_log_odds():
+    base = 0.4
+    values = np.array([[0.1, 0.15, -0.05], [0.0, 0.0, 0.0], [-0.3, 0.05, -0.1]])
+    converted = attribution._to_log_odds(values, base)
+
+    def logit(p):
+        return np.log(p / (1 - p))
+
+    expected = logit(np.clip(base + values.sum(axis=1), 1e-6, 1 - 1e-6)) - logit(base)
+    np.testing.assert_allclose(converted.sum(axis=1), expected)
+    np.testing.assert_array_equal(np.sign(converted), np.sign(values))
@@ -0,0 +1,127 @@
+import csv
+
+import pytest
+
+from sports_analytics_dashboard import elo
+from sports_analytics_dashboard.utils import team_index
+
+BOS, NYK, HOU, UTA = 1610612738, 1610612752, 1610612745, 1610612762
+FIELDS = ["SEASON_ID", "TEAM_ID", "GAME_ID", "GAME_DATE", "MATCHUP", "PTS"]
+
+
+def log_rows(game_id, date, home, away, home_pts, away_pts):
+    """The two team-level LeagueGameLog rows of one game (away row first, like the API)."""
+    return [
+        {"SEASON_ID": "22024", "TEAM_ID": away, "GAME_ID": game_id, "GAME_DATE": date,
+         "MATCHUP": "AWY @ HOM", "PTS": away_pts},
+        {"SEASON_ID": "22024", "TEAM_ID": home, "GAME_ID": game_id, "GAME_DATE": date,
+         "MATCHUP": "HOM vs. AWY", "PTS": home_pts},
+    ]
+
+
+def write_log(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def test_update_game_applies_margin_of_victory():
+    engine = elo.EloEngine()
+    shift = engine.update_game("0022400001", "2024-10-22", BOS, NYK, 132, 109)
+
+    diff = elo.HOME_ADVANTAGE  # both teams start at BASE_RATING
+    k = elo.K_FACTOR * ((23 + 3) ** 0.8) / (7.5 + 0.006 * diff)
+    expected = k * (1 - elo.expected_score(diff))
+    assert shift == pytest.approx(expected)
+    assert engine.rating(BOS) == pytest.approx(elo.BASE_RATING + expected)
+    assert engine.rating(NYK) == pytest.approx(elo.BASE_RATING - expected)
+
+    # A bigger margin moves more points; replaying the same game moves none
+    blowout = elo.EloEngine().update_game("0022400001", "2024-10-22", BOS, NYK, 140, 100)
+    assert blowout > shift
+    assert engine.update_game("0022400001", "2024-10-22", BOS, NYK, 132, 109) == 0.0
+
+
+def test_upset_moves_more_points_than_expected_win():
+    favourite_wins = elo.EloEngine().update_game("1", "2024-10-22", BOS, NYK, 110, 100)
+    upset = elo.EloEngine().update_game("1", "2024-10-22", BOS, NYK, 100, 110)
+    assert upset < 0
+    assert abs(upset) > favourite_wins
+
+
+def test_rows_are_paired_and_history_is_by_date():
+    engine = elo.EloEngine()
+    rows = log_rows("1", "2024-10-22", BOS, NYK, 120, 100) + log_rows("2", "2024-10-24", HOU, UTA, 90, 100)
+    assert engine.update_from_rows(rows) == 2
+    assert list(map(str, engine.history_dates)) == ["2024-10-22", "2024-10-24"]
+
+    after_first = engine.ratings_as_of("2024-10-22")
+    assert after_first[team_index[BOS]] > elo.BASE_RATING
+    assert after_first[team_index[UTA]] == elo.BASE_RATING
+    assert engine.ratings_as_of("2024-10-22", inclusive=False)[team_index[BOS]] == elo.BASE_RATING
+
+
+def test_update_from_csv_reads_only_new_dates(tmp_path):
+    path = tmp_path / "game_logs.csv"
+    rows = (log_rows("1", "2024-10-22", BOS, NYK, 120, 100)
+            + log_rows("2", "2024-10-23", HOU, UTA, 110, 100)
+            + log_rows("3", "2024-10-24", NYK, UTA, 99, 98))
+    write_log(path, rows)
+    engine = elo.EloEngine()
+    assert engine.update_from_csv(path) == 3
+
+    # The refreshed log has a new date, plus a final back-filled for an earlier date
+    late = log_rows("9", "2024-10-22", HOU, BOS, 130, 90)
+    write_log(path, late + rows + log_rows("4", "2024-10-25", BOS, HOU, 101, 100))
+    before = engine.ratings.copy()
+    assert engine.update_from_csv(path) == 1
+    assert 9 not in engine.processed
+    changed = {i for i in range(len(before)) if engine.ratings[i] != before[i]}
+    assert changed == {team_index[BOS], team_index[HOU]}
+
+    # A full rescan picks the back-filled final up
+    assert engine.update_from_csv(path, full=True) == 1
+    assert 9 in engine.processed
+
+
+def test_seek_date_finds_first_row_on_or_after(tmp_path):
+    path = tmp_path / "game_logs.csv"
+    rows = []
+    for day in range(1, 29):
+        rows += log_rows(str(day), f"2024-11-{day:02d}", BOS, NYK, 100 + day, 100)
+    write_log(path, rows)
+    with open(path, "rb") as f:
+        start = len(f.readline())
+        for day in (1, 2, 15, 28):
+            f.seek(elo._seek_date(f, f"2024-11-{day:02d}", FIELDS.index("GAME_DATE"), start))
+            assert f.readline().decode().split(",")[3] == f"2024-11-{day:02d}"
+        assert elo._seek_date(f, "2024-12-01", FIELDS.index("GAME_DATE"), start) == path.stat().st_size
+
+
+def test_fetching_new_finals_refreshes_the_engine(tmp_path, monkeypatch):
+    from sports_analytics_dashboard import accuracy
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(elo, "elo_engine", None)
+    monkeypatch.setattr(elo, "_log_mtime", None)
+    monkeypatch.setattr(accuracy, "ingest_game_logs", lambda df, path: None)
+    monkeypatch.setattr(accuracy.ledger, "grade", lambda league_id: None)
+    write_log(tmp_path / "game_logs.csv", log_rows("1", "2024-10-22", BOS, NYK, 120, 100))
+    engine = elo.get_elo_engine()
+    assert engine.rating(BOS) > elo.BASE_RATING
+
+    class LeagueGameLog:
+        def __init__(self, **kwargs):
+            pass
+
+        def get_data_frames(self):
+            import pandas as pd
+            rows = log_rows("1", "2024-10-22", BOS, NYK, 120, 100) + log_rows("2", "2024-10-24", HOU, UTA, 90, 100)
+            return [pd.DataFrame(rows, columns=FIELDS)]
+
+    monkeypatch.setattr(accuracy, "LeagueGameLog", LeagueGameLog)
+    (tmp_path / "game_logs.csv").unlink()  # no fresh cache, so the API is called
+    assert accuracy.fetch_game_logs_with_cache("2024-25") is not None
+    assert 2 in engine.processed
+    assert engine.rating(UTA) > elo.BASE_RATING
@@ -0,0 +1,55 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from sports_analytics_dashboard import predictor, utils
+from sports_analytics_dashboard.utils import G_LEAGUE, league_path, remember_league_teams
+
+HOME, AWAY = 1612709890, 1612709913
+
+
+@pytest.fixture
+def cold_g_league(tmp_path, monkeypatch):
+    """A G League nobody in this process has seen: no teams.json, no stats in memory."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(utils, "_league_teams", {})
+    monkeypatch.setattr(predictor, "_leagues", {})
+
+    def fetch_team_stats(league_id):
+        # Like the API client, fetching a league's stats teaches us its teams
+        remember_league_teams(league_id, {HOME: "Maine Celtics", AWAY: "Westchester Knicks"})
+        return {"Maine Celtics": {}, "Westchester Knicks": {}}
+
+    monkeypatch.setattr(predictor, "fetch_team_stats", fetch_team_stats)
+    return tmp_path
+
+
+def test_league_path_creates_the_directory_only_for_writers(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert league_path("teams.json") == Path("teams.json")
+
+    path = league_path("teams.json", G_LEAGUE)
+    assert path == utils.LEAGUE_DIR / G_LEAGUE / "teams.json"
+    assert not (tmp_path / "leagues").exists()
+
+    assert league_path("teams.json", G_LEAGUE, create=True) == path
+    assert (tmp_path / path.parent).is_dir()
+
+
+def test_cold_league_prediction_loads_its_teams_first(cold_g_league, monkeypatch):
+    zeros = np.zeros(len(predictor.FEATURES))
+    features = [1.0] * len(predictor.FEATURES)
+    seen = {}
+
+    def lookup(i, j, league_id):
+        seen["pair"] = (i, j)
+        return 0.6, features, features, zeros, zeros, zeros
+
+    monkeypatch.setattr(predictor, "_lookup_matchup", lookup)
+    prediction = predictor.predict_win_probability("Maine Celtics", "Westchester Knicks", G_LEAGUE)
+    assert prediction is not None
+    assert (prediction.home_team_id, prediction.away_team_id) == (HOME, AWAY)
+    assert prediction.home_prob == 60.0
+    assert seen["pair"] == (0, 1)
+    assert (cold_g_league / "leagues" / G_LEAGUE / "teams.json").exists()
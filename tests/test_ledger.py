@@ -0,0 +1,105 @@
+import math
+import os
+import time
+import threading
+
+import pytest
+
+from sports_analytics_dashboard import ledger, store
+from sports_analytics_dashboard.records import Prediction
+
+BOS, NYK, HOU = 1610612738, 1610612752, 1610612745
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(store, "_local", threading.local())
+    monkeypatch.setattr(ledger, "_logged", set())
+    return tmp_path
+
+
+def predict(game_id, home_prob):
+    prediction = Prediction(BOS, NYK, "Boston Celtics", "New York Knicks", home_prob, 100 - home_prob,
+                            [0.5] * len(ledger.FEATURES), [None] * len(ledger.FEATURES))
+    ledger.record_prediction(game_id, prediction)
+
+
+def final(game_id, home_won):
+    """Both team rows of a finished game in the game log store."""
+    store.ingest_game_logs([
+        {"GAME_ID": game_id, "TEAM_ID": BOS, "GAME_DATE": "2025-01-01", "MATCHUP": "BOS vs. NYK",
+         "WL": "W" if home_won else "L"},
+        {"GAME_ID": game_id, "TEAM_ID": NYK, "GAME_DATE": "2025-01-01", "MATCHUP": "NYK @ BOS",
+         "WL": "L" if home_won else "W"},
+    ], store.db_file())
+
+
+def test_records_are_fixed_size_and_carry_team_ids(workdir):
+    predict("0022400001", 70.0)
+    records, offset = ledger.read_ledger(0)
+    assert offset == ledger.RECORD.itemsize == os.path.getsize(ledger.LEDGER_FILE)
+    assert (records[0]["home_id"], records[0]["away_id"]) == (BOS, NYK)
+    assert records[0]["home_prob"] == pytest.approx(0.7)
+    assert math.isnan(records[0]["away_features"][0])
+
+
+def test_grading_counts_each_final_once(workdir):
+    predict("0022400001", 70.0)
+    predict("0022400002", 40.0)
+    predict("0022400003", 55.0)
+    final("0022400001", home_won=True)
+    final("0022400002", home_won=True)
+
+    state = ledger.grade()
+    overall = state["overall"]
+    assert overall["graded"] == 2
+    assert overall["correct"] == 1  # 0.7 called right, 0.4 called wrong
+    assert overall["brier_sum"] == pytest.approx(0.3 ** 2 + 0.6 ** 2, rel=1e-5)
+    assert overall["log_loss_sum"] == pytest.approx(-math.log(0.7) - math.log(0.4), rel=1e-5)
+    assert list(state["pending"]) == ["22400003"]
+    assert state["rolling"] == [1, 0]
+    assert sum(c["graded"] for c in state["by_model"].values()) == 2
+
+    # Nothing new: no regrading, no rewrite
+    mtime = os.stat(ledger.GRADER_STATE_FILE).st_mtime_ns
+    assert ledger.grade()["overall"]["graded"] == 2
+    assert os.stat(ledger.GRADER_STATE_FILE).st_mtime_ns == mtime
+
+    # A prediction logged again for a graded game (another worker or model version) isn't counted twice
+    ledger._logged.clear()
+    predict("0022400001", 90.0)
+    final("0022400003", home_won=False)
+    state = ledger.grade()
+    assert state["overall"]["graded"] == 3
+    assert state["overall"]["correct"] == 1
+    assert state["pending"] == {}
+
+
+def test_grader_state_stays_bounded(workdir, monkeypatch):
+    monkeypatch.setattr(ledger, "GRADED_MEMORY", 2)
+    for n in range(1, 5):
+        predict(f"00224000{n:02d}", 60.0)
+        final(f"00224000{n:02d}", home_won=True)
+    state = ledger.grade()
+    assert state["overall"]["graded"] == 4
+    assert len(state["graded"]) == 2
+
+    # Predictions whose game never finished are eventually dropped
+    predict("0022400099", 60.0)
+    monkeypatch.setattr(ledger, "PENDING_MAX_AGE_S", 0)
+    time.sleep(0.01)
+    assert ledger.grade()["pending"] == {}
+
+
+def test_monitoring_report_only_reads(workdir):
+    predict("0022400001", 70.0)
+    final("0022400001", home_won=True)
+    report = ledger.monitoring_report()
+    assert report["overall"]["graded"] == 0
+    assert not os.path.exists(ledger.GRADER_STATE_FILE)
+
+    ledger.grade()
+    report = ledger.monitoring_report()
+    assert report["overall"]["graded"] == 1 and report["overall"]["accuracy"] == 1.0
+    assert report["rolling_accuracy"] == 1.0 and report["pending"] == 0
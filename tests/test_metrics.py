@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from sports_analytics_dashboard import metrics
+
+
+@pytest.fixture
+def collecting(monkeypatch):
+    """Metrics switched on, with nothing collected yet and no shared directory."""
+    monkeypatch.setattr(metrics, "enabled", True)
+    monkeypatch.setattr(metrics, "metrics_dir", None)
+    monkeypatch.setattr(metrics, "_histograms", {})
+    monkeypatch.setattr(metrics, "_counters", {})
+
+
+def test_histograms_render_cumulative_buckets(collecting):
+    labels = (("stage", "render"),)
+    for seconds in (0.003, 0.004, 0.02, 20.0):
+        metrics.observe("dashboard_stage_seconds", labels, seconds)
+    page = metrics.render_prometheus()
+
+    assert "# TYPE dashboard_stage_seconds histogram" in page
+    assert 'dashboard_stage_seconds_bucket{stage="render",le="0.001"} 0' in page
+    assert 'dashboard_stage_seconds_bucket{stage="render",le="0.005"} 2' in page
+    assert 'dashboard_stage_seconds_bucket{stage="render",le="0.025"} 3' in page
+    assert 'dashboard_stage_seconds_bucket{stage="render",le="10.0"} 3' in page
+    assert 'dashboard_stage_seconds_bucket{stage="render",le="+Inf"} 4' in page
+    assert 'dashboard_stage_seconds_count{stage="render"} 4' in page
+    total = float(page.split('dashboard_stage_seconds_sum{stage="render"} ')[1].split("\n")[0])
+    assert total == pytest.approx(20.027)
+
+
+def test_counters_escape_label_values(collecting):
+    metrics.cache_hit('odd "cache"\\\nname')
+    metrics.cache_miss("team_stats")
+    metrics.cache_miss("team_stats")
+    page = metrics.render_prometheus()
+    assert 'dashboard_cache_requests_total{cache="odd \\"cache\\"\\\\\\nname",result="hit"} 1' in page
+    assert 'dashboard_cache_requests_total{cache="team_stats",result="miss"} 2' in page
+
+
+def test_disabled_metrics_record_nothing(monkeypatch):
+    monkeypatch.setattr(metrics, "enabled", False)
+    monkeypatch.setattr(metrics, "_histograms", {})
+    monkeypatch.setattr(metrics, "_counters", {})
+    assert metrics.stage_timer("render") is metrics.upstream_call("LeagueGameLog")
+    with metrics.stage_timer("render"):
+        metrics.cache_hit("team_stats")
+    assert metrics._histograms == {} and metrics._counters == {}
+
+
+def test_workers_are_summed_through_the_metrics_directory(collecting, tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "metrics_dir", tmp_path)
+    other_worker = {
+        "histograms": [["dashboard_stage_seconds", [["stage", "render"]], [1] + [0] * len(metrics.BUCKETS) + [0.001]]],
+        "counters": [["dashboard_cache_requests_total", [["cache", "team_stats"], ["result", "hit"]], 5]],
+    }
+    (tmp_path / "metrics_1.json").write_text(json.dumps(other_worker))
+
+    metrics.observe("dashboard_stage_seconds", (("stage", "render"),), 0.002)
+    metrics.cache_hit("team_stats")
+    page = metrics.render_prometheus()
+    assert 'dashboard_stage_seconds_count{stage="render"} 2' in page
+    assert 'dashboard_cache_requests_total{cache="team_stats",result="hit"} 6' in page
+    assert len(list(tmp_path.glob("metrics_*.json"))) == 2
@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+
+from sports_analytics_dashboard import players
+
+BOS, NYK = 1610612738, 1610612752
+TATUM, BROWN, HOLIDAY, BRUNSON = 1628369, 1627759, 201950, 1628973
+
+
+def line(player, game_id, date, team=BOS, **stats):
+    """One player's box score line; stats not given are zero."""
+    record = np.zeros(1, dtype=players.RECORD)
+    record["player_id"], record["game_id"], record["team_id"] = player, game_id, team
+    record["game_date"] = np.datetime64(date)
+    for stat, value in stats.items():
+        record[stat] = value
+    return record
+
+
+def lines(*records):
+    return np.concatenate(records)
+
+
+@pytest.fixture
+def league(tmp_path, monkeypatch):
+    """An NBA player store and availability list in an empty working directory."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(players, "_leagues", {})
+    monkeypatch.setattr(players, "_availability", {})
+    return tmp_path
+
+
+def test_merge_keeps_the_newest_line_per_player_and_game(tmp_path):
+    store = players.PlayerLogStore(tmp_path / "player_logs.npy")
+    added, replaced = store.merge(lines(line(TATUM, 2, "2024-10-24", pts=30), line(BROWN, 1, "2024-10-22", pts=20),
+                                        line(TATUM, 1, "2024-10-22", pts=25)))
+    assert len(added) == 3 and len(replaced) == 0
+    assert store.records[["player_id", "game_id"]].tolist() == [(BROWN, 1), (TATUM, 1), (TATUM, 2)]
+
+    # A corrected line replaces the stored one; a repeated one in the same batch keeps the last
+    added, replaced = store.merge(lines(line(TATUM, 1, "2024-10-22", pts=27), line(BROWN, 3, "2024-10-26", pts=10),
+                                        line(BROWN, 3, "2024-10-26", pts=12)))
+    assert added[["player_id", "game_id"]].tolist() == [(BROWN, 3)]
+    assert added["pts"].tolist() == [12]
+    assert replaced.tolist() == [TATUM]
+    assert len(store) == 4
+    assert store.player_games(TATUM)["pts"].tolist() == [30, 27]  # newest first
+    assert store.game_lines(3)["pts"].tolist() == [12]
+
+    # Re-fetching lines already stored changes nothing
+    added, replaced = store.merge(store.records.copy())
+    assert len(added) == 0 and len(replaced) == 0
+
+    store.save()
+    assert players.PlayerLogStore(store.path).records.tolist() == store.records.tolist()
+
+
+def test_impact_is_an_ewma_that_skips_missing_stats():
+    store = players.PlayerLogStore("unused.npy")
+    impact = players.PlayerImpact()
+    for new in (line(TATUM, 1, "2024-10-22", pts=30, min=36),
+                line(TATUM, 2, "2024-10-24", pts=20, min=np.nan)):
+        impact.update(*store.merge(new), store)
+
+    tatum = impact.impact(TATUM)
+    assert tatum["games"] == 2 and tatum["last_date"] == "2024-10-24"
+    assert tatum["pts"] == pytest.approx(players.ALPHA * 20 + (1 - players.ALPHA) * 30)
+    assert tatum["min"] == 36  # a missing value leaves the average alone
+    assert impact.impact(BROWN) is None
+
+
+def test_late_and_corrected_lines_replay_to_the_in_order_result():
+    games = [line(TATUM, g, f"2024-10-{20 + g}", pts=pts) for g, pts in ((1, 30), (2, 10), (3, 25))]
+    store, impact = players.PlayerLogStore("unused.npy"), players.PlayerImpact()
+    impact.update(*store.merge(lines(*games)), store)
+    in_order = impact.impact(TATUM)
+
+    # The middle game arrives last, after a wrong line for it
+    store, impact = players.PlayerLogStore("unused.npy"), players.PlayerImpact()
+    impact.update(*store.merge(lines(games[0], games[2])), store)
+    impact.update(*store.merge(line(TATUM, 2, "2024-10-22", pts=99)), store)
+    impact.update(*store.merge(games[1]), store)
+    assert impact.impact(TATUM) == pytest.approx(in_order)
+
+
+def test_availability_is_checked_without_loading_player_logs(league, monkeypatch):
+    def no_logs(league_id):
+        raise AssertionError("player logs loaded")
+
+    with monkeypatch.context() as m:
+        m.setattr(players, "_league", no_logs)
+        assert players.availability_keys() == {}
+
+    players.ingest_player_logs(line(TATUM, 1, "2024-10-22", min=36))
+    players.set_unavailable(BOS, [TATUM])
+    version = players.get_player_impact().version
+    assert players.availability_keys() == {BOS: ((TATUM,), version)}
+
+
+def test_only_recent_players_on_the_team_are_taken_out(league):
+    players.ingest_player_logs(lines(
+        line(TATUM, 1, "2024-12-01", min=36, plus_minus=10, reb=8, ast=5),
+        line(HOLIDAY, 2, "2024-10-22", min=30, plus_minus=5, reb=4, ast=4),   # hasn't played in weeks
+        line(BRUNSON, 3, "2024-12-01", team=NYK, min=35, plus_minus=4),       # on another team
+    ))
+    names = ["NET_RATING", "PLUS_MINUS", "REB", "AST"]
+    team = [5.0, 100.0, 45.0, 25.0]
+
+    players.set_unavailable(BOS, [HOLIDAY, BRUNSON])
+    assert players.adjust_features(BOS, team, names).tolist() == team
+
+    players.set_unavailable(BOS, [TATUM, HOLIDAY])
+    margin = (10 - players.REPLACEMENT_PM_PER_MIN * 36) / 5
+    adjusted = players.adjust_features(BOS, team, names)
+    assert adjusted == pytest.approx([5 - margin, 100 - margin * 20, 45 - 4, 25 - 2.5])
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from sports_analytics_dashboard import predictor
+
+FEATURES = predictor.FEATURES
+
+
+def fitted_model(seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(200, len(FEATURES))), columns=FEATURES)
+    y = (X["W_PCT"] + X["NET_RATING"] + rng.normal(scale=0.5, size=200) > 0).astype(int)
+    return LogisticRegression().fit(X, y)
+
+
+def league_stats(seed=0):
+    """Stats for every NBA team, with one team missing a feature."""
+    rng = np.random.default_rng(seed)
+    stats = {team: dict(zip(FEATURES, rng.normal(size=len(FEATURES)).tolist())) for team in predictor.matrix_teams}
+    stats[predictor.matrix_teams[3]]["REB"] = None
+    return stats
+
+
+def per_pair(model, stats, home, away):
+    """How predict_win_probability scored one game before the matrix existed."""
+    def p(team):
+        return model.predict_proba(pd.DataFrame([predictor.get_features(team, stats, FEATURES)], columns=FEATURES))[0][1]
+    p_home, p_away = p(home), p(away)
+    return p_home / (p_home + p_away)
+
+
+@pytest.fixture
+def nba(tmp_path, monkeypatch):
+    """An NBA predictor with a fitted model and stats, in an empty working directory."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(predictor, "_leagues", {})
+    current = {"model": fitted_model(), "stats": league_stats(), "scored": 0}
+    monkeypatch.setattr(predictor, "get_model", lambda league_id=None: current["model"])
+    monkeypatch.setattr(predictor, "fetch_team_stats", lambda league_id=None: current["stats"])
+    monkeypatch.setattr(predictor, "_model_signature", lambda league_id=None: "test-model")
+    monkeypatch.setattr(predictor.players, "availability_keys", lambda league_id=None: {})
+
+    real_score = predictor.score_teams
+
+    def score_teams(features, league_id=None):
+        current["scored"] += 1
+        return real_score(features, league_id)
+
+    monkeypatch.setattr(predictor, "score_teams", score_teams)
+    return current
+
+
+def test_batched_matrix_matches_scoring_each_pair(nba):
+    matrix = predictor.build_matchup_matrix(nba["stats"])
+    teams = predictor.matrix_teams
+    for i, j in [(0, 1), (1, 0), (5, 20), (29, 2)]:
+        assert matrix[i, j] == pytest.approx(per_pair(nba["model"], nba["stats"], teams[i], teams[j]))
+    assert np.isnan(np.diag(matrix)).all()
+    assert np.isnan(matrix[3]).all() and np.isnan(matrix[:, 3]).all()
+    off_diagonal = ~np.eye(len(teams), dtype=bool) & ~np.isnan(matrix)
+    np.testing.assert_allclose((matrix + matrix.T)[off_diagonal], 1.0)
+
+
+def test_matrix_cache_is_rejected_when_stats_or_teams_change(nba, monkeypatch):
+    first = predictor.get_local_matchup_matrix().copy()
+    assert nba["scored"] == 1
+
+    # A fresh process with the same stats loads the cache instead of scoring
+    monkeypatch.setattr(predictor, "_leagues", {})
+    np.testing.assert_array_equal(predictor.get_local_matchup_matrix(), first)
+    assert nba["scored"] == 1
+
+    # Changed stats change the fingerprint
+    monkeypatch.setattr(predictor, "_leagues", {})
+    nba["stats"] = league_stats(seed=1)
+    changed = predictor.get_local_matchup_matrix()
+    assert nba["scored"] == 2
+    assert not np.allclose(np.nan_to_num(changed), np.nan_to_num(first))
+
+    # A cache with the right fingerprint but another team order is rebuilt
+    with np.load(predictor.MATRIX_FILE) as cached:
+        saved = dict(cached)
+    saved["teams"] = saved["teams"][::-1]
+    np.savez(predictor.MATRIX_FILE, **saved)
+    monkeypatch.setattr(predictor, "_leagues", {})
+    np.testing.assert_array_equal(predictor.get_local_matchup_matrix(), changed)
+    assert nba["scored"] == 3
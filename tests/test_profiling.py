@@ -0,0 +1,17 @@
+from sports_analytics_dashboard import profiling
+
+
+def test_cold_import_is_within_budget():
+    passed, seconds, report = profiling.check_startup_budget()
+    assert report["heavy"] == []
+    assert passed, f"cold import took {seconds:.3f}s (budget {profiling.STARTUP_BUDGET_S}s)"
+
+
+def test_budget_fails_when_a_heavy_module_is_imported_at_startup(tmp_path, monkeypatch):
+    # An app whose import also pulls in pandas, like a module-level `import pandas` would
+    (tmp_path / "regressed_app.py").write_text("import sports_analytics_dashboard\nimport pandas\n")
+    monkeypatch.setenv("PYTHONPATH", str(tmp_path))
+
+    passed, seconds, report = profiling.check_startup_budget(budget_s=60, runs=1, module="regressed_app")
+    assert not passed
+    assert "pandas" in report["heavy"]
@@ -0,0 +1,80 @@
+import json
+
+import numpy as np
+import pytest
+
+from sports_analytics_dashboard.records import GAME, GameTable, Game, Prediction, TeamStats, STAT_COLUMNS
+
+BOS, NYK, LAL = 1610612738, 1610612752, 1610612747
+
+
+def test_games_pack_into_29_bytes_and_keep_their_ids():
+    rows = [
+        {"game_id": "0022400061", "game_date": "2024-10-22", "home_team_id": BOS, "away_team_id": NYK,
+         "status": 3, "home_score": 132, "away_score": 109},
+        {"game_id": "0022401230", "game_date": "2025-04-13", "home_team_id": NYK, "away_team_id": BOS,
+         "status": None, "home_score": None, "away_score": None},   # not played yet
+    ]
+    table = GameTable.from_rows(rows)
+    assert GAME.itemsize == 29 and table.games.nbytes == 2 * 29
+    assert table.game_ids == ["0022400061", "0022401230"]
+    assert table.games["game_date"].tolist() == [np.datetime64("2024-10-22").item(), np.datetime64("2025-04-13").item()]
+    assert table.games[["home_team_id", "away_team_id"]].tolist() == [(BOS, NYK), (NYK, BOS)]
+    assert table.games[["status", "home_score", "away_score"]].tolist() == [(3, 132, 109), (0, 0, 0)]
+    assert len(GameTable.from_rows([])) == 0
+
+
+def test_team_stats_round_trip_from_the_cache():
+    cache = {
+        "Boston Celtics": {"W_PCT": 0.75, "NET_RATING": 9.5, "REB": 46.0},
+        "LA Clippers": {"W_PCT": 0.5, "REB": None},                # missing and null stats
+        "Springfield Atoms": {"W_PCT": 1.0},                       # not a team of the league
+        "New York Knicks": {c: float(i) for i, c in enumerate(STAT_COLUMNS)},
+    }
+    stats = TeamStats.from_cache(cache)
+    assert len(stats) == 3
+    assert "Springfield Atoms" not in stats.team_names
+
+    columns = ["W_PCT", "NET_RATING", "REB"]
+    ids = {name: team_id for team_id, name in zip(stats.team_ids.tolist(), stats.team_names)}
+    features = stats.features([ids["Boston Celtics"], ids["LA Clippers"], LAL, NYK], columns)
+    np.testing.assert_array_equal(features[0], [0.75, 9.5, 46.0])
+    np.testing.assert_array_equal(features[1], [0.5, np.nan, np.nan])
+    assert np.isnan(features[2]).all()   # a team without stats
+    np.testing.assert_array_equal(stats.features([NYK]), [np.arange(len(STAT_COLUMNS), dtype=float)])
+
+    for name, team_stats in cache.items():
+        if name not in ids:
+            continue
+        row = stats.features([ids[name]])[0]
+        restored = {c: v for c, v in zip(STAT_COLUMNS, row.tolist()) if not np.isnan(v)}
+        assert restored == {c: v for c, v in team_stats.items() if v is not None}
+
+
+def test_predictions_serialize_to_strict_json():
+    explanation = [{"feature": "W_PCT", "home_value": 0.75, "away_value": None, "std_diff": None, "contribution": None}]
+    prediction = Prediction(BOS, NYK, "Boston Celtics", "New York Knicks", np.float64(61.5), np.float64(38.5),
+                            [np.float64(0.75), None], [0.6, np.float64(-1.5)], explanation)
+    game = Game("0022400061", BOS, NYK, "Boston Celtics", "New York Knicks", "7:30 pm ET", "2024-10-22", prediction)
+
+    served = json.loads(json.dumps(game.to_dict(), allow_nan=False))
+    assert served["win_probabilities"] == {
+        "winner": "Boston Celtics",
+        "home_team": "Boston Celtics",
+        "home_prob": 61.5,
+        "away_team": "New York Knicks",
+        "away_prob": 38.5,
+        "model_input": {"Boston Celtics": [0.75, None], "New York Knicks": [0.6, -1.5]},
+        "explanation": explanation,
+    }
+    assert served["game_id"] == "0022400061" and served["game_date"] == "2024-10-22"
+
+    # A tie goes to the away team; a game without a prediction serves null
+    tie = Prediction(BOS, NYK, "Boston Celtics", "New York Knicks", 50.0, 50.0, [], [])
+    assert tie.winner == "New York Knicks" and tie.to_dict()["explanation"] is None
+    game.prediction = None
+    assert json.loads(json.dumps(game.to_dict()))["win_probabilities"] is None
+
+    with pytest.raises(AttributeError):
+        prediction.home_win_prob = 0.6   # slotted: a misspelt field fails loudly
+
@@ -0,0 +1,49 @@
+import pytest
+
+from sports_analytics_dashboard import app, routes
+from sports_analytics_dashboard.records import Game, Prediction
+
+BOS, NYK = 1610612738, 1610612752
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """A test client whose predictions and ledger writes are recorded instead of made."""
+    served, logged = [], []
+
+    def predict(home, away, league_id):
+        served.append((home, away))
+        return Prediction(BOS, NYK, home, away, 60.0, 40.0, [], [])
+
+    monkeypatch.setattr(routes, "predict_win_probability", predict)
+    monkeypatch.setattr(routes.ledger, "record_prediction",
+                        lambda game_id, prediction, league_id: logged.append((game_id, prediction.home_prob)))
+    client = app.test_client()
+    client.served, client.logged = served, logged
+    return client
+
+
+def test_todays_predictions_are_logged(client, monkeypatch):
+    monkeypatch.setattr(routes, "todays_games", lambda league_id: [
+        Game("0022400001", BOS, NYK, "Boston Celtics", "New York Knicks", "7:30 pm ET")])
+    response = client.get("/games.json")
+    assert response.status_code == 200
+    assert response.get_json()["games"][0]["win_probabilities"]["home_prob"] == 60.0
+    assert client.logged == [("0022400001", 60.0)]
+
+
+def test_upcoming_predictions_are_logged(client, monkeypatch):
+    rows = [{"game_id": "0022400002", "game_date": "2024-10-23", "home_team_id": BOS, "away_team_id": NYK,
+             "status_text": "7:30 pm ET"}]
+    monkeypatch.setattr(routes, "upcoming_games", lambda days, league_id: rows)
+    assert client.get("/upcoming").status_code == 200
+    assert client.served == [("Boston Celtics", "New York Knicks")]
+    assert client.logged == [("0022400002", 60.0)]
+
+
+def test_ledger_writes_are_not_timed_as_inference(client, monkeypatch):
+    stages = []
+    monkeypatch.setattr(routes.metrics, "stage_timer", lambda stage: stages.append(stage) or routes.metrics._NULL_TIMER)
+    monkeypatch.setattr(routes, "todays_games", lambda league_id: [])
+    client.get("/games.json")
+    assert stages == ["todays_games", "predict_win_probability", "record_prediction"]
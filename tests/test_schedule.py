@@ -0,0 +1,132 @@
+import threading
+import time
+
+import nba_api.stats.endpoints
+import pytest
+
+from sports_analytics_dashboard import nba, schedule, store
+
+BOS, NYK = 1610612738, 1610612752
+TODAY = "2024-11-20"
+
+
+class Scoreboard:
+    """Stands in for ScoreboardV2, recording the dates asked for."""
+    calls = []
+    fail = False
+
+    def __init__(self, game_date, league_id, timeout):
+        Scoreboard.calls.append(game_date)
+        if Scoreboard.fail:
+            raise TimeoutError("stats.nba.com timed out")
+
+    def get_normalized_dict(self):
+        return {"GameHeader": [], "LineScore": []}
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    path = tmp_path / "game_logs.db"
+    monkeypatch.setattr(Scoreboard, "calls", [])
+    monkeypatch.setattr(Scoreboard, "fail", False)
+    monkeypatch.setattr(nba_api.stats.endpoints, "ScoreboardV2", Scoreboard)
+    return path
+
+
+@pytest.fixture
+def no_schedule(tmp_path, monkeypatch):
+    """An NBA store in an empty working directory whose schedule can't be loaded."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(store, "_local", threading.local())
+    monkeypatch.setattr(nba, "_scoreboards", {})
+    monkeypatch.setattr(schedule, "load_season_schedule", lambda season, path, league_id: 0)
+    monkeypatch.setattr(schedule, "_load_attempts", {})
+
+
+def insert(path, game_id, game_date, status, tipoff, status_text="", updated_at=0):
+    conn = schedule._connection(path)
+    with conn:
+        conn.execute("INSERT INTO schedule VALUES (?, '2024-25', ?, '', ?, ?, ?, ?, 0, 0, ?, ?)",
+                     (game_id, game_date, BOS, NYK, status, status_text, updated_at, tipoff))
+
+
+def test_parse_date_accepts_both_schedule_formats():
+    assert schedule._parse_date("2024-10-22T00:00:00Z") == "2024-10-22"
+    assert schedule._parse_date("10/22/2024 00:00:00") == "2024-10-22"
+    assert schedule._parse_date("") is None
+    assert schedule._parse_date("not a date") is None
+    assert schedule._parse_tipoff("2024-10-22T23:30:00Z") == 1729639800
+    assert schedule._parse_tipoff(None) is None
+
+
+def test_stores_from_before_tip_off_times_are_migrated(tmp_path):
+    path = tmp_path / "game_logs.db"
+    with store.get_connection(path) as conn:
+        conn.execute("CREATE TABLE schedule (GAME_ID TEXT PRIMARY KEY, SEASON TEXT, GAME_DATE TEXT, GAME_TIME TEXT, "
+                     "HOME_TEAM_ID INTEGER, AWAY_TEAM_ID INTEGER, STATUS INTEGER, STATUS_TEXT TEXT, "
+                     "HOME_SCORE INTEGER, AWAY_SCORE INTEGER, UPDATED_AT REAL)")
+    columns = [row["name"] for row in schedule._connection(path).execute("PRAGMA table_info(schedule)")]
+    assert columns[-1] == "TIPOFF"
+
+
+def test_only_dates_with_a_game_past_tip_off_are_refreshed(db):
+    now = time.time()
+    insert(db, "0022400001", "2024-11-18", schedule.STATUS_FINAL, now - 3 * 86400)
+    insert(db, "0022400002", "2024-11-19", schedule.STATUS_SCHEDULED, now - 86400, "PPD")   # postponed
+    insert(db, "0022400003", TODAY, schedule.STATUS_SCHEDULED, now + 3600)                  # tonight
+    insert(db, "0022400004", "2024-11-21", schedule.STATUS_LIVE, None)                      # after today
+    assert schedule.refresh_live(TODAY, db) == 0
+    assert Scoreboard.calls == []
+
+    insert(db, "0022400005", TODAY, schedule.STATUS_SCHEDULED, now - 60)                    # just tipped off
+    insert(db, "0022400006", "2024-11-19", schedule.STATUS_LIVE, None)                      # still in progress
+    assert schedule.refresh_live(TODAY, db) == 2
+    assert sorted(Scoreboard.calls) == ["2024-11-19", TODAY]
+
+    # Refreshed dates rest for LIVE_REFRESH_S
+    assert schedule.refresh_live(TODAY, db) == 0
+
+
+def test_failed_refresh_backs_off_for_every_worker(db, monkeypatch):
+    insert(db, "0022400001", TODAY, schedule.STATUS_LIVE, time.time() - 600)
+    Scoreboard.fail = True
+    assert schedule.refresh_live(TODAY, db) == 1
+
+    # Another worker, with its own connection, skips the date as well
+    seen = {}
+    thread = threading.Thread(target=lambda: seen.update(dates=schedule.refresh_live(TODAY, db)))
+    thread.start()
+    thread.join()
+    assert seen["dates"] == 0
+    assert Scoreboard.calls == [TODAY]
+
+    later = time.time() + schedule.LIVE_RETRY_S + 1
+    monkeypatch.setattr(schedule.time, "time", lambda: later)
+    assert schedule.refresh_live(TODAY, db) == 1
+
+
+def test_todays_games_survive_an_upstream_outage(no_schedule, monkeypatch):
+    calls = []
+
+    def unreachable(**kwargs):
+        calls.append(kwargs)
+        raise ConnectionError("stats.nba.com unreachable")
+
+    monkeypatch.setattr(nba_api.stats.endpoints, "ScoreboardV2", unreachable)
+    assert nba.todays_games() == []
+    assert nba.todays_games() == []
+    assert len(calls) == 1  # backed off after the first failure
+
+
+def test_todays_games_fall_back_to_the_scoreboard(no_schedule, monkeypatch):
+    class Board:
+        def __init__(self, **kwargs):
+            pass
+
+        def get_dict(self):
+            row = [None, None, "0022400009", None, "7:30 pm ET", None, BOS, 99]
+            return {"resultSets": [{"rowSet": [row]}]}
+
+    monkeypatch.setattr(nba_api.stats.endpoints, "ScoreboardV2", Board)
+    games = nba.todays_games()
+    assert [(g.game_id, g.home_team, g.away_team) for g in games] == [("0022400009", "Boston Celtics", "99")]
@@ -0,0 +1,131 @@
+import mmap
+import os
+import struct
+
+import numpy as np
+import pytest
+
+from sports_analytics_dashboard import shared
+
+
+def snapshot(n_teams=4, n_features=3, seed=0):
+    rng = np.random.default_rng(seed)
+    features = rng.normal(size=(n_teams, n_features))
+    features[1, 2] = np.nan
+    matrix = rng.random((n_teams, n_teams))
+    np.fill_diagonal(matrix, np.nan)
+    return {
+        "features": features,
+        "coef": rng.normal(size=n_features),
+        "intercept": 0.25,
+        "matrix": matrix,
+        "contrib": rng.normal(size=(n_teams, n_features)),
+        "scale": rng.random(n_features),
+        "fingerprint": f"{seed:040x}",
+    }
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "team_features.shm"
+
+
+def set_seq(path, seq):
+    with open(path, "r+b") as f, mmap.mmap(f.fileno(), 0) as buf:
+        struct.pack_into("<Q", buf, shared.SEQ_OFFSET, seq)
+
+
+def test_publish_round_trips_every_array(path):
+    data = snapshot()
+    assert shared.publish(path=path, **data) == 1
+    segment = shared.SharedFeatures(path)
+    copy = segment.snapshot()
+    np.testing.assert_array_equal(copy["features"], data["features"])
+    np.testing.assert_array_equal(copy["matrix"], data["matrix"])
+    np.testing.assert_array_equal(copy["contrib"], data["contrib"])
+    np.testing.assert_array_equal(copy["coef"], data["coef"])
+    assert copy["intercept"] == 0.25 and copy["version"] == 1
+
+    prob, home, away, home_contrib, away_contrib, scale = segment.matchup(0, 1)
+    assert prob == data["matrix"][0, 1]
+    assert home == data["features"][0].tolist()
+    np.testing.assert_array_equal(away_contrib, data["contrib"][1])
+    np.testing.assert_array_equal(scale, data["scale"])
+
+    # A republish of the same shape is visible through the existing mapping
+    newer = snapshot(seed=1)
+    assert shared.publish(path=path, **newer) == 2
+    np.testing.assert_array_equal(segment.snapshot()["matrix"], newer["matrix"])
+    assert segment.version == 2
+
+
+def test_reads_retry_while_a_write_is_in_progress(path):
+    shared.publish(path=path, **snapshot())
+    segment = shared.SharedFeatures(path)
+    assert segment.read(lambda s: 1) == 1
+
+    set_seq(path, 3)  # odd: the loader is writing
+    assert segment.read(lambda s: 1, retries=3) is None
+
+    # A write that lands while fn runs makes the reader try again
+    set_seq(path, 4)
+    calls = []
+
+    def reader(s):
+        calls.append(1)
+        if len(calls) == 1:
+            set_seq(path, 6)
+        return len(calls)
+
+    assert segment.read(reader) == 2
+
+
+def test_readers_follow_a_resize_without_stat_on_the_read_path(path, monkeypatch):
+    shared.publish(path=path, **snapshot(n_teams=4))
+    segment = shared.SharedFeatures(path)
+    assert segment.snapshot()["matrix"].shape == (4, 4)
+
+    def no_stat(*args, **kwargs):
+        raise AssertionError("os.stat on the read path")
+
+    with monkeypatch.context() as m:
+        m.setattr(os, "stat", no_stat)
+        for _ in range(10):
+            segment.matchup(0, 1)
+
+    bigger = snapshot(n_teams=6, seed=2)
+    shared.publish(path=path, **bigger)
+    np.testing.assert_array_equal(segment.snapshot()["matrix"], bigger["matrix"])
+
+
+def test_missing_segment_is_not_reopened_on_every_read(path, monkeypatch):
+    segment = shared.SharedFeatures(path)
+    assert segment.read(lambda s: 1) is None
+
+    opened = []
+    real_open = open
+    monkeypatch.setattr("builtins.open", lambda *a, **k: opened.append(a) or real_open(*a, **k))
+    for _ in range(5):
+        assert segment.read(lambda s: 1) is None
+    assert opened == []
+
+
+def test_loader_republishes_on_availability_changes_without_reloading_stats(monkeypatch):
+    from sports_analytics_dashboard import predictor, players
+
+    stats, keys, calls = {"Boston Celtics": {}}, {}, []
+    monkeypatch.setattr(predictor, "reset_team_stats", lambda league_id: calls.append("reset"))
+    monkeypatch.setattr(predictor, "get_team_stats", lambda league_id: stats)
+    monkeypatch.setattr(predictor, "matrix_fingerprint", lambda s, league_id: "stats")
+    monkeypatch.setattr(players, "availability_keys", lambda league_id: dict(keys))
+    monkeypatch.setattr(shared, "publish_from_predictor", lambda league_id: calls.append("publish") or 1)
+
+    last = shared.refresh()
+    assert calls == ["reset", "publish"]
+    assert shared.refresh(last=last, reload_stats=False) == last
+    assert calls == ["reset", "publish"]
+
+    keys[1610612738] = ((1628369,), 1)
+    last = shared.refresh(last=last, reload_stats=False)
+    assert calls == ["reset", "publish", "publish"]
+    assert last[1] == keys
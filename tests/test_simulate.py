@@ -0,0 +1,97 @@
+import time
+
+import numpy as np
+import pytest
+
+from sports_analytics_dashboard import predictor, schedule, simulate
+from sports_analytics_dashboard.records import GameTable
+from sports_analytics_dashboard.utils import team_ids, team_index, team_conference
+
+BOS, NYK, HOU = 1610612738, 1610612752, 1610612745
+SEASON = "2024-25"
+
+
+def stronger_wins(home_id, away_id):
+    """Deterministic matchups: the team earlier in utils.team_ids always wins."""
+    return 1.0 if team_index[home_id] < team_index[away_id] else 0.0
+
+
+@pytest.fixture
+def schedule_db(tmp_path, monkeypatch):
+    """
+    A schedule store with one final, one live and one scheduled regular season game,
+    plus a preseason final and playoff games that must not count.
+    """
+    path = tmp_path / "game_logs.db"
+    conn = schedule._connection(path)
+    now = time.time()
+    rows = [
+        ("0022400001", SEASON, "2024-10-22", "Final", BOS, NYK, schedule.STATUS_FINAL, "Final", 110, 100, now),
+        ("0022400002", SEASON, "2024-10-23", "Q3", BOS, HOU, schedule.STATUS_LIVE, "Q3", 50, 40, now),
+        ("0022400003", SEASON, "2024-10-24", "7:00 pm", NYK, HOU, schedule.STATUS_SCHEDULED, "7:00 pm", 0, 0, now),
+        ("0022300001", "2023-24", "2023-10-24", "Final", HOU, BOS, schedule.STATUS_FINAL, "Final", 90, 80, now),
+        ("0012400001", SEASON, "2024-10-10", "Final", HOU, NYK, schedule.STATUS_FINAL, "Final", 120, 90, now),
+        ("0042400101", SEASON, "2025-04-19", "Final", HOU, BOS, schedule.STATUS_FINAL, "Final", 101, 99, now),
+        ("0042400107", SEASON, "2025-05-03", "TBD", BOS, HOU, schedule.STATUS_SCHEDULED, "TBD", 0, 0, now),
+    ]
+    with conn:
+        conn.executemany("INSERT INTO schedule VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NULL)", rows)
+        conn.execute("INSERT INTO schedule_loads VALUES (?, ?)", (SEASON, now))
+    monkeypatch.setattr(simulate, "_predictor_probability", stronger_wins)
+    monkeypatch.setattr(predictor, "get_matchup_matrix", lambda league_id=None: None)
+    monkeypatch.setitem(simulate._last_projection, "key", None)
+    return path
+
+
+def test_standings_count_only_finals():
+    table = GameTable.from_rows([
+        {"game_id": "1", "game_date": "2024-10-22", "home_team_id": BOS, "away_team_id": NYK,
+         "status": 3, "home_score": 110, "away_score": 100},
+        {"game_id": "2", "game_date": "2024-10-23", "home_team_id": HOU, "away_team_id": BOS,
+         "status": 3, "home_score": 120, "away_score": 100},
+    ])
+    wins, losses = simulate.standings_from_games(table)
+    assert wins[team_index[BOS]] == 1 and losses[team_index[BOS]] == 1
+    assert wins[team_index[HOU]] == 1 and losses[team_index[NYK]] == 1
+    assert wins.sum() == losses.sum() == 2
+
+
+def test_projection_uses_one_snapshot_and_simulates_live_games(schedule_db):
+    projections = {p["team"]: p for p in simulate.project_season(200, SEASON, workers=1, seed=1, path=schedule_db)}
+    boston, new_york, houston = (projections[n] for n in ("Boston Celtics", "New York Knicks", "Houston Rockets"))
+
+    # Only this season's regular season final counts toward the standings
+    assert (boston["wins"], boston["losses"]) == (1, 0)
+    assert (new_york["wins"], new_york["losses"]) == (0, 1)
+    assert (houston["wins"], houston["losses"]) == (0, 0)
+    # The live and the scheduled game are both simulated, so no game is lost, and
+    # the unplayed playoff game is not
+    assert sum(p["projected_wins"] for p in projections.values()) == pytest.approx(3)
+    expected = 1 + (team_index[BOS] < team_index[HOU])
+    assert boston["projected_wins"] == pytest.approx(expected)
+
+
+def test_playoff_odds_are_reproducible_with_a_seed():
+    # Distinct records, stronger teams (earlier in team_ids) ahead, and every game decided
+    wins = 60 - np.arange(len(team_ids))
+    losses = 82 - wins
+    remaining = GameTable.from_rows([
+        {"game_id": "1", "game_date": "2025-04-01", "home_team_id": team_ids[-1], "away_team_id": team_ids[0],
+         "status": 1, "home_score": 0, "away_score": 0},
+    ])
+    simulator = simulate.SeasonSimulator(remaining, wins, losses, prob_fn=stronger_wins)
+    projections = {p["team"]: p for p in simulator.run(500, workers=1, seed=7)}
+    assert simulator.run(500, workers=1, seed=7) == simulator.run(500, workers=1, seed=7)
+
+    for conference in simulate.CONFERENCES:
+        members = [t for t in team_ids if team_conference.get(t) == conference]  # already in seed order
+        for seed, team_id in enumerate(members, start=1):
+            p = next(p for p in projections.values() if p["team"] == simulate.team_names[team_id])
+            assert p["seed_probs"][seed - 1] == 100.0
+            # 7 beats 8, 9 beats 10, and 8 beats 9 for the last spot
+            assert p["playoff_pct"] == (100.0 if seed <= 8 else 0.0)
+            assert p["play_in_pct"] == (100.0 if 7 <= seed <= 10 else 0.0)
+
+    first, last = simulate.team_names[team_ids[0]], simulate.team_names[team_ids[-1]]
+    assert projections[first]["projected_wins"] == wins[0] + 1
+    assert projections[last]["projected_wins"] == wins[-1]
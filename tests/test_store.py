@@ -0,0 +1,112 @@
+import threading
+
+import pytest
+
+from sports_analytics_dashboard import store
+
+BOS, NYK, HOU = 1610612738, 1610612752, 1610612745
+
+
+def game(game_id, date, home, away, home_pts, away_pts, season="22024"):
+    """The two team-level LeagueGameLog rows of one game."""
+    def row(team, opponent, pts, opp_pts, matchup):
+        return {"SEASON_ID": season, "TEAM_ID": team, "GAME_ID": game_id, "GAME_DATE": date,
+                "MATCHUP": matchup, "WL": "W" if pts > opp_pts else "L", "PTS": pts,
+                "PLUS_MINUS": pts - opp_pts}
+    return [row(away, home, away_pts, home_pts, "AWY @ HOM"), row(home, away, home_pts, away_pts, "HOM vs. AWY")]
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = tmp_path / "game_logs.db"
+    rows = (game("22400001", "2024-10-22", BOS, NYK, 132, 109)
+            + game("22400002", "2024-11-13", NYK, BOS, 113, 107)
+            + game("22400003", "2024-11-20", BOS, HOU, 120, 110)
+            + game("22400004", "2025-02-23", BOS, NYK, 118, 105))
+    store.ingest_game_logs(rows, path)
+    return path, rows
+
+
+def count(path):
+    return store.get_connection(path).execute("SELECT COUNT(*) FROM game_logs").fetchone()[0]
+
+
+def test_reingesting_the_same_rows_is_idempotent(db):
+    path, rows = db
+    assert count(path) == 8
+    before = store.head_to_head(BOS, NYK, path=path)
+
+    store.ingest_game_logs(rows, path)
+    store.ingest_game_logs(rows[:2], path)
+    assert count(path) == 8
+    assert store.head_to_head(BOS, NYK, path=path) == before
+    unlinked = store.get_connection(path).execute(
+        "SELECT COUNT(*) FROM game_logs WHERE OPP_TEAM_ID IS NULL").fetchone()[0]
+    assert unlinked == 0
+
+
+def test_corrected_rows_replace_the_old_ones(db):
+    path, rows = db
+    corrected = game("22400003", "2024-11-20", BOS, HOU, 100, 110)
+    store.ingest_game_logs(corrected, path)
+    assert count(path) == 8
+    assert store.head_to_head(HOU, BOS, path=path)["wins"] == 1
+
+
+def test_game_ids_are_zero_padded(db):
+    path, _ = db
+    assert store.last_n_games(BOS, 1, path=path)[0]["GAME_ID"] == "0022400004"
+
+
+def test_head_to_head_is_from_the_teams_point_of_view(db):
+    path, _ = db
+    series = store.head_to_head(BOS, NYK, path=path)
+    assert (series["wins"], series["losses"]) == (2, 1)
+    assert [g["GAME_DATE"] for g in series["games"]] == ["2025-02-23", "2024-11-13", "2024-10-22"]
+    assert all(g["OPP_TEAM_ID"] == NYK for g in series["games"])
+
+    reverse = store.head_to_head("New York Knicks", "BOS", path=path)
+    assert (reverse["wins"], reverse["losses"]) == (1, 2)
+    assert len(store.head_to_head(BOS, NYK, limit=1, path=path)["games"]) == 1
+    assert store.head_to_head(NYK, HOU, path=path) == {"wins": 0, "losses": 0, "games": []}
+
+
+def test_records_and_date_ranges(db):
+    path, _ = db
+    assert store.home_record(BOS, path=path) == {"wins": 3, "losses": 0}
+    assert store.team_record(BOS, home=False, path=path) == {"wins": 0, "losses": 1}
+    games = store.games_between("2024-11-01", "2024-11-30", path=path)
+    assert [(g["home_team_id"], g["away_team_id"], g["home_pts"]) for g in games] == [(NYK, BOS, 113), (BOS, HOU, 120)]
+
+
+def test_each_thread_gets_its_own_connection_and_sees_committed_rows(db):
+    path, _ = db
+    main = store.get_connection(path)
+    assert store.get_connection(path) is main
+    assert main.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    seen = {}
+
+    def reader():
+        conn = store.get_connection(path)
+        seen["same"] = conn is main
+        seen["series"] = store.head_to_head(BOS, NYK, path=path)["wins"]
+
+    store.ingest_game_logs(game("22400005", "2025-03-01", BOS, NYK, 101, 99), path)
+    thread = threading.Thread(target=reader)
+    thread.start()
+    thread.join()
+    assert seen == {"same": False, "series": 3}
+
+
+def test_relative_paths_follow_the_working_directory(tmp_path, monkeypatch):
+    first, second = tmp_path / "first", tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+    monkeypatch.chdir(first)
+    store.ingest_game_logs(game("22400001", "2024-10-22", BOS, NYK, 132, 109))
+    assert count(store.DB_FILE) == 2
+
+    monkeypatch.chdir(second)
+    assert count(store.DB_FILE) == 0
+    assert (second / store.DB_FILE).exists()